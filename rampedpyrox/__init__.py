@@ -55,11 +55,36 @@ from .results import(
 	RpoIsotopes,
 	)
 
+#import batch functions
+from .batch import(
+	calibrate_DE,
+	inverse_model_multi,
+	load_rpo_batch,
+	load_rpo_isotopes,
+	)
+
+#import profiling classes
+from .profiling import(
+	Profiler,
+	)
+
+#import shared memory classes
+from .shared import(
+	SharedArrays,
+	)
+
+#import synthetic data functions
+from .synthetic import(
+	make_synthetic_thermograms,
+	)
+
 #import package-level functions
 from .core_functions import(
 	assert_len,
 	calc_L_curve,
 	derivatize,
 	extract_moments,
+	load_archive,
 	plot_tg_isotopes,
+	save_archive,
 	)
@@ -0,0 +1,12 @@
+'''
+Runs the command-line batch processor, *e.g.*
+``python -m rampedpyrox config.json``. See ``rampedpyrox.cli``.
+'''
+
+import sys
+
+from .cli import main
+
+if __name__ == '__main__':
+
+	sys.exit(main())
@@ -0,0 +1,898 @@
+'''
+This module contains functions for loading and processing batches of
+rampedpyrox data files.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+__docformat__ = 'restructuredtext en'
+__all__ = ['calibrate_DE', 'inverse_model_multi', 'load_rpo_batch',
+	'load_rpo_isotopes']
+
+import numpy as np
+import warnings
+
+from collections import Sequence
+
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pandas on first use
+pd = _lazy_import('pandas')
+
+#import exceptions
+from .exceptions import(
+	ArrayError,
+	FileError,
+	LengthError,
+	ScalarError,
+	)
+
+#import classes
+from .model import(
+	Daem,
+	Model,
+	)
+
+from .ratedata import(
+	EnergyComplex,
+	)
+
+from .results import(
+	RpoIsotopes,
+	)
+
+#import helper functions
+from .batch_helper import(
+	_calc_I_job,
+	_find_rpo_files,
+	_kie_slope_job,
+	_load_rpo_file,
+	_map_jobs,
+	)
+
+from .model_helper import(
+	_rpo_calc_p_multi,
+	)
+
+from .results_helper import(
+	_rpo_blk_corr,
+	_rpo_extract_iso,
+	_rpo_mass_bal_corr_grouped,
+	)
+
+#define function to calibrate DE against samples with known bulk d13C
+def calibrate_DE(
+	samples,
+	DE0 = 0.0018,
+	log10omega = 10,
+	processes = None):
+	'''
+	Calibrates the difference in E between 12C- and 13C-containing atoms,
+	`DE`, jointly against a set of samples with known bulk d13C values.
+
+	Parameters
+	----------
+	samples : dict or list
+		Dictionary mapping sample names to, or list of, tuples of the form
+		(timedata, ratedata, result, bulk_d13C_true). timedata is either an
+		``rp.RpoThermogram`` or the ``rp.Model`` instance used to calculate
+		ratedata; ratedata is an ``rp.EnergyComplex``; result is an
+		``rp.RpoIsotopes`` instance; and bulk_d13C_true is the independently
+		measured bulk d13C in the form [mean, stdev.].
+
+	DE0 : scalar
+		Initial guess for DE, in kJ. Defaults to 0.0018 (the best-fit value
+		calculated in Hemingway et al., **2017**).
+
+	log10omega : scalar, array-like, or lambda function
+		Arrhenius pre-exponential factor used to build a ``rp.Daem`` instance
+		for samples inputted with an ``rp.RpoThermogram``. Should match the
+		value used to calculate ratedata. Defaults to 10.
+
+	processes : None or int
+		Number of worker processes. If `None`, uses the number of CPUs. If 1,
+		all samples are processed in the current process. Defaults to `None`.
+
+	Returns
+	-------
+	DE : float
+		Best-fit DE, in kJ.
+
+	DE_std : float
+		Standard deviation of `DE`, from the curvature of the weighted misfit.
+
+	cal_info : pd.DataFrame
+		Summary of each sample, with the mass-weighted d13C before (DE = 0)
+		and after KIE correction with the best-fit `DE`, the true bulk d13C,
+		and the residual.
+
+	Raises
+	------
+	ArrayError
+		If `bulk_d13C_true` is not array-like for any sample.
+
+	LengthError
+		If any sample is not of the form (timedata, ratedata, result,
+		bulk_d13C_true), or if `bulk_d13C_true` is not of length 2.
+
+	ValueError
+		If any result does not contain d13C values.
+
+	Warnings
+	--------
+	UserWarning
+		If any result has already been corrected for kinetic fractionation.
+
+	See Also
+	--------
+	RpoIsotopes.kie_correct
+		Method for correcting a single sample using a given DE.
+
+	Examples
+	--------
+	Calibrating DE using a set of blank-corrected standards::
+
+		#import modules
+		import rampedpyrox as rp
+
+		samples = {}
+
+		for name, (tg, ri, bulk) in standards.items():
+			daem = rp.Daem.from_timedata(tg)
+			ec = rp.EnergyComplex.inverse_model(daem, tg)
+
+			samples[name] = (daem, ec, ri, bulk)
+
+		DE, DE_std, cal_info = rp.calibrate_DE(samples)
+
+		for name, (daem, ec, ri, bulk) in samples.items():
+			ri.kie_correct(daem, ec, DE = DE)
+
+	Notes
+	-----
+	Corrected fraction d13C values are calculated exactly as in
+	``RpoIsotopes.kie_correct`` (*i.e.* using blank-corrected values if they
+	exist), but using the first-order 'linear' transform. Since DE is ~1e-5
+	of E, the difference from the default 'shift' method is order DE**2.
+
+	With the first-order transform, the KIE of each fraction is linear in DE.
+	The only costly step, calculating the derivative of A with respect to E,
+	is therefore done once per model (shared by all samples inputted with
+	the same ``rp.Model`` or ``rp.RpoThermogram`` instance) and in parallel
+	over models. Models of samples inputted with an ``rp.RpoThermogram`` are
+	built in the worker processes. Each iteration of the fit then only
+	requires a few array operations per sample.
+
+	The fit minimizes the sum of squared differences between mass-weighted
+	and true bulk d13C values, weighted by the stdev. of bulk_d13C_true.
+
+	References
+	----------
+	[1] J.D. Hemingway et al. (2017) Assessing the blank carbon
+		contribution, isotope mass balance, and kinetic isotope 
+		fractionation of the ramped pyrolysis/oxidation instrument at 
+		NOSAMS. *Radiocarbon*, **59**, 179-193.
+	'''
+
+	#import scipy on first use
+	from scipy.optimize import least_squares
+
+	#make list of (name, sample) pairs
+	if isinstance(samples, dict):
+		items = list(samples.items())
+
+	else:
+		items = list(enumerate(samples))
+
+	#group samples by model and extract isotope data
+	jobs = {}
+	names = []
+	d13C = {}
+	m = {}
+	bulk = np.zeros([len(items), 2])
+
+	for i, (name, sample) in enumerate(items):
+
+		if len(sample) != 4:
+			raise LengthError(
+				'each sample must be of the form (timedata, ratedata, result,'
+				' bulk_d13C_true)')
+
+		timedata, ratedata, result, bulk_d13C_true = sample
+
+		#ensure bulk_d13C_true is in the right format
+		if not isinstance(bulk_d13C_true, Sequence) and \
+			not hasattr(bulk_d13C_true, '__array__'):
+			raise ArrayError(
+				'bulk_d13C_true must be array-like')
+
+		if len(bulk_d13C_true) != 2:
+			raise LengthError(
+				'length of bulk_d13C_true must be 2 [mean, stdev.]')
+
+		bulk[i] = bulk_d13C_true
+
+		#extract d13C and mass as in kie_correct
+		if getattr(result, '_kie_corr', False):
+			warnings.warn(
+				'd13C of sample %r has already been corrected for kinetic'
+				' fractionation! Proceeding anyway' % name, UserWarning)
+
+		if hasattr(result, 'd13C_corr'):
+			d13C[name] = result.d13C_corr
+
+		elif hasattr(result, 'd13C_raw'):
+			d13C[name] = result.d13C_raw
+
+		else:
+			raise ValueError(
+				'result for sample %r does not contain d13C values' % name)
+
+		m[name] = getattr(result, 'm_corr', getattr(result, 'm_raw', None))
+
+		#use the inputted model, or the arrays to build one in the worker
+		if isinstance(timedata, Model):
+			model = timedata
+			key = id(model)
+
+		else:
+			#evaluate lambda functions here since they cannot be pickled
+			lw = log10omega(ratedata.E) if callable(log10omega) \
+				else log10omega
+
+			model = (ratedata.E, lw, timedata.t, timedata.T)
+			key = (id(timedata), np.asarray(ratedata.E).tobytes())
+
+		if key not in jobs:
+			jobs[key] = (model, [])
+
+		jobs[key][1].append((name, ratedata, result))
+		names.append(name)
+
+	#calculate KIE slopes, in parallel over models, sharing each A matrix
+	# with workers rather than copying it
+	k = {}
+	models = [model for model, _ in jobs.values()
+		if isinstance(model, Model)]
+
+	for slopes in _map_jobs(
+		_kie_slope_job, list(jobs.values()), processes, shared = models):
+
+		k.update(slopes)
+
+	#convert measured d13C to ratio and calculate mass fractions
+	R13 = [(np.asarray(d13C[n], dtype = float)/1000 + 1) for n in names]
+	f = [np.asarray(m[n], dtype = float)/np.sum(m[n]) for n in names]
+	k = [k[n] for n in names]
+
+	#define function for mass-weighted corrected d13C of each sample
+	def _d13C_wgh(DE):
+		return np.array([np.sum(fi*(Ri/(1 + DE*ki) - 1)*1000)
+			for fi, Ri, ki in zip(f, R13, k)])
+
+	#define weighted residual function
+	def _resid(x):
+		return (_d13C_wgh(x[0]) - bulk[:,0])/bulk[:,1]
+
+	res = least_squares(_resid, [DE0], x_scale = [DE0], method = 'lm')
+
+	DE = res.x[0]
+
+	#calculate uncertainty from curvature of weighted misfit
+	J = res.jac
+	DE_std = np.linalg.inv(np.dot(J.T, J))[0,0]**0.5
+
+	#store summary
+	d13C_corr = _d13C_wgh(DE)
+
+	cal_info = pd.DataFrame(
+		{'d13C_wgh_raw': _d13C_wgh(0),
+		'd13C_wgh_corr': d13C_corr,
+		'bulk_d13C_true': bulk[:,0],
+		'resid': d13C_corr - bulk[:,0]},
+		index = names,
+		columns = ['d13C_wgh_raw', 'd13C_wgh_corr', 'bulk_d13C_true', 'resid'])
+
+	return DE, DE_std, cal_info
+
+#define function to jointly invert several RPO runs of the same sample
+def inverse_model_multi(
+	timedatas,
+	E_max = 350,
+	E_min = 50,
+	lam = 1.0,
+	log10omega = 10,
+	log10omega_search = None,
+	nE = 250,
+	processes = None):
+	'''
+	Generates a single energy complex by jointly inverting several
+	``rp.RpoThermogram`` instances of the same sample, *e.g.* run at
+	different ramp rates, optionally searching for the best-fit `log10omega`.
+
+	Parameters
+	----------
+	timedatas : list
+		List of ``rp.RpoThermogram`` instances to invert.
+
+	E_max : int
+		The maximum activation energy value to consider, in kJ/mol.
+		Defaults to 350.
+
+	E_min : int
+		The minimum activation energy value to consider, in kJ/mol.
+		Defaults to 50.
+
+	lam : scalar
+		Smoothing weighting factor for Tikhonov regularization. Defaults to
+		1.0.
+
+	log10omega : scalar, array-like, or lambda function
+		Arrhenius pre-exponential factor, either a constant value, array-
+		like with length `nE`, or a lambda function of E. Only used if
+		`log10omega_search` is `None`. Defaults to 10.
+
+	log10omega_search : None or array-like
+		If not `None`, array of constant `log10omega` values to search. The
+		value resulting in the lowest residual RMSE is further refined
+		between its neighbors. Defaults to `None`.
+
+	nE : int
+		The number of activation energy points. Defaults to 250.
+
+	processes : None or int
+		Number of worker processes used to calculate the temperature integral
+		of each run. If `None`, uses the number of CPUs. If 1, runs in the
+		current process. Defaults to `None`.
+
+	Returns
+	-------
+	ec : rp.EnergyComplex
+		``rp.EnergyComplex`` instance containing the p(0,E) shared by all
+		runs. `resid` is the residual RMSE of all runs.
+
+	daems : list
+		List of the ``rp.Daem`` instance of each run, using the inputted or
+		best-fit `log10omega`.
+
+	Raises
+	------
+	ScalarError
+		If `lam` is not int or float.
+
+	LengthError
+		If `log10omega_search` contains fewer than 2 values.
+
+	See Also
+	--------
+	EnergyComplex.inverse_model
+		Classmethod for inverting a single ``rp.RpoThermogram`` instance.
+
+	Examples
+	--------
+	Jointly inverting runs at 5 and 20 K/min and searching `log10omega`::
+
+		#import modules
+		import numpy as np
+		import rampedpyrox as rp
+
+		tgs = [rp.RpoThermogram.from_csv(f) for f in ['5K_all_data.csv',
+			'20K_all_data.csv']]
+
+		ec, daems = rp.inverse_model_multi(
+			tgs,
+			log10omega_search = np.linspace(7, 13, 25))
+
+		print(daems[0].log10omega[0])
+
+	Notes
+	-----
+	Since the temperature integral of each run does not depend on
+	`log10omega`, it is calculated once per run, in parallel, and reused for
+	every searched value; each value then only requires one exponential per
+	run and a single stacked NNLS inversion. A single run cannot distinguish
+	`log10omega` from a shift in E, so searching requires runs with
+	different temperature programs.
+
+	References
+	----------
+	[1] D.C. Forney and D.H. Rothman (2012) Inverse method for calculating
+		respiration rates from decay time series. *Biogeosciences*, **9**,
+		3601-3612.
+
+	[2] J.D. Hemingway et al. (2017) Assessing the blank carbon contribution,
+		isotope mass balance, and kinetic isotope fractionation of the ramped
+		pyrolysis/oxidation instrument at NOSAMS. **Radiocarbon**
+	'''
+
+	#import scipy on first use
+	from scipy.optimize import minimize_scalar
+
+	if not isinstance(lam, (int, float)):
+		raise ScalarError(
+			'lam must be int or float')
+
+	#calculate E and temperature integrals of each run, in parallel
+	E = np.linspace(E_min, E_max, nE)
+
+	jobs = [(E, td.t, td.T) for td in timedatas]
+	Is = _map_jobs(_calc_I_job, jobs, processes)
+	gs = [td.g for td in timedatas]
+
+	#search log10omega if necessary
+	if log10omega_search is not None:
+
+		vals = np.sort(np.asarray(log10omega_search, dtype = float))
+
+		if len(vals) < 2:
+			raise LengthError(
+				'log10omega_search must contain at least 2 values')
+
+		#define function for residual RMSE of a constant log10omega
+		def _resid(x):
+			return _rpo_calc_p_multi(E, x, Is, gs, lam)[1]
+
+		resids = [_resid(x) for x in vals]
+		i = np.argmin(resids)
+
+		#refine between neighbors
+		res = minimize_scalar(
+			_resid,
+			bounds = (vals[max(i - 1, 0)], vals[min(i + 1, len(vals) - 1)]),
+			method = 'bounded')
+
+		log10omega = res.x if res.fun < resids[i] else vals[i]
+
+	elif hasattr(log10omega, '__call__'):
+		log10omega = log10omega(E)
+
+	#invert all runs jointly
+	p, resid, rgh = _rpo_calc_p_multi(E, log10omega, Is, gs, lam)
+
+	#create class instances, reusing temperature integrals
+	ec = EnergyComplex(E, p = p)
+
+	ec.input_estimated(
+		lam = float(lam),
+		resid = resid,
+		rgh = rgh)
+
+	daems = [Daem(E, log10omega, td.t, td.T, I = I)
+		for td, I in zip(timedatas, Is)]
+
+	return ec, daems
+
+#define function to load a directory of RPO thermogram and isotope files
+def load_rpo_batch(
+	path,
+	bl_subtract = True,
+	engine = None,
+	iso_suffix = '_isotopes.csv',
+	mass_err = 0.01,
+	nt = 250,
+	processes = None,
+	tg_suffix = '_all_data.csv'):
+	'''
+	Loads all RPO thermogram and isotope files in a directory (or matching a
+	glob pattern) in parallel, pairing files by sample name. Errors are
+	collected per file rather than raised.
+
+	Parameters
+	----------
+	path : str
+		Directory or glob pattern (*e.g.* 'campaign/*.csv') containing the
+		files to load.
+
+	bl_subtract : Boolean
+		Tells the program whether or not to linearly subtract the baseline
+		from each thermogram. Defaults to `True`.
+
+	engine : None or str
+		If not `None`, reads files in fast mode using the given parser engine
+		('c' or 'pyarrow'). See ``rp.RpoThermogram.from_csv``. Defaults to
+		`None`.
+
+	iso_suffix : str
+		Filename suffix identifying isotope files. Defaults to
+		'_isotopes.csv'.
+
+	mass_err : float
+		Relative standard deviation on fraction masses, used to check that
+		isotope files are valid. Defaults to 0.01.
+
+	nt : int
+		The number of time points to use for each thermogram. Defaults to 250.
+
+	processes : None or int
+		Number of worker processes. If `None`, uses the number of CPUs. If 1,
+		files are loaded in the current process. Defaults to `None`.
+
+	tg_suffix : str
+		Filename suffix identifying thermogram files. Defaults to
+		'_all_data.csv'.
+
+	Returns
+	-------
+	tgs : dict
+		Dictionary mapping sample names to ``rp.RpoThermogram`` instances.
+
+	isos : dict
+		Dictionary mapping sample names to ``pd.DataFrame`` instances
+		containing the isotope data, which can be passed directly to
+		``rp.RpoIsotopes.from_csv`` without re-reading the file.
+
+	errors : dict
+		Dictionary mapping the path of each file that could not be loaded to
+		the raised exception.
+
+	Raises
+	------
+	FileError
+		If `path` is not a directory and matches no files.
+
+	See Also
+	--------
+	RpoThermogram.from_csv
+		Classmethod for creating a single ``rp.RpoThermogram`` instance.
+
+	RpoIsotopes.from_csv
+		Classmethod for creating a single ``rp.RpoIsotopes`` instance.
+
+	Examples
+	--------
+	Loading a campaign directory and creating isotope results for each
+	sample with a thermogram and isotope file::
+
+		#import modules
+		import rampedpyrox as rp
+
+		#load all files
+		tgs, isos, errors = rp.load_rpo_batch(
+			'campaign/',
+			processes = 4)
+
+		for name, tg in tgs.items():
+			daem = rp.Daem.from_timedata(tg)
+			ec = rp.EnergyComplex.inverse_model(daem, tg)
+
+			if name in isos:
+				ri = rp.RpoIsotopes.from_csv(isos[name], daem, ec)
+
+	Notes
+	-----
+	Sample names are file names with the suffix removed, *e.g.*
+	'sample_1_all_data.csv' and 'sample_1_isotopes.csv' are both paired to
+	'sample_1'. Files matching neither suffix are ignored.
+
+	When using multiple processes on platforms that spawn rather than fork
+	(*e.g.* Windows), calls must be protected by an
+	``if __name__ == '__main__':`` block.
+	'''
+
+	tg_files, iso_files = _find_rpo_files(path, tg_suffix, iso_suffix)
+
+	#make job list
+	tg_kw = {'bl_subtract': bl_subtract, 'engine': engine, 'nt': nt}
+	iso_kw = {'engine': engine, 'mass_err': mass_err}
+
+	jobs = [('tg', n, f, tg_kw) for n, f in tg_files.items()] + \
+		[('iso', n, f, iso_kw) for n, f in iso_files.items()]
+
+	#load files and collect results
+	tgs = {}
+	isos = {}
+	errors = {}
+
+	for kind, name, file, res, err in _map_jobs(
+		_load_rpo_file, jobs, processes):
+
+		if err is not None:
+			errors[file] = err
+
+		elif kind == 'tg':
+			tgs[name] = res
+
+		else:
+			isos[name] = res
+
+	return tgs, isos, errors
+
+#define function to load isotopes of many samples from a single table
+def load_rpo_isotopes(
+	file,
+	models,
+	ratedatas,
+	blk_corr = False,
+	blk_d13C = (-29.0, 0.1),
+	blk_flux = (0.375, 0.0583),
+	blk_Fm =  (0.555, 0.042),
+	bulk_d13C_true = None,
+	DE = 0.0018,
+	kie_method = 'shift',
+	mass_err = 0.01,
+	sample_col = 'sample'):
+	'''
+	Loads RPO fraction data for many samples from a single long table and
+	creates an ``rp.RpoIsotopes`` instance for each sample.
+
+	Parameters
+	----------
+	file : str or pd.DataFrame
+		Table containing RPO isotope data of all samples, either as a string
+		pointing to a .csv file or as a ``pd.DataFrame`` instance. Rows of
+		each sample must be in the format required by
+		``RpoIsotopes.from_csv``, with an additional column containing the
+		sample ID.
+
+	models : rp.Model or dict
+		``rp.Model`` instance to use for all samples, or dictionary mapping
+		sample IDs to ``rp.Model`` instances.
+
+	ratedatas : rp.RateData or dict
+		``rp.RateData`` instance to use for all samples, or dictionary mapping
+		sample IDs to ``rp.RateData`` instances.
+
+	blk_corr : Boolean
+		Tells the method whether or not to blank-correct isotope data. If
+		`True`, blank-corrects according to inputted blank composition values
+		and, for samples in `bulk_d13C_true`, further corrects d13C values to
+		ensure isotope mass balance. Defaults to `False`.
+
+	blk_d13C : tuple
+		Tuple of the blank d13C composition (VPDB), in the form 
+		(mean, stdev.). Defaults to the NOSAMS RPO blank as calculated by
+		Hemingway et al., Radiocarbon **2017**.
+
+	blk_flux : tuple
+		Tuple of the blank flux (ng/s), in the form (mean, stdev.). Defaults
+		to the NOSAMS RPO blank as calculated by Hemingway et al., Radiocarbon
+		**2017**.
+
+	blk_Fm : tuple
+		Tuple of the blank Fm value, in the form (mean, stdev.). Defaults to
+		the NOSAMS RPO blank as calculated by Hemingway et al., Radiocarbon
+		**2017**.
+
+	bulk_d13C_true : None or dict
+		Dictionary mapping sample IDs to the true measured bulk d13C value
+		(VPDB), in the form [mean, stdev.]. Samples not in `bulk_d13C_true`
+		are not mass-balance corrected. Defaults to `None`.
+
+	DE : None or scalar
+		Value for the difference in E between 12C- and 13C-containing
+		atoms, in kJ. If `None`, d13C values are not corrected for kinetic
+		fractionation. Defaults to 0.0018.
+
+	kie_method : str
+		How to calculate the transform for 13C-containing atoms. See
+		``RpoIsotopes.kie_correct``. Defaults to 'shift'.
+
+	mass_err : float
+		Relative uncertainty in mass measurements. Defaults to 0.01 (i.e. 1
+		percent relative uncertainty).
+
+	sample_col : str
+		Name of the column containing sample IDs. Defaults to 'sample'.
+
+	Returns
+	-------
+	ris : dict
+		Dictionary mapping sample IDs to ``rp.RpoIsotopes`` instances, in the
+		order in which samples first appear in `file`.
+
+	ri_info : pd.DataFrame
+		Combined fraction info of all samples, indexed by sample ID and
+		fraction number. Contains corrected values if any correction was
+		applied and raw values otherwise.
+
+	Raises
+	------
+	FileError
+		If `file` is not str or ``pd.DataFrame``.
+
+	FileError
+		If `file` does not contain `sample_col` column.
+
+	FileError
+		If the rows of any sample are not in the right format (see
+		``RpoIsotopes.from_csv``).
+
+	FileError
+		If no sample in `file` has a corresponding model and ratedata.
+
+	Warnings
+	--------
+	UserWarning
+		If a sample in `file` has no corresponding model or ratedata, in which
+		case it is skipped.
+
+	See Also
+	--------
+	RpoIsotopes.from_csv
+		Classmethod for creating a single ``rp.RpoIsotopes`` instance.
+
+	Examples
+	--------
+	Loading a campaign table, with a thermogram file for each sample::
+
+		#import modules
+		import rampedpyrox as rp
+
+		daems = {}
+		ecs = {}
+
+		for name in ['s1', 's2', 's3']:
+			tg = rp.RpoThermogram.from_csv(name + '_all_data.csv')
+			daems[name] = rp.Daem.from_timedata(tg)
+			ecs[name] = rp.EnergyComplex.inverse_model(daems[name], tg)
+
+		ris, ri_info = rp.load_rpo_isotopes(
+			'campaign_isotopes.csv',
+			daems,
+			ecs,
+			blk_corr = True,
+			bulk_d13C_true = {'s1': [-24.9, 0.1]})
+
+	Notes
+	-----
+	`file` is read once and split into samples in a single pass. Blank and
+	mass-balance corrections do not depend on the model and are calculated
+	for the fractions of all samples at once; only kinetic fractionation
+	corrections are calculated for each sample separately. Results are
+	identical to calling ``RpoIsotopes.from_csv`` for each sample.
+
+	References
+	----------
+	[1] J.D. Hemingway et al. (2017) Assessing the blank carbon
+		contribution, isotope mass balance, and kinetic isotope 
+		fractionation of the ramped pyrolysis/oxidation instrument at 
+		NOSAMS. *Radiocarbon*, **59**, 179-193.
+	'''
+
+	#import file as a pd.DataFrame if inputted as a string path
+	if isinstance(file, str):
+		file = pd.read_csv(
+			file,
+			index_col = 0,
+			parse_dates = True)
+
+	elif not isinstance(file, pd.DataFrame):
+		raise FileError(
+			'file must be pd.DataFrame or path string')
+
+	if sample_col not in file.columns:
+		raise FileError(
+			'file must have %r column' % sample_col)
+
+	#extract data of each sample, grouping in a single pass
+	names = []
+	data = []
+
+	for name, rows in file.groupby(sample_col, sort = False):
+
+		if (isinstance(models, dict) and name not in models) or \
+			(isinstance(ratedatas, dict) and name not in ratedatas):
+			warnings.warn(
+				'No model or ratedata for sample %r, skipping' % name,
+				UserWarning)
+
+			continue
+
+		#drop isotope columns with no measured fractions in this sample, so
+		# that, e.g., samples without Fm are treated as in from_csv
+		rows = rows.drop(sample_col, axis = 1)
+		empty = [c for c in ['d13C', 'Fm'] if c in rows.columns and
+			rows[c][2:].isnull().all()]
+
+		rows = rows.drop(empty + [c + '_std' for c in empty], axis = 1,
+			errors = 'ignore')
+
+		names.append(name)
+		data.append(_rpo_extract_iso(rows, mass_err))
+
+	if not names:
+		raise FileError(
+			'no sample in file has a corresponding model and ratedata')
+
+	#concatenate each data type across all samples, filling values missing
+	# from some samples (e.g. Fm) with NaN
+	nF = [len(d[6]) for d in data]
+	ind = np.append(0, np.cumsum(nF))
+	groups = np.repeat(np.arange(len(names)), nF)
+
+	has = [[di[j] is not None for di in data] for j in range(6)]
+	raw = []
+
+	for j in range(6):
+
+		if not any(has[j]):
+			raw.append(None)
+
+		else:
+			raw.append(np.concatenate([di[j] if di[j] is not None
+				else np.full(n, np.nan) for di, n in zip(data, nF)]))
+
+	t = np.concatenate([d[6] for d in data])
+
+	#blank- and mass-balance correct all samples at once if necessary
+	if blk_corr is True:
+		d13C, d13C_std, Fm, Fm_std, m, m_std = _rpo_blk_corr(
+			*raw,
+			t = t,
+			blk_d13C = blk_d13C,
+			blk_flux = blk_flux,
+			blk_Fm = blk_Fm)
+
+		if bulk_d13C_true is not None and d13C is not None:
+			bulk = np.array([bulk_d13C_true.get(n, [np.nan, np.nan])
+				for n in names], dtype = float)
+
+			d13C, d13C_std = _rpo_mass_bal_corr_grouped(
+				d13C,
+				d13C_std,
+				m,
+				m_std,
+				groups,
+				bulk)
+
+		corr = [d13C, d13C_std, Fm, Fm_std, m, m_std]
+
+	#create RpoIsotopes instances
+	ris = {}
+	info = {}
+
+	for i, name in enumerate(names):
+
+		sl = slice(ind[i], ind[i+1])
+
+		#slice values, keeping values missing from this sample as None
+		def _sl(vals):
+			return [None if v is None or not has[j][i] else v[sl]
+				for j, v in enumerate(vals)]
+
+		raw_i = _sl(raw)
+
+		model = models[name] if isinstance(models, dict) else models
+		ratedata = ratedatas[name] if isinstance(ratedatas, dict) \
+			else ratedatas
+
+		ri = RpoIsotopes(
+			model,
+			ratedata,
+			t[sl],
+			d13C_raw = raw_i[0],
+			d13C_raw_std = raw_i[1],
+			Fm_raw = raw_i[2],
+			Fm_raw_std = raw_i[3],
+			m_raw = raw_i[4],
+			m_raw_std = raw_i[5])
+
+		#store blank-corrected values
+		if blk_corr is True:
+			ri._blk_corr = True
+			ri._mb_corr = bulk_d13C_true is not None and \
+				name in bulk_d13C_true
+
+			ri._store_corr(*_sl(corr))
+
+		#kinetic fractionation correct if necessary
+		if DE is not None:
+			ri.kie_correct(model, ratedata, DE = DE, method = kie_method)
+
+		ris[name] = ri
+
+		if hasattr(ri, 'ri_corr_info'):
+			info[name] = ri.ri_corr_info
+
+		else:
+			info[name] = ri.ri_raw_info
+
+	#combine summary tables
+	ri_info = pd.concat(info, names = ['sample', 'fraction'], sort = False)
+
+	return ris, ri_info
@@ -0,0 +1,311 @@
+'''
+This module contains helper functions for loading and processing batches of
+rampedpyrox data files.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+__docformat__ = 'restructuredtext en'
+__all__ = ['_calc_I_job',
+			'_find_rpo_files',
+			'_kie_slope_job',
+			'_load_rpo_file',
+			'_map_jobs',
+			]
+
+import glob
+import multiprocessing
+import numpy as np
+import os
+
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pandas on first use
+pd = _lazy_import('pandas')
+
+#import SharedArrays
+from .shared import(
+	SharedArrays,
+	)
+
+#import exceptions
+from .exceptions import(
+	FileError,
+	)
+
+#import helper functions
+from .io_helper import(
+	_read_csv_fast,
+	)
+
+from .model_helper import(
+	_rpo_calc_dAdE,
+	_rpo_calc_I,
+	)
+
+from .results_helper import(
+	_calc_cutoff,
+	_rpo_extract_iso,
+	)
+
+#define worker function to calculate the temperature integral of a run
+def _calc_I_job(job):
+	'''
+	Calculates the cumulative temperature integral of a single RPO run.
+
+	Parameters
+	----------
+	job : tuple
+		Tuple of (E, t, T).
+
+	Returns
+	-------
+	I : np.ndarray
+		2d array of the cumulative temperature integral, in seconds. Shape
+		[`nt` x `nE`].
+	'''
+
+	E, t, T = job
+
+	return _rpo_calc_I(E, t, T)
+
+#define function to find and pair thermogram and isotope files
+def _find_rpo_files(path, tg_suffix, iso_suffix):
+	'''
+	Finds all thermogram and isotope files in a directory or matching a glob
+	pattern and pairs them by sample name.
+
+	Parameters
+	----------
+	path : str
+		Directory or glob pattern (*e.g.* 'campaign/*.csv').
+
+	tg_suffix : str
+		Filename suffix identifying thermogram files.
+
+	iso_suffix : str
+		Filename suffix identifying isotope files.
+
+	Returns
+	-------
+	tg_files : dict
+		Dictionary mapping sample names to thermogram file paths.
+
+	iso_files : dict
+		Dictionary mapping sample names to isotope file paths.
+
+	Raises
+	------
+	FileError
+		If `path` is not a directory and matches no files.
+
+	Notes
+	-----
+	Sample names are file names with the suffix removed, *e.g.*
+	'sample_1_all_data.csv' and 'sample_1_isotopes.csv' are both paired to
+	'sample_1'. Files matching neither suffix are ignored.
+	'''
+
+	if os.path.isdir(path):
+		files = glob.glob(os.path.join(path, '*'))
+
+	else:
+		files = glob.glob(path)
+
+		if not files:
+			raise FileError(
+				'path %r is not a directory and matches no files' % path)
+
+	tg_files = {}
+	iso_files = {}
+
+	for f in sorted(files):
+		base = os.path.basename(f)
+
+		if base.endswith(tg_suffix):
+			tg_files[base[:-len(tg_suffix)]] = f
+
+		elif base.endswith(iso_suffix):
+			iso_files[base[:-len(iso_suffix)]] = f
+
+	return tg_files, iso_files
+
+#define worker function to load a single thermogram or isotope file
+def _load_rpo_file(job):
+	'''
+	Loads a single thermogram or isotope file, returning any raised exception
+	instead of raising it so that it can be collected by the parent process.
+
+	Parameters
+	----------
+	job : tuple
+		Tuple of (kind, name, file, kwargs), where kind is either 'tg' or
+		'iso' and kwargs are passed to the corresponding reader.
+
+	Returns
+	-------
+	kind : str
+		Either 'tg' or 'iso'.
+
+	name : str
+		Sample name.
+
+	file : str
+		Path to the loaded file.
+
+	result : None, rp.RpoThermogram or pd.DataFrame
+		Loaded thermogram or isotope table, `None` if loading failed.
+
+	error : None or Exception
+		Exception raised while loading, `None` if loading succeeded.
+	'''
+
+	#import here to avoid circular imports
+	from .timedata import RpoThermogram
+
+	kind, name, file, kw = job
+
+	try:
+		if kind == 'tg':
+			result = RpoThermogram.from_csv(file, **kw)
+
+		else:
+			engine = kw.get('engine')
+
+			if engine is None:
+				result = pd.read_csv(file, index_col = 0, parse_dates = True)
+
+			else:
+				result = _read_csv_fast(
+					file,
+					['fraction', 'ug_frac', 'd13C', 'd13C_std', 'Fm', 'Fm_std'],
+					engine = engine)
+
+			#check that the table can be used to create RpoIsotopes
+			_rpo_extract_iso(result, kw['mass_err'])
+
+	except Exception as e:
+		return kind, name, file, None, e
+
+	return kind, name, file, result, None
+
+#define worker function to calculate the KIE slope of each fraction
+def _kie_slope_job(job):
+	'''
+	Calculates, for every sample sharing a single model, the slope `k` of the
+	first-order KIE of each fraction, such that ``kie = 1 + DE*k``.
+
+	Parameters
+	----------
+	job : tuple
+		Tuple of (model, members), where model is either the ``rp.Model``
+		instance shared by all members or a tuple of (E, log10omega, t, T)
+		from which to build an ``rp.Daem`` instance, and members is a list of
+		(name, ratedata, result) tuples.
+
+	Returns
+	-------
+	slopes : list
+		List of (name, k) tuples, where k is an array of length `nFrac`.
+
+	Notes
+	-----
+	Using the first-order transform ``A + DE*dA/dE`` (*i.e.* the 'linear'
+	method of ``_rpo_kie_corr``), the ratio of 13C to 12C rates is
+	``1 + DE*dg/dtg12``, with ``g = dA/dE*p``. The rate-weighted KIE of each
+	fraction is therefore exactly linear in DE, and `dA/dE` only needs to be
+	calculated once per model.
+	'''
+
+	#import here to avoid circular imports
+	from .model import Daem
+
+	model, members = job
+
+	#build the model in the worker rather than sending its A matrix
+	if isinstance(model, tuple):
+		model = Daem(*model, keep_I = True)
+
+	#get temperature integral, recalculating if not stored
+	I = getattr(model, '_I', None)
+
+	if I is None:
+		I = _rpo_calc_I(model.E, model.t, model.T)
+
+	#calculate derivative of A once for all members
+	dAdE = _rpo_calc_dAdE(model.A, model.log10omega, model.t, model.T, I)
+
+	slopes = []
+
+	for name, ratedata, result in members:
+
+		#calculate 12C thermogram and its derivative with respect to DE
+		p = ratedata.p
+		w = -np.gradient(np.dot(model.A, p))
+		v = -np.gradient(np.dot(dAdE, p))
+
+		#calculate cutoff indices
+		ind_min, ind_max = _calc_cutoff(result, model)
+
+		#sum each over the fraction, using cumulative sums
+		cw = np.append(0, np.cumsum(w))
+		cv = np.append(0, np.cumsum(v))
+
+		k = (cv[ind_max] - cv[ind_min])/(cw[ind_max] - cw[ind_min])
+
+		slopes.append((name, k))
+
+	return slopes
+
+#define function to map a worker over jobs with an optional process pool
+def _map_jobs(func, jobs, processes, shared = ()):
+	'''
+	Applies `func` to each job, in parallel if `processes` is not 1.
+
+	Parameters
+	----------
+	func : function
+		Picklable, module-level function taking a single job.
+
+	jobs : list
+		List of jobs.
+
+	processes : None or int
+		Number of worker processes. If `None`, uses the number of CPUs. If 1,
+		jobs are run in the current process.
+
+	shared : list
+		List of ``rp.Model`` or ``rp.TimeData`` instances contained in `jobs`
+		whose arrays are sent to worker processes through shared memory
+		rather than copied. Defaults to an empty list.
+
+	Returns
+	-------
+	results : list
+		List of results, in the same order as `jobs`.
+	'''
+
+	if processes is None:
+		processes = multiprocessing.cpu_count()
+
+	processes = min(processes, len(jobs))
+
+	if processes <= 1:
+		return [func(job) for job in jobs]
+
+	with SharedArrays(*shared):
+		pool = multiprocessing.Pool(processes)
+
+		try:
+			results = pool.map(func, jobs, chunksize = 1)
+
+		finally:
+			pool.close()
+			pool.join()
+
+	return results
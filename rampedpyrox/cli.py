@@ -0,0 +1,289 @@
+'''
+This module contains the command-line batch processor, which runs the full
+Ramped PyrOx analysis chain over many samples.
+
+For each sample, thermograms are imported with ``rp.RpoThermogram.from_csv``,
+inverted with ``rp.EnergyComplex.inverse_model`` using a shared
+``rp.Daem`` instance, forward modeled, and, if an isotope file exists,
+combined with isotope data using ``rp.RpoIsotopes.from_csv``.
+
+Run from the command line::
+
+	rampedpyrox config.json
+
+	#or, equivalently
+	python -m rampedpyrox config.json -p 4
+
+An example config file, with paths relative to the config file::
+
+	{
+		"path": "campaign/",
+		"samples": {
+			"sample_x": {
+				"thermogram": "other/sample_x_all_data.csv",
+				"isotopes": "other/sample_x_isotopes.csv",
+				"bulk_d13C_true": [-25.0, 0.1]
+			}
+		},
+		"output": "results/",
+		"processes": 4,
+		"thermogram": {"nt": 250},
+		"model": {"log10omega": 10, "E_max": 350, "E_min": 50, "nE": 250},
+		"inverse_model": {"lam": "auto"},
+		"isotopes": {"blk_corr": true, "DE": 0.0018}
+	}
+
+All thermogram and isotope files in `path` are paired by sample name (see
+``rp.load_rpo_batch``), and any `samples` are added. The `thermogram`,
+`model`, `inverse_model`, and `isotopes` sections are passed as keyword
+arguments to the corresponding method.
+
+Results of each sample are checkpointed to `output`/samples/<key>/<name>.npz
+and loaded with ``rp.load_archive``, where <key> is a hash of the
+`thermogram`, `model`, `inverse_model`, and `isotopes` sections. Samples with
+an existing checkpoint for the current settings are skipped, so interrupted
+runs resume where they stopped, while changing any of these sections re-runs
+all samples. Models are cached in
+`output`/models and shared by all samples with identical time-temperature
+histories. Summary tables are written to `output`/sample_info.csv and
+`output`/frac_info.csv, and failed samples to `output`/errors.csv.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+__docformat__ = 'restructuredtext en'
+__all__ = ['main', 'run_config']
+
+import argparse
+import os
+import sys
+
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pandas on first use
+pd = _lazy_import('pandas')
+
+#import helper functions
+from .batch_helper import(
+	_load_rpo_file,
+	_map_jobs,
+	)
+
+from .cli_helper import(
+	_build_model_job,
+	_config_key,
+	_find_samples,
+	_model_key,
+	_read_config,
+	_run_sample_job,
+	_summarize_samples,
+	)
+
+#define function to run a batch config
+def run_config(
+	config,
+	output = None,
+	overwrite = False,
+	processes = None,
+	verbose = False):
+	'''
+	Runs the full analysis chain for every sample in a batch config file.
+
+	Parameters
+	----------
+	config : str
+		Path to the JSON config file. See the ``rampedpyrox.cli`` module
+		documentation for the format.
+
+	output : None or str
+		If not `None`, overrides the output directory in `config`. Defaults
+		to `None`.
+
+	overwrite : Boolean
+		If `True`, re-runs samples that already have a checkpoint for the
+		current settings. Defaults to `False`.
+
+	processes : None or int
+		If not `None`, overrides the number of worker processes in `config`.
+		Defaults to `None`.
+
+	verbose : Boolean
+		If `True`, prints progress. Defaults to `False`.
+
+	Returns
+	-------
+	sample_info : pd.DataFrame
+		Table of thermogram, fit, and energy complex summary info, one row
+		per successfully processed sample.
+
+	frac_info : pd.DataFrame
+		Table of fraction isotope info, indexed by sample and fraction.
+
+	errors : dict
+		Dictionary mapping sample names to the exception raised while
+		processing them.
+
+	Raises
+	------
+	FileError
+		If `config` cannot be read or contains unknown keys.
+
+	Notes
+	-----
+	When using multiple processes on platforms that spawn rather than fork
+	(*e.g.* Windows), calls must be protected by an
+	``if __name__ == '__main__':`` block.
+	'''
+
+	cfg = _read_config(config)
+
+	if output is not None:
+		cfg['output'] = output
+
+	if processes is None:
+		processes = cfg['processes']
+
+	def _log(msg):
+		if verbose:
+			print(msg)
+
+	#make output directories; checkpoints are kept separately for each set of
+	# analysis settings so that changed settings are never mixed with stale
+	# results
+	out = cfg['output']
+	sam_dir = os.path.join(out, 'samples', _config_key(cfg))
+	mod_dir = os.path.join(out, 'models')
+
+	for d in [sam_dir, mod_dir]:
+		if not os.path.isdir(d):
+			os.makedirs(d)
+
+	samples = _find_samples(cfg)
+	ckpts = {n: os.path.join(sam_dir, n + '.npz') for n in samples}
+	errors = {}
+
+	todo = [n for n in sorted(samples)
+		if overwrite or not os.path.exists(ckpts[n])]
+
+	_log('%d samples, %d to run' % (len(samples), len(todo)))
+
+	#import thermograms
+	jobs = [('tg', n, samples[n]['thermogram'], cfg['thermogram'])
+		for n in todo]
+
+	tgs = {}
+
+	for _, name, _, tg, err in _map_jobs(_load_rpo_file, jobs, processes):
+
+		if err is not None:
+			errors[name] = err
+
+		else:
+			tgs[name] = tg
+
+	#build each shared model once, skipping cached models
+	keys = {n: _model_key(tg, cfg['model']) for n, tg in tgs.items()}
+	mods = {k: os.path.join(mod_dir, k + '.npz') for k in keys.values()}
+
+	first = {}
+
+	for name in sorted(keys):
+		first.setdefault(keys[name], name)
+
+	jobs = [(tgs[n], cfg['model'], mods[k]) for k, n in sorted(first.items())
+		if not os.path.exists(mods[k])]
+
+	_log('%d models, %d to build' % (len(mods), len(jobs)))
+
+	failed = {}
+
+	for file, err in _map_jobs(_build_model_job, jobs, processes):
+
+		if err is not None:
+			failed[file] = err
+
+	#run each sample
+	jobs = []
+
+	for name in sorted(tgs):
+		mf = mods[keys[name]]
+
+		if mf in failed:
+			errors[name] = failed[mf]
+			continue
+
+		jobs.append((name, tgs[name], mf, samples[name],
+			cfg['inverse_model'], cfg['isotopes'], ckpts[name]))
+
+	for name, err in _map_jobs(_run_sample_job, jobs, processes):
+
+		if err is not None:
+			errors[name] = err
+
+		else:
+			_log('finished %s' % name)
+
+	#summarize all completed samples, including those from previous runs
+	done = {n: f for n, f in ckpts.items()
+		if n not in errors and os.path.exists(f)}
+
+	sample_info, frac_info = _summarize_samples(done)
+
+	sample_info.to_csv(os.path.join(out, 'sample_info.csv'))
+	frac_info.to_csv(os.path.join(out, 'frac_info.csv'))
+
+	err_file = os.path.join(out, 'errors.csv')
+
+	if errors:
+		pd.DataFrame(
+			[[type(e).__name__, str(e)] for e in errors.values()],
+			index = pd.Index(list(errors), name = 'sample'),
+			columns = ['error', 'message']).sort_index().to_csv(err_file)
+
+	elif os.path.exists(err_file):
+		os.remove(err_file)
+
+	return sample_info, frac_info, errors
+
+#define command-line entry point
+def main(argv = None):
+	'''
+	Command-line entry point. Parses `argv` (defaults to ``sys.argv[1:]``),
+	runs the config, and returns the exit code: 0 if all samples succeeded,
+	1 otherwise.
+	'''
+
+	parser = argparse.ArgumentParser(
+		prog = 'rampedpyrox',
+		description = 'Run the Ramped PyrOx analysis chain over many samples.')
+
+	parser.add_argument('config',
+		help = 'JSON config file')
+	parser.add_argument('-o', '--output', default = None,
+		help = 'output directory, overriding the config')
+	parser.add_argument('-p', '--processes', type = int, default = None,
+		help = 'number of worker processes, overriding the config')
+	parser.add_argument('--overwrite', action = 'store_true',
+		help = 're-run samples that already have a checkpoint')
+	parser.add_argument('-q', '--quiet', action = 'store_true',
+		help = 'do not print progress')
+
+	args = parser.parse_args(argv)
+
+	_, _, errors = run_config(
+		args.config,
+		output = args.output,
+		overwrite = args.overwrite,
+		processes = args.processes,
+		verbose = not args.quiet)
+
+	for name, err in sorted(errors.items()):
+		print('%s failed: %s: %s' % (name, type(err).__name__, err),
+			file = sys.stderr)
+
+	return 1 if errors else 0
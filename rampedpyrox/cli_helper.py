@@ -0,0 +1,409 @@
+'''
+This module contains helper functions for the rampedpyrox command-line batch
+processor.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+__docformat__ = 'restructuredtext en'
+__all__ = ['_CONFIG_DEFAULTS',
+			'_build_model_job',
+			'_config_key',
+			'_find_samples',
+			'_model_key',
+			'_read_config',
+			'_run_sample_job',
+			'_summarize_samples',
+			]
+
+import copy
+import hashlib
+import json
+import os
+
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pandas on first use
+pd = _lazy_import('pandas')
+
+#import exceptions
+from .exceptions import(
+	FileError,
+	)
+
+#import helper functions
+from .batch_helper import(
+	_find_rpo_files,
+	)
+
+from .io_helper import(
+	_replace_file,
+	)
+
+#default config values; sections are passed as keyword arguments to the
+# corresponding rampedpyrox method
+_CONFIG_DEFAULTS = {
+	'samples': {},
+	'path': None,
+	'tg_suffix': '_all_data.csv',
+	'iso_suffix': '_isotopes.csv',
+	'output': 'rpo_output',
+	'processes': None,
+	'thermogram': {
+		'bl_subtract': True,
+		'nt': 250,
+		},
+	'model': {
+		'E_max': 350,
+		'E_min': 50,
+		'log10omega': 10,
+		'nE': 250,
+		},
+	'inverse_model': {
+		'lam': 'auto',
+		},
+	'isotopes': {
+		'blk_corr': False,
+		'DE': 0.0018,
+		'mass_err': 0.01,
+		},
+	}
+
+#define function to read and check a batch config file
+def _read_config(file):
+	'''
+	Reads a JSON batch config file, fills in defaults, and resolves all paths
+	relative to the config file directory.
+
+	Parameters
+	----------
+	file : str
+		Path to the config file.
+
+	Returns
+	-------
+	config : dict
+		Dictionary of config values.
+
+	Raises
+	------
+	FileError
+		If `file` cannot be read, is not valid JSON, or contains unknown
+		keys.
+	'''
+
+	try:
+		with open(file) as f:
+			user = json.load(f)
+
+	except (IOError, OSError, ValueError) as e:
+		raise FileError(
+			'Cannot read config file %r: %s' % (file, e))
+
+	if not isinstance(user, dict):
+		raise FileError(
+			'Config file %r must contain a JSON object' % file)
+
+	unknown = set(user) - set(_CONFIG_DEFAULTS)
+
+	if unknown:
+		raise FileError(
+			'Unknown config keys: %s' % ', '.join(sorted(unknown)))
+
+	#fill in defaults, merging method sections
+	config = copy.deepcopy(_CONFIG_DEFAULTS)
+
+	for key, val in user.items():
+		if isinstance(config[key], dict) and key != 'samples':
+			config[key].update(val)
+
+		else:
+			config[key] = val
+
+	#resolve paths relative to the config file
+	root = os.path.dirname(os.path.abspath(file))
+
+	def _abs(p):
+		return None if p is None else os.path.join(root, p)
+
+	config['path'] = _abs(config['path'])
+	config['output'] = _abs(config['output'])
+
+	samples = {}
+
+	for name, sam in config['samples'].items():
+
+		#allow a thermogram path alone
+		if not isinstance(sam, dict):
+			sam = {'thermogram': sam}
+
+		sam = dict(sam)
+		sam['thermogram'] = _abs(sam.get('thermogram'))
+		sam['isotopes'] = _abs(sam.get('isotopes'))
+
+		samples[name] = sam
+
+	config['samples'] = samples
+
+	return config
+
+#define function to list all samples in a config
+def _find_samples(config):
+	'''
+	Combines samples listed explicitly in a config with those found in its
+	`path` directory or glob pattern.
+
+	Parameters
+	----------
+	config : dict
+		Dictionary of config values, as returned by ``_read_config``.
+
+	Returns
+	-------
+	samples : dict
+		Dictionary mapping sample names to dictionaries containing the
+		'thermogram' and 'isotopes' (or `None`) file paths and, optionally,
+		'bulk_d13C_true'.
+
+	Raises
+	------
+	FileError
+		If `path` is not a directory and matches no files.
+
+	Notes
+	-----
+	Explicitly listed samples take precedence over files found in `path`.
+	Samples found in `path` without a thermogram file are ignored.
+	'''
+
+	samples = {}
+
+	if config['path'] is not None:
+		tg_files, iso_files = _find_rpo_files(
+			config['path'],
+			config['tg_suffix'],
+			config['iso_suffix'])
+
+		for name, f in tg_files.items():
+			samples[name] = {
+				'thermogram': f,
+				'isotopes': iso_files.get(name),
+				}
+
+	samples.update(config['samples'])
+
+	return samples
+
+#define function to make a key identifying the analysis settings
+def _config_key(config):
+	'''
+	Returns a key that changes whenever any setting that affects the results
+	of a sample changes, *i.e.* the thermogram, model, inverse_model, or
+	isotopes sections of a config.
+
+	Parameters
+	----------
+	config : dict
+		Dictionary of config values, as returned by ``_read_config``.
+
+	Returns
+	-------
+	key : str
+		Hexadecimal key.
+	'''
+
+	sections = {k: config[k] for k in
+		['thermogram', 'model', 'inverse_model', 'isotopes']}
+
+	h = hashlib.sha1()
+	h.update(json.dumps(sections, sort_keys = True).encode())
+
+	return h.hexdigest()[:16]
+
+#define function to make a key identifying a shared model
+def _model_key(timedata, model_kw):
+	'''
+	Returns a key that is identical for all thermograms that share the same
+	model, *i.e.* with the same time and temperature arrays and model
+	parameters.
+
+	Parameters
+	----------
+	timedata : rp.TimeData
+		``rp.TimeData`` instance.
+
+	model_kw : dict
+		Keyword arguments passed to ``rp.Daem.from_timedata``.
+
+	Returns
+	-------
+	key : str
+		Hexadecimal key.
+	'''
+
+	h = hashlib.sha1()
+	h.update(timedata.t.tobytes())
+	h.update(timedata.T.tobytes())
+	h.update(json.dumps(model_kw, sort_keys = True).encode())
+
+	return h.hexdigest()[:16]
+
+#define worker function to build and cache a model
+def _build_model_job(job):
+	'''
+	Builds a single ``rp.Daem`` instance and saves it to a cache file,
+	returning any raised exception instead of raising it.
+
+	Parameters
+	----------
+	job : tuple
+		Tuple of (timedata, model_kw, file).
+
+	Returns
+	-------
+	file : str
+		Path to the cache file.
+
+	error : None or Exception
+		Exception raised while building, `None` if building succeeded.
+	'''
+
+	#import here to avoid circular imports
+	from .model import Daem
+
+	timedata, model_kw, file = job
+
+	try:
+		daem = Daem.from_timedata(timedata, **model_kw)
+
+		#write to a temporary file first so partial files are never read
+		tmp = daem.save('%s.%d.tmp' % (file[:-4], os.getpid()))
+		_replace_file(tmp, file)
+
+	except Exception as e:
+		return file, e
+
+	return file, None
+
+#define worker function to run the full analysis of a single sample
+def _run_sample_job(job):
+	'''
+	Inverse models a single thermogram with a cached model, forward models
+	the estimated thermogram, creates isotope results if an isotope file
+	exists, and saves all results to a checkpoint archive.
+
+	Parameters
+	----------
+	job : tuple
+		Tuple of (name, timedata, model_file, sample, inv_kw, iso_kw,
+		file), where sample is the sample dictionary returned by
+		``_find_samples`` and file is the checkpoint path.
+
+	Returns
+	-------
+	name : str
+		Sample name.
+
+	error : None or Exception
+		Exception raised during the analysis, `None` if it succeeded.
+	'''
+
+	#import here to avoid circular imports
+	from .core_functions import save_archive
+	from .model import Daem
+	from .ratedata import EnergyComplex
+	from .results import RpoIsotopes
+
+	name, tg, model_file, sample, inv_kw, iso_kw, file = job
+
+	try:
+		#memory-map the shared model rather than copying it
+		daem = Daem.load(model_file)
+
+		ec = EnergyComplex.inverse_model(daem, tg, **inv_kw)
+		tg.forward_model(daem, ec)
+
+		objs = {'tg': tg, 'ec': ec}
+
+		if sample.get('isotopes') is not None:
+			kw = dict(iso_kw)
+
+			if sample.get('bulk_d13C_true') is not None:
+				kw['bulk_d13C_true'] = sample['bulk_d13C_true']
+
+			objs['ri'] = RpoIsotopes.from_csv(
+				sample['isotopes'], daem, ec, **kw)
+
+		#write to a temporary file first so partial files are never read
+		tmp = save_archive('%s.%d.tmp' % (file[:-4], os.getpid()), **objs)
+		_replace_file(tmp, file)
+
+	except Exception as e:
+		return name, e
+
+	return name, None
+
+#define function to combine checkpoints into summary tables
+def _summarize_samples(files):
+	'''
+	Loads the checkpoint of each sample and combines the summary info into
+	tables.
+
+	Parameters
+	----------
+	files : dict
+		Dictionary mapping sample names to checkpoint paths.
+
+	Returns
+	-------
+	sample_info : pd.DataFrame
+		Table of thermogram, fit, and energy complex summary info, one row
+		per sample.
+
+	frac_info : pd.DataFrame
+		Table of fraction isotope info (corrected if available, otherwise
+		raw), indexed by sample and fraction.
+	'''
+
+	#import here to avoid circular imports
+	from .core_functions import load_archive
+
+	rows = {}
+	fracs = {}
+
+	for name in sorted(files):
+		objs = load_archive(files[name], mmap_mode = None)
+		tg = objs['tg']
+		ec = objs['ec']
+
+		row = [tg.tg_info, ec.ec_info]
+
+		#label estimated thermogram info to keep columns unique
+		if hasattr(tg, 'tghat_info'):
+			row.append(tg.tghat_info.add_prefix('est. '))
+
+		row.append(pd.Series(
+			[ec.lam, ec.resid, ec.rgh],
+			index = ['lam', 'resid', 'rgh']))
+
+		rows[name] = pd.concat(row)
+
+		if 'ri' in objs:
+			ri = objs['ri']
+			fracs[name] = getattr(ri, 'ri_corr_info', ri.ri_raw_info)
+
+	sample_info = pd.DataFrame(rows).T
+	sample_info.index.name = 'sample'
+
+	if fracs:
+		frac_info = pd.concat(fracs, names = ['sample', 'fraction'])
+
+	else:
+		frac_info = pd.DataFrame()
+
+	return sample_info, frac_info
@@ -8,19 +8,34 @@ from __future__ import(
 	)
 
 __docformat__ = 'restructuredtext en'
-__all__ = ['assert_len', 'calc_L_curve', 'derivatize', 'extract_moments']
+__all__ = ['assert_len', 'calc_L_curve', 'derivatize', 'extract_moments',
+	'load_archive', 'save_archive']
 
-import matplotlib.pyplot as plt
 import numpy as np
 
 from collections import Sequence
 
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pyplot on first use
+plt = _lazy_import('matplotlib.pyplot')
+
 #import exceptions
 from .exceptions import(
 	ArrayError,
+	FileError,
 	LengthError,
 	)
 
+#import helper functions
+from .io_helper import(
+	_build_obj,
+	_load_archive,
+	_save_archive,
+	)
+
 #define function to assert length of array
 def assert_len(data, n):
 	'''
@@ -215,14 +230,12 @@ def derivatize(num, denom):
 	elif num.ndim == denom.ndim == 2:
 		dndd = np.gradient(num)[0]/np.gradient(denom)[0]
 
-	#note recursive list comprehension when dimensions are different
+	#broadcast the 1d array over columns when dimensions are different
 	elif num.ndim == 2 and denom.ndim == 1:
-		col_der = [derivatize(col, denom) for col in num.T]
-		dndd = np.column_stack(col_der)
+		dndd = np.gradient(num, axis = 0)/np.gradient(denom)[:, None]
 
 	elif num.ndim == 1 and denom.ndim == 2:
-		col_der = [derivatize(num, col) for col in denom.T]
-		dndd = np.column_stack(col_der)
+		dndd = np.gradient(num)[:, None]/np.gradient(denom, axis = 0)
 
 	return dndd
 
@@ -237,29 +250,118 @@ def extract_moments(x, y):
 		Array of x values, length `n`.
 
 	y : np.ndarray
-		Array of y values, length `n`.
+		Array of y values, length `n`. If 2d, shape [`m` x `n`], each row
+		is treated as a separate distribution.
 
 	Returns
 	-------
-	mu : float
-		First moment of distribution.
+	mu : float or np.ndarray
+		First moment of distribution. Length `m` if `y` is 2d.
 
-	sigma : float
-		Second moment of distribution.
+	sigma : float or np.ndarray
+		Second moment of distribution. Length `m` if `y` is 2d.
+
+	Raises
+	------
+	LengthError
+		If `y` (or each row of `y`) is not length `n`.
 	'''
 
 	#assert lengths
 	n = len(x)
-	y = assert_len(y, n)
+
+	if np.ndim(y) == 2:
+		y = np.asarray(y, dtype = float)
+
+		if y.shape[1] != n:
+			raise LengthError(
+				'Cannot use rows of length %r if n = %r' % (y.shape[1], n))
+
+	else:
+		y = assert_len(y, n)
+
+	dx = np.gradient(x)
 
 	#calculate first moment
-	scalar = 1/np.sum(y*np.gradient(x))
+	scalar = 1/np.sum(y*dx, axis = -1, keepdims = True)
 
-	mu = np.sum(x*y*scalar*np.gradient(x))
-	sigsq = np.sum((x - mu)**2 * y*scalar*np.gradient(x))
+	mu = np.sum(x*y*scalar*dx, axis = -1, keepdims = True)
+	sigsq = np.sum((x - mu)**2 * y*scalar*dx, axis = -1)
 	sigma = sigsq**0.5
 
-	return mu, sigma
+	#return floats for a single distribution
+	if y.ndim == 1:
+		return mu[0], sigma
+
+	return mu[:,0], sigma
+
+#define function to load all objects from a binary archive
+def load_archive(file, mmap_mode = 'c'):
+	'''
+	Loads all rampedpyrox objects stored in a binary archive written by
+	``rp.save_archive`` or by the ``save`` method of any rampedpyrox class.
+
+	Parameters
+	----------
+	file : str
+		Path to the archive.
+
+	mmap_mode : None or str
+		If not `None`, arrays are memory-mapped from the archive using this
+		mode (see ``np.memmap``). Defaults to 'c' (copy-on-write).
+
+	Returns
+	-------
+	objs : dict
+		Dictionary mapping each stored name to the loaded instance.
+
+	Raises
+	------
+	FileError
+		If `file` is not a rampedpyrox archive, was written by a newer version
+		of rampedpyrox, or contains an unknown class.
+
+	See Also
+	--------
+	save_archive
+		Function to save multiple instances to a single archive.
+
+	Examples
+	--------
+	Reloading a full analysis saved with ``rp.save_archive``::
+
+		#import modules
+		import rampedpyrox as rp
+
+		#load archive
+		objs = rp.load_archive('sample_1.npz')
+
+		tg = objs['tg']
+		ec = objs['ec']
+	'''
+
+	#import base classes here to avoid circular imports
+	from .model import Model
+	from .ratedata import RateData
+	from .results import Results
+	from .timedata import TimeData
+
+	bases = (TimeData, Model, RateData, Results)
+	objs = {}
+
+	for name, (class_name, attrs) in _load_archive(
+		file, mmap_mode = mmap_mode).items():
+
+		for i, base in enumerate(bases):
+			try:
+				objs[name] = _build_obj(base, class_name, attrs)
+				break
+
+			except FileError:
+				if i == len(bases) - 1:
+					raise
+
+	return objs
 
 #define function for plotting raw thermogram with isotopes
 def plot_tg_isotopes(timedata, result, ax = None, plt_corr = True):
@@ -443,3 +545,57 @@ def plot_tg_isotopes(timedata, result, ax = None, plt_corr = True):
 
 	return ax, ax2
 
+#define function to save multiple objects to a single binary archive
+def save_archive(file, **objs):
+	'''
+	Saves any number of rampedpyrox objects (*e.g.* a sample's thermogram,
+	model, energy complex and isotope results) to a single versioned binary
+	.npz archive.
+
+	Parameters
+	----------
+	file : str
+		Path to the archive. '.npz' is appended if not already present.
+
+	objs : rampedpyrox objects
+		Instances to store, passed as keyword arguments. Keywords are used as
+		names when loading.
+
+	Returns
+	-------
+	file : str
+		Path of the written archive.
+
+	Warnings
+	--------
+	UserWarning
+		If an attribute cannot be stored and is skipped.
+
+	See Also
+	--------
+	load_archive
+		Function to load all instances from an archive.
+
+	Examples
+	--------
+	Saving a full analysis so it can be reloaded without re-parsing and
+	re-inverting::
+
+		#import modules
+		import rampedpyrox as rp
+
+		#save archive
+		rp.save_archive(
+			'sample_1.npz',
+			tg = tg,
+			daem = daem,
+			ec = ec,
+			ri = ri)
+
+	Notes
+	-----
+	Arrays are stored uncompressed so that they can be memory-mapped on 
+	loading. No pickled data are written.
+	'''
+
+	return _save_archive(file, objs)
@@ -0,0 +1,743 @@
+'''
+This module contains helper functions for reading and writing rampedpyrox
+data files.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+__docformat__ = 'restructuredtext en'
+__all__ = ['_ArchiveMixin',
+			'_build_obj',
+			'_hash_input',
+			'_load_archive',
+			'_load_obj',
+			'_read_csv_fast',
+			'_replace_file',
+			'_save_archive',
+			'_to_datetime_index',
+			]
+
+import hashlib
+import json
+import numpy as np
+import os
+import struct
+import warnings
+import zipfile
+
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pandas on first use
+pd = _lazy_import('pandas')
+
+#import exceptions
+from .exceptions import(
+	FileError,
+	)
+
+#version of the binary archive layout written by _save_archive
+_ARCHIVE_VERSION = 1
+
+#private attributes that hold open readers or shared memory handles and
+# therefore cannot be archived
+_ARCHIVE_SKIP = ('_refresh_args', '_shared')
+
+#define function to convert an index to datetime with a fixed format
+def _to_datetime_index(index, date_format = '%I:%M:%S %p'):
+	'''
+	Converts an index of timestamp strings to a ``pd.DatetimeIndex`` using a
+	fixed format, falling back to pandas format inference if the strings do
+	not match.
+
+	Parameters
+	----------
+	index : pd.Index
+		Index containing timestamp strings.
+
+	date_format : str or None
+		``strftime`` format of the timestamps. If `None`, format is inferred.
+		Defaults to '%I:%M:%S %p' (*i.e.* hh:mm:ss AM/PM).
+
+	Returns
+	-------
+	index : pd.DatetimeIndex
+		Converted index.
+	'''
+
+	if date_format is not None:
+		try:
+			return pd.DatetimeIndex(pd.to_datetime(index, format = date_format))
+
+		except (TypeError, ValueError):
+			pass
+
+	return pd.DatetimeIndex(pd.to_datetime(index))
+
+#define function to quickly read a .csv file with known columns
+def _read_csv_fast(
+	file,
+	cols,
+	date_format = '%I:%M:%S %p',
+	engine = 'c',
+	chunksize = None):
+	'''
+	Reads a .csv file whose first column contains timestamps, only parsing
+	the columns in `cols` as float64 and converting timestamps with a fixed
+	format. Falls back to ``pd.read_csv`` with inferred dtypes and dates if
+	the file does not have the expected layout.
+
+	Parameters
+	----------
+	file : str
+		Path to the .csv file.
+
+	cols : list
+		List of column names to read (other than the timestamp column).
+		Names not contained in the file header are ignored.
+
+	date_format : str or None
+		``strftime`` format of the timestamps in the first column. If `None`,
+		format is inferred. Defaults to '%I:%M:%S %p' (*i.e.* hh:mm:ss AM/PM).
+
+	engine : str
+		Parser engine passed to ``pd.read_csv``, either 'c' or 'pyarrow'. If
+		'pyarrow' is not installed, 'c' is used instead. Defaults to 'c'.
+
+	chunksize : None or int
+		If not `None`, returns an iterator yielding dataframes of at most
+		`chunksize` rows. Defaults to `None`.
+
+	Returns
+	-------
+	data : pd.DataFrame or iterator
+		Dataframe with pd.DatetimeIndex as index, or an iterator of such
+		dataframes if `chunksize` is not `None`.
+
+	Notes
+	-----
+	Timestamps that do not match `date_format` are parsed with pandas format
+	inference. Only hh:mm:ss values are used for RPO runs, so the date
+	assigned to time-only timestamps does not affect results.
+
+	If a chunk cannot be parsed with the expected layout, the remaining
+	chunks are read with inferred dtypes instead; chunks already yielded are
+	not repeated.
+	'''
+
+	#read the header and determine which columns exist
+	try:
+		header = pd.read_csv(file, nrows = 0).columns
+		usecols = [header[0]] + [c for c in cols if c in header]
+		dtype = dict((c, np.float64) for c in usecols[1:])
+
+	except (IndexError, ValueError):
+		usecols = None
+
+	#pyarrow does not support chunked reading, use c engine instead
+	if chunksize is not None:
+		engine = 'c'
+
+	#only use declared columns and dtypes if layout is as expected
+	if usecols is not None and len(usecols) > 1:
+
+		kw = dict(
+			usecols = usecols,
+			dtype = dtype,
+			index_col = 0,
+			chunksize = chunksize)
+
+		try:
+			try:
+				data = pd.read_csv(file, engine = engine, **kw)
+
+			except ImportError:
+				data = pd.read_csv(file, engine = 'c', **kw)
+
+		except (TypeError, ValueError):
+			data = None
+
+	else:
+		data = None
+
+	#fall back to inferring everything if necessary
+	if data is None:
+		return _read_csv_inferred(file, chunksize)
+
+	#convert timestamp index
+	if chunksize is None:
+		data.index = _to_datetime_index(data.index, date_format)
+		return data
+
+	#chunked readers only parse while iterating, so catch errors there
+	return _fallback_chunks(
+		_convert_chunks(data, date_format),
+		file,
+		chunksize)
+
+#define function to read a .csv file with inferred dtypes and dates
+def _read_csv_inferred(file, chunksize = None):
+	'''
+	Reads a .csv file with pandas dtype and date inference, as used by
+	``_read_csv_fast`` for files without the expected layout.
+	'''
+
+	return pd.read_csv(
+		file,
+		index_col = 0,
+		parse_dates = True,
+		chunksize = chunksize)
+
+#define generator to fall back to inferred dtypes while reading chunks
+def _fallback_chunks(chunks, file, chunksize):
+	'''
+	Yields the dataframes of `chunks`. If parsing any chunk fails, `file` is
+	re-read once with inferred dtypes and dates, and the rows not yet
+	yielded are yielded from that reader instead.
+	'''
+
+	n = 0
+
+	try:
+		for chunk in chunks:
+			n += len(chunk)
+			yield chunk
+
+		return
+
+	except (TypeError, ValueError):
+		pass
+
+	#skip rows that have already been yielded
+	for chunk in _read_csv_inferred(file, chunksize):
+
+		if n >= len(chunk):
+			n -= len(chunk)
+			continue
+
+		yield chunk.iloc[n:]
+		n = 0
+
+#define generator to convert the index of each chunk
+def _convert_chunks(chunks, date_format):
+	'''
+	Converts the index of each dataframe yielded by `chunks` to a
+	``pd.DatetimeIndex``.
+	'''
+
+	for chunk in chunks:
+		chunk.index = _to_datetime_index(chunk.index, date_format)
+		yield chunk
+
+#define function to reconstruct an object from stored attributes
+def _build_obj(cls, class_name, attrs):
+	'''
+	Creates an instance of `cls` (or of the subclass of `cls` named
+	`class_name`) and populates it with `attrs` without calling ``__init__``.
+
+	Parameters
+	----------
+	cls : type
+		Class (typically a superclass such as ``rp.TimeData``) to create.
+
+	class_name : str
+		Name of the stored class, which must be `cls` or one of its
+		subclasses.
+
+	attrs : dict
+		Dictionary of attributes to set on the instance.
+
+	Returns
+	-------
+	obj : object
+		The reconstructed instance.
+
+	Raises
+	------
+	FileError
+		If `class_name` is not `cls` or a subclass of `cls`.
+	'''
+
+	target = _is_subclass(cls, class_name)
+
+	if target is None:
+		raise FileError(
+			'Archived object of type %r cannot be loaded as %r'
+			% (class_name, cls.__name__))
+
+	obj = object.__new__(target)
+	obj.__dict__.update(attrs)
+
+	return obj
+
+#define function to hash the contents of an input file or dataframe
+def _hash_input(data, blocksize = 2**20):
+	'''
+	Calculates a SHA-256 hash of the contents of an input file or of the
+	values, index, and columns of an input dataframe.
+
+	Parameters
+	----------
+	data : str or pd.DataFrame
+		Path to a file or a dataframe.
+
+	blocksize : int
+		Number of bytes to read from a file at a time. Defaults to 2**20.
+
+	Returns
+	-------
+	digest : str
+		Hexadecimal hash string.
+
+	Raises
+	------
+	FileError
+		If `data` is not str or ``pd.DataFrame`` instance.
+
+	Notes
+	-----
+	Files are hashed by content, not by name or modification time, so a
+	copied or touched file gives the same hash.
+	'''
+
+	h = hashlib.sha256()
+
+	if isinstance(data, str):
+		with open(data, 'rb') as f:
+			for block in iter(lambda: f.read(blocksize), b''):
+				h.update(block)
+
+	elif isinstance(data, pd.DataFrame):
+		h.update(json.dumps(
+			[_json_name(c) for c in data.columns]).encode())
+		h.update(pd.util.hash_pandas_object(data, index = True).values)
+
+	else:
+		raise FileError(
+			'data must be pd.DataFrame instance or path string')
+
+	return h.hexdigest()
+
+#define function to find a subclass by name
+def _is_subclass(cls, class_name):
+	'''
+	Returns `cls` or the subclass of `cls` named `class_name`, or `None` if
+	no such class exists.
+	'''
+
+	classes = [cls]
+
+	while classes:
+		c = classes.pop()
+
+		if c.__name__ == class_name:
+			return c
+
+		classes.extend(c.__subclasses__())
+
+	return None
+
+#define function to load a binary archive
+def _load_archive(file, mmap_mode = 'c'):
+	'''
+	Loads all objects stored in a binary archive written by
+	``_save_archive``.
+
+	Parameters
+	----------
+	file : str
+		Path to the archive.
+
+	mmap_mode : None or str
+		If not `None`, array attributes are memory-mapped from the archive
+		using this mode (see ``np.memmap``) instead of being read into memory.
+		Defaults to 'c' (copy-on-write).
+
+	Returns
+	-------
+	objs : dict
+		Dictionary mapping each stored object name to a tuple of
+		(class name, attribute dictionary).
+
+	Raises
+	------
+	FileError
+		If `file` is not a rampedpyrox archive or was written by a newer
+		version of rampedpyrox.
+
+	Notes
+	-----
+	Only plain numeric arrays are memory-mapped. Pandas objects are always
+	read into memory.
+	'''
+
+	#read member offsets so arrays can be memory-mapped
+	with np.load(file) as npz:
+
+		if '__meta__' not in npz.files:
+			raise FileError(
+				'%r is not a rampedpyrox archive' % file)
+
+		meta = json.loads(str(npz['__meta__']))
+
+		if meta['version'] > _ARCHIVE_VERSION:
+			raise FileError(
+				'archive version %r is newer than supported version %r'
+				% (meta['version'], _ARCHIVE_VERSION))
+
+		def get(key, mmap = False):
+			if mmap and mmap_mode is not None:
+				arr = _memmap_member(file, key, mmap_mode)
+
+				if arr is not None:
+					return arr
+
+			return npz[key]
+
+		objs = {}
+
+		for name, om in meta['objects'].items():
+
+			attrs = dict(om['scalars'])
+
+			for att in om['arrays']:
+				attrs[att] = get(name + '/' + att, mmap = True)
+
+			for att, sm in om['series'].items():
+				attrs[att] = pd.Series(
+					get(name + '/' + att + '/values'),
+					index = get(name + '/' + att + '/index'),
+					name = sm['name'])
+
+			for att, fm in om['frames'].items():
+				cols = [get(name + '/' + att + '/%d' % i) 
+					for i in range(len(fm['columns']))]
+
+				frame = pd.DataFrame(
+					dict(zip(fm['columns'], cols)),
+					index = get(name + '/' + att + '/index'),
+					columns = fm['columns'])
+
+				frame.index.name = fm['index_name']
+				attrs[att] = frame
+
+			objs[name] = (om['class'], attrs)
+
+	return objs
+
+#define function to load a single object from a binary archive
+def _load_obj(cls, file, name = None, mmap_mode = 'c'):
+	'''
+	Loads a single instance of `cls` (or of one of its subclasses) from a
+	binary archive written by ``_save_archive``.
+
+	Parameters
+	----------
+	cls : type
+		Class of the object to load.
+
+	file : str
+		Path to the archive.
+
+	name : None or str
+		Name of the object to load. If `None`, the archive must contain
+		exactly one object of type `cls`. Defaults to `None`.
+
+	mmap_mode : None or str
+		Memory-map mode for array attributes. Defaults to 'c'.
+
+	Returns
+	-------
+	obj : object
+		The loaded instance.
+
+	Raises
+	------
+	FileError
+		If `name` is not in the archive, or if `name` is `None` and the
+		archive does not contain exactly one object of type `cls`.
+	'''
+
+	objs = _load_archive(file, mmap_mode = mmap_mode)
+
+	if name is None:
+		names = [n for n, (c, a) in objs.items() if _is_subclass(cls, c)]
+
+		if len(names) == 0:
+			raise FileError(
+				'%r does not contain an object of type %r'
+				% (file, cls.__name__))
+
+		elif len(names) > 1:
+			raise FileError(
+				'%r contains %d objects of type %r, specify `name`'
+				% (file, len(names), cls.__name__))
+
+		name = names[0]
+
+	elif name not in objs:
+		raise FileError(
+			'%r does not contain an object named %r' % (file, name))
+
+	class_name, attrs = objs[name]
+
+	return _build_obj(cls, class_name, attrs)
+
+#define function to memory-map an uncompressed array stored in a .npz file
+def _memmap_member(file, key, mmap_mode):
+	'''
+	Memory-maps an array stored without compression in a .npz archive.
+	Returns `None` if the member cannot be memory-mapped.
+	'''
+
+	with zipfile.ZipFile(file) as zf:
+		try:
+			info = zf.getinfo(key + '.npy')
+
+		except KeyError:
+			return None
+
+		if info.compress_type != zipfile.ZIP_STORED:
+			return None
+
+	with open(file, 'rb') as f:
+
+		#skip the zip local file header
+		f.seek(info.header_offset)
+		header = f.read(30)
+		nname, nextra = struct.unpack('<HH', header[26:30])
+		f.seek(info.header_offset + 30 + nname + nextra)
+
+		#read the npy header
+		version = np.lib.format.read_magic(f)
+
+		if version == (1, 0):
+			shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+
+		else:
+			shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+
+		offset = f.tell()
+
+	if dtype.hasobject or 0 in shape or shape == ():
+		return None
+
+	return np.memmap(
+		file,
+		dtype = dtype,
+		mode = mmap_mode,
+		offset = offset,
+		shape = shape,
+		order = 'F' if fortran else 'C')
+
+#define function to move a finished file into place
+def _replace_file(src, dst):
+	'''
+	Renames `src` to `dst`, overwriting `dst` if it exists. Atomic on all
+	platforms with ``os.replace`` (Python 3) and on POSIX otherwise.
+	'''
+
+	try:
+		replace = os.replace
+
+	#Python 2; rename only overwrites on POSIX
+	except AttributeError:
+		if os.name == 'nt' and os.path.exists(dst):
+			os.remove(dst)
+
+		replace = os.rename
+
+	replace(src, dst)
+
+#define function to save objects to a binary archive
+def _save_archive(file, objs):
+	'''
+	Saves the attributes of one or more rampedpyrox objects to a single,
+	versioned, uncompressed .npz archive.
+
+	Parameters
+	----------
+	file : str
+		Path to the archive. '.npz' is appended if not already present.
+
+	objs : dict
+		Dictionary mapping a name to each object to store.
+
+	Returns
+	-------
+	file : str
+		Path of the written archive.
+
+	Warnings
+	--------
+	UserWarning
+		If an attribute cannot be stored and is skipped.
+
+	Notes
+	-----
+	Arrays are stored as individual .npy members so they can be
+	memory-mapped on loading. Scalars are stored in a JSON header. Series and
+	DataFrames are stored column by column; columns with object dtype are
+	stored as strings. File readers kept for ``rp.BioDecay.refresh`` and
+	shared memory handles are not stored. No pickled data are written.
+	'''
+
+	if not file.endswith('.npz'):
+		file = file + '.npz'
+
+	arrays = {}
+	meta = {'version': _ARCHIVE_VERSION, 'objects': {}}
+
+	for name, obj in objs.items():
+
+		om = {
+			'class': type(obj).__name__,
+			'scalars': {},
+			'arrays': [],
+			'series': {},
+			'frames': {},
+			}
+
+		for att, val in vars(obj).items():
+			key = name + '/' + att
+
+			#do not store file readers or shared memory handles
+			if att in _ARCHIVE_SKIP:
+				continue
+
+			if isinstance(val, np.generic):
+				val = val.item()
+
+			if val is None or isinstance(val, (bool, int, float, str)):
+				om['scalars'][att] = val
+
+			elif isinstance(val, pd.Series):
+				arrays[key + '/values'] = _plain_array(val.values)
+				arrays[key + '/index'] = _plain_array(val.index.values)
+				om['series'][att] = {'name': _json_name(val.name)}
+
+			elif isinstance(val, pd.DataFrame):
+				for i, c in enumerate(val.columns):
+					arrays[key + '/%d' % i] = _plain_array(val[c].values)
+
+				arrays[key + '/index'] = _plain_array(val.index.values)
+				om['frames'][att] = {
+					'columns': [_json_name(c) for c in val.columns],
+					'index_name': _json_name(val.index.name),
+					}
+
+			else:
+				arr = np.asarray(val)
+
+				if arr.dtype.hasobject:
+					warnings.warn(
+						'Cannot archive attribute %r of type %r. Skipping'
+						% (att, type(val).__name__), UserWarning)
+					continue
+
+				arrays[key] = arr
+				om['arrays'].append(att)
+
+		meta['objects'][name] = om
+
+	arrays['__meta__'] = np.array(json.dumps(meta))
+
+	#store uncompressed so members can be memory-mapped
+	np.savez(file, **arrays)
+
+	return file
+
+#define mixin class adding archive methods to rampedpyrox classes
+class _ArchiveMixin(object):
+	'''
+	Mixin class that adds ``save`` and ``load`` methods for versioned binary
+	archives to the rampedpyrox superclasses.
+	'''
+
+	#define method for saving to a binary archive
+	def save(self, file):
+		'''
+		Saves the instance, including any modeled attributes, to a versioned
+		binary .npz archive.
+
+		Parameters
+		----------
+		file : str
+			Path to the archive. '.npz' is appended if not already present.
+
+		Returns
+		-------
+		file : str
+			Path of the written archive.
+
+		See Also
+		--------
+		load
+			Class method to load an instance from an archive.
+
+		rp.save_archive
+			Package-level function to save multiple instances to a single
+			archive.
+		'''
+
+		return _save_archive(file, {type(self).__name__: self})
+
+	#define class method for loading from a binary archive
+	@classmethod
+	def load(cls, file, name = None, mmap_mode = 'c'):
+		'''
+		Loads an instance from a binary archive written by ``save`` or
+		``rp.save_archive``, without recalculating any attributes.
+
+		Parameters
+		----------
+		file : str
+			Path to the archive.
+
+		name : None or str
+			Name of the object to load. If `None`, the archive must contain
+			exactly one object of this type. Defaults to `None`.
+
+		mmap_mode : None or str
+			If not `None`, arrays are memory-mapped from the archive using this
+			mode (see ``np.memmap``). Defaults to 'c' (copy-on-write).
+
+		Raises
+		------
+		FileError
+			If the archive does not contain a matching object or was written
+			by a newer version of rampedpyrox.
+		'''
+
+		return _load_obj(cls, file, name = name, mmap_mode = mmap_mode)
+
+#define function to make an array storable without pickling
+def _plain_array(arr):
+	'''
+	Converts object-dtype arrays to unicode string arrays.
+	'''
+
+	arr = np.asarray(arr)
+
+	if arr.dtype.hasobject:
+		arr = arr.astype(str)
+
+	return arr
+
+#define function to make a pandas name storable as json
+def _json_name(name):
+	'''
+	Converts a pandas index or column name to a json-compatible value.
+	'''
+
+	if isinstance(name, np.generic):
+		name = name.item()
+
+	if name is None or isinstance(name, (bool, int, float, str)):
+		return name
+
+	return str(name)
@@ -0,0 +1,56 @@
+'''
+This module contains helper functions for deferring the import of heavy
+dependencies until first use.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+__docformat__ = 'restructuredtext en'
+__all__ = ['_lazy_import']
+
+import importlib
+import sys
+import types
+
+#define class for a module that is imported on first attribute access
+class _LazyModule(types.ModuleType):
+	'''
+	Module placeholder that imports the named module on first attribute
+	access and then copies its namespace, so later lookups cost the same as
+	for the module itself.
+	'''
+
+	def __getattr__(self, attr):
+
+		#only called for attributes not yet in self.__dict__
+		mod = importlib.import_module(self.__name__)
+		self.__dict__.update(mod.__dict__)
+
+		return getattr(mod, attr)
+
+#define function to lazily import a module
+def _lazy_import(name):
+	'''
+	Returns a placeholder for the module `name` that is imported the first
+	time any of its attributes are accessed, *e.g.* so that
+	``pd = _lazy_import('pandas')`` can be used in place of
+	``import pandas as pd``.
+
+	Parameters
+	----------
+	name : str
+		Full name of the module, *e.g.* 'matplotlib.pyplot'.
+
+	Returns
+	-------
+	mod : types.ModuleType
+		The module itself if already imported, otherwise a placeholder.
+	'''
+
+	if name in sys.modules:
+		return sys.modules[name]
+
+	return _LazyModule(name)
@@ -0,0 +1,132 @@
+'''
+This module contains helper functions for Monte Carlo uncertainty
+propagation.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+__docformat__ = 'restructuredtext en'
+__all__ = ['_mc_blocks',
+			'_mc_draw',
+			'_mc_rng',
+			]
+
+import numpy as np
+
+#import exceptions
+from .exceptions import(
+	ScalarError,
+	)
+
+#define generator to split draws into blocks
+def _mc_blocks(nmc, blocksize):
+	'''
+	Yields the number of draws in each block such that no more than
+	`blocksize` draws are held in memory at a time.
+
+	Parameters
+	----------
+	nmc : int
+		Total number of draws.
+
+	blocksize : int
+		Maximum number of draws per block.
+
+	Yields
+	------
+	b : int
+		Number of draws in the block.
+	'''
+
+	nmc = int(nmc)
+	blocksize = max(1, int(blocksize))
+
+	for i in range(0, nmc, blocksize):
+		yield min(blocksize, nmc - i)
+
+#define function to draw normally distributed samples
+def _mc_draw(rng, mean, std, nmc, corr = 0):
+	'''
+	Draws `nmc` normally distributed samples of each value in a single
+	[nmc x n] array.
+
+	Parameters
+	----------
+	rng : np.random.RandomState
+		Random number generator, *e.g.* from ``_mc_rng``.
+
+	mean : scalar or array-like
+		Mean of each value. Length `n`.
+
+	std : scalar or array-like
+		Standard deviation (+/- 1 sigma) of each value. Length `n` or
+		scalar.
+
+	nmc : int
+		Number of draws.
+
+	corr : scalar
+		Correlation coefficient (0-1) between the errors of the `n` values
+		within each draw. 0 draws independent errors, 1 draws a single shared
+		error (*e.g.* a calibration offset) scaled by each `std`. Defaults to
+		0.
+
+	Returns
+	-------
+	draws : np.ndarray
+		Array of samples. Shape [nmc x n], with `n` = 1 for scalar inputs.
+
+	Raises
+	------
+	ScalarError
+		If `corr` is not between 0 and 1.
+	'''
+
+	if not 0 <= corr <= 1:
+		raise ScalarError(
+			'corr must be between 0 and 1')
+
+	mean = np.atleast_1d(np.asarray(mean, dtype = float))
+	std = np.asarray(std, dtype = float)
+
+	shape = (int(nmc), len(mean))
+
+	#independent errors
+	if corr == 0:
+		z = rng.standard_normal(shape)
+
+	#shared errors
+	elif corr == 1:
+		z = rng.standard_normal((shape[0], 1))
+
+	#mix of shared and independent errors
+	else:
+		z = corr**0.5*rng.standard_normal((shape[0], 1)) + \
+			(1 - corr)**0.5*rng.standard_normal(shape)
+
+	return mean + std*z
+
+#define function to make a random number generator
+def _mc_rng(seed = None):
+	'''
+	Makes a random number generator for Monte Carlo draws.
+
+	Parameters
+	----------
+	seed : None, int, or np.random.RandomState
+		Seed for reproducible draws. If a ``np.random.RandomState`` instance,
+		it is returned unchanged. Defaults to `None`.
+
+	Returns
+	-------
+	rng : np.random.RandomState
+		Random number generator.
+	'''
+
+	if isinstance(seed, np.random.RandomState):
+		return seed
+
+	return np.random.RandomState(seed)
@@ -10,16 +10,26 @@ from __future__ import(
 __docformat__ = 'restructuredtext en'
 __all__ = ['Daem']
 
-import matplotlib.pyplot as plt
 import numpy as np
 import warnings
 
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pyplot on first use
+plt = _lazy_import('matplotlib.pyplot')
+
 #import exceptions
 from .exceptions import(
 	ScalarError,
 	)
 
 #import helper functions
+from .io_helper import(
+	_ArchiveMixin,
+	)
+
 from .core_functions import(
 	assert_len,
 	derivatize,
@@ -31,7 +41,16 @@ from .model_helper import(
 	_rpo_calc_A,
 	)
 
-class Model(object):
+from .profiling_helper import(
+	_stage,
+	)
+
+from .shared_helper import(
+	_shared_getstate,
+	_shared_setstate,
+	)
+
+class Model(_ArchiveMixin):
 	'''
 	Class to store model setup. Intended for subclassing, do not call
 	directly.
@@ -72,12 +91,20 @@ class Model(object):
 	def from_timedata(self):
 		raise NotImplementedError
 
+	#define pickling methods so that shared arrays are sent as handles
+	def __getstate__(self):
+		return _shared_getstate(self)
+
+	def __setstate__(self, state):
+		_shared_setstate(self, state)
+
 	#define a class method for creating instance directly from ratedata
 	@classmethod
 	def from_ratedata(self):
 		raise NotImplementedError
 
 	#define a method for calculating the L curve
+	@_stage('lambda')
 	def calc_L_curve(
 			self, 
 			timedata, 
@@ -273,6 +300,17 @@ class Daem(Model):
 	T : array-like
 		Array of temperature, in Kelvin. Length `nt`.
 
+	I : None or np.ndarray
+		Precalculated cumulative temperature integral, *e.g.* from another
+		``rp.Daem`` instance with the same E, t, and T. Shape [`nt` x `nE`].
+		If `None`, it is calculated. Defaults to `None`.
+
+	keep_I : Boolean
+		If `True`, the temperature integral is stored with the instance so
+		that KIE corrections (see ``rp.RpoIsotopes.kie_correct``) use it
+		directly rather than recovering it from A. Doubles the memory and
+		archive size of the instance. Defaults to `False`.
+
 	Warnings
 	--------
 	UserWarning
@@ -415,7 +453,7 @@ class Daem(Model):
 		*Journal of Analytical and Applied Pyrolysis*, **91**, 1-33.
 	'''
 
-	def __init__(self, E, log10omega, t, T):
+	def __init__(self, E, log10omega, t, T, I = None, keep_I = False):
 
 		#warn if T is scalar
 		if isinstance(T, (int, float)):
@@ -435,10 +473,14 @@ class Daem(Model):
 			log10omega = log10omega(E)
 
 		#calculate A matrix
-		A = _rpo_calc_A(E, log10omega, t, T)
+		A, I = _rpo_calc_A(E, log10omega, t, T, I = I, return_I = True)
 
 		super(Daem, self).__init__(A, t, T)
 
+		#keep the temperature integral for KIE corrections if requested
+		if keep_I:
+			self._I = I
+
 		#store Daem-specific attributes
 		nE = len(E)
 		self.log10omega = assert_len(log10omega, nE)
@@ -452,7 +494,8 @@ class Daem(Model):
 			E_max = 350, 
 			E_min = 50, 
 			log10omega = 10, 
-			nE = 250):
+			nE = 250,
+			keep_I = False):
 		'''
 		Class method to directly generate an ``rp.Daem`` instance using data
 		stored in an ``rp.TimeData`` instance.
@@ -478,6 +521,10 @@ class Daem(Model):
 		nE : int
 			The number of activation energy points. Defaults to 250.
 
+		keep_I : Boolean
+			If `True`, stores the temperature integral for reuse by KIE
+			corrections. Defaults to `False`.
+
 		Warnings
 		--------
 		UserWarning
@@ -505,7 +552,7 @@ class Daem(Model):
 		t = timedata.t
 		T = timedata.T
 
-		return cls(E, log10omega, t, T)
+		return cls(E, log10omega, t, T, keep_I = keep_I)
 
 	@classmethod
 	def from_ratedata(
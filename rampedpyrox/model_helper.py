@@ -10,22 +10,33 @@ from __future__ import(
 __docformat__ = 'restructuredtext en'
 __all__ = ['_bd_calc_A',
 			'_calc_ghat', 
+			'_calc_ghat_batch', 
 			'_calc_p', 
 			'_calc_R',
-			'_rpo_calc_A'
+			'_rpo_calc_p_multi',
+			'_rpo_calc_A',
+			'_rpo_calc_A_shift',
+			'_rpo_calc_dAdE',
+			'_rpo_calc_I',
+			'_rpo_I_from_A',
+			'_rpo_I_steps',
 			]
 
 import numpy as np
 
 from numpy.linalg import norm
-from scipy.optimize import nnls
 
 #import helper functions
 from .core_functions import(
 	assert_len,
 	)
 
+from .profiling_helper import(
+	_stage,
+	)
+
 #define function to calculte the A matrix for DAEM models
+@_stage('model')
 def _bd_calc_A(k, t, logged = False):
 	'''
 	Calculates the A matrix for a BioDecay model (e.g. an IsoCaRB run).
@@ -93,6 +104,7 @@ def _bd_calc_A(k, t, logged = False):
 	return A
 
 #define a function to generate estimated time data from model and ratedata
+@_stage('forward')
 def _calc_ghat(model, ratedata):
 	'''
 	Calculates the timedata for a given ``rp.RateData`` and ``rp.Model`` 
@@ -115,7 +127,37 @@ def _calc_ghat(model, ratedata):
 
 	return np.inner(model.A, ratedata.p)
 
+#define a function to generate estimated time data for many rate data
+@_stage('forward')
+def _calc_ghat_batch(model, P):
+	'''
+	Calculates the timedata for many distributions of rates (or E, for DAEM)
+	at once for a given ``rp.Model`` instance.
+
+	Parameters
+	----------
+	model : rp.Model
+		The ``rp.Model`` instance used to calculate the forward model.
+
+	P : np.ndarray
+		2d array of the pdf of each distribution. Shape [`n` x `nk`].
+
+	Returns
+	-------
+	ghat : np.ndarray
+		2d array of estimated fraction of total carbon remaining at each 
+		timestep (rows) for each distribution (columns). Shape [`nt` x `n`].
+
+	Notes
+	-----
+	All distributions are forward modeled with a single matrix-matrix
+	product.
+	'''
+
+	return np.dot(model.A, np.transpose(P))
+
 #define a function to generate estimated rate data from model and timedata
+@_stage('nnls')
 def _calc_p(model, timedata, lam):
 	'''
 	Calculates the reactive continuum of rates (or E, for DAEM) for a given
@@ -156,6 +198,9 @@ def _calc_p(model, timedata, lam):
 		**6**, 1-35.
 	'''
 
+	#import scipy on first use
+	from scipy.optimize import nnls
+
 	#extract nt and nk (or nE for daem)
 	nt, nk = np.shape(model.A)
 
@@ -180,6 +225,86 @@ def _calc_p(model, timedata, lam):
 
 	return p, resid, rgh
 
+#define a function to jointly invert several RPO runs for a single p
+@_stage('nnls')
+def _rpo_calc_p_multi(E, log10omega, Is, gs, lam):
+	'''
+	Calculates a single distribution of E for several RPO runs of the same
+	sample (*e.g.* at different ramp rates) by stacking the A matrix of each
+	run into one block system.
+
+	Parameters
+	----------
+	E : array-like
+		Array of E values, in kJ/mol. Length `nE`.
+
+	log10omega : scalar or array-like
+		Arrhenius pre-exponential factor, either a constant value or array
+		with length `nE`.
+
+	Is : list
+		List of the cumulative temperature integral of each run, from
+		``_rpo_calc_I``. Each of shape [`nt` x `nE`].
+
+	gs : list
+		List of the fraction of carbon remaining at each timepoint of each
+		run. Each of length `nt`.
+
+	lam : scalar
+		Tikhonov regularization weighting factor, `lambda`.
+
+	Returns
+	-------
+	p : np.ndarray
+		Array of the pdf of the discretized distribution of E.
+
+	resid : float
+		Residual RMSE between true and modeled time data of all runs.
+
+	rgh : float
+		Roughness RMSE from Tikhonov Regularization.
+
+	Notes
+	-----
+	The temperature integral does not depend on `log10omega`, so each A
+	matrix only requires a single exponential when `Is` are reused for many
+	values of `log10omega`.
+	'''
+
+	#import scipy on first use
+	from scipy.optimize import nnls
+
+	nE = len(E)
+
+	omega = 10**assert_len(log10omega, nE) #s-1
+	dE = np.gradient(E)
+
+	#stack A matrices and timedata of all runs
+	A = np.concatenate([np.exp(-omega*I)*dE for I in Is])
+	g = np.concatenate(gs)
+	nt = len(g)
+
+	#calculate the regularization matrix
+	R = _calc_R(nE)
+
+	#concatenate A+R and g+zeros
+	A_reg = np.concatenate(
+		(A, R*lam))
+
+	g_reg = np.concatenate(
+		(g, np.zeros(nE + 1)))
+
+	#calculate inverse results and estimated g
+	p, _ = nnls(A_reg, g_reg)
+	ghat = np.inner(A, p)
+	rgh = np.inner(R, p)
+
+	#calculate errors
+	resid = norm(g - ghat)/nt**0.5
+	rgh = norm(rgh)/nE**0.5
+
+	return p, resid, rgh
+
 #define a function to calculate the Tikhonov regularization matrix
 def _calc_R(n):
 	'''
@@ -223,7 +348,8 @@ def _calc_R(n):
 	return R
 
 #define function to calculte the A matrix for DAEM models
-def _rpo_calc_A(E, log10omega, t, T):
+@_stage('model')
+def _rpo_calc_A(E, log10omega, t, T, I = None, return_I = False):
 	'''
 	Calculates the A matrix for a DAEM model (e.g. a Ramped Pyrox run).
 
@@ -243,12 +369,24 @@ def _rpo_calc_A(E, log10omega, t, T):
 	T : array-like
 		Array of temperature to be used in the A matrix, in Kelvin. Length `nt`.
 
+	I : None or np.ndarray
+		Precalculated cumulative temperature integral from ``_rpo_calc_I``.
+		If `None`, it is calculated. Defaults to `None`.
+
+	return_I : boolean
+		Tells the function whether or not to also return the cumulative
+		temperature integral. Defaults to `False`.
+
 	Returns
 	-------
 	A : np.ndarray
-		2d array of the Laplace transform for the Daem model. 
+		2d array of the Laplace transform for the Daem model.
 		Shape [`nt` x `nE`].
 
+	I : np.ndarray
+		2d array of the cumulative temperature integral, in seconds. Shape
+		[`nt` x `nE`]. Only returned if `return_I` is `True`.
+
 	References
 	----------
 	[1] R.L Braun and A.K. Burnham (1987) Analysis of chemical reaction 
@@ -277,27 +415,310 @@ def _rpo_calc_A(E, log10omega, t, T):
 	log10omega = assert_len(log10omega, nE) 
 	omega = 10**log10omega #s-1
 
-	#calculate time and E gradients
-	dt = np.gradient(t)
+	#calculate E gradient and cumulative temperature integral
 	dE = np.gradient(E)
 
-	#pre-allocate A
-	A = np.zeros([nt,nE])
+	if I is None:
+		I = _rpo_calc_I(E, t, T)
 
-	#loop through each timestep
-	for i, _ in enumerate(T):
+	#calculate A
+	A = np.exp(-omega*I)*dE #kJ/mol
 
-		#generate arrays
-		U = T[:i] #Kelvin, [1,i]
-		dtau = dt[:i] #seconds, [1,i]
+	if return_I:
+		return A, I
 
-		#generate matrices
-		eps_mat = np.outer(E, np.ones(i)) #kJ, [nE,i]
-		omega_mat = np.outer(omega, np.ones(i)) #s-1, [nE,i]
-		u_mat = np.outer(np.ones(nE), U) #Kelvin, [nE,i]
+	return A
 
-		#generate A for row i (i.e. for each timepoint) and store in A
-		hE_mat = -omega_mat*dtau*np.exp(-eps_mat/(R*u_mat)) #unitless, [nE,i]
-		A[i] = np.exp(np.sum(hE_mat, axis = 1))*dE #kJ/mol
+#define function to calculate the A matrix for shifted activation energies
+def _rpo_calc_A_shift(E, log10omega, t, T, I, DE, A = None):
+	'''
+	Calculates the A matrix for activation energies shifted by `DE` (*e.g.*
+	for 13C-containing atoms) from the cumulative temperature integral of
+	the unshifted energies, without re-evaluating the Arrhenius exponential
+	at every point.
 
-	return A
+	Parameters
+	----------
+	E : array-like
+		Array of (unshifted) activation energy points, in kJ. Length `nE`.
+
+	log10omega : array-like
+		Arrhenius pre-exponential factor at each energy point. Length `nE`.
+
+	t : array-like
+		Array of timepoints, in seconds. Length `nt`.
+
+	T : array-like
+		Array of temperature, in Kelvin. Length `nt`.
+
+	I : np.ndarray
+		Cumulative temperature integral of `E` from ``_rpo_calc_I``.
+		Shape [`nt` x `nE`].
+
+	DE : scalar
+		Shift in activation energy, in kJ.
+
+	A : None or np.ndarray
+		A matrix of the unshifted energies, from ``_rpo_calc_A``. If not
+		`None`, it is scaled rather than recalculated from `I`. Defaults to
+		`None`.
+
+	Returns
+	-------
+	A : np.ndarray
+		2d array of the Laplace transform for energies ``E + DE``.
+		Shape [`nt` x `nE`].
+
+	Notes
+	-----
+	Each step of the integral scales exactly by ``exp(-DE/RT)`` when E is
+	shifted, so the result is identical to ``_rpo_calc_A(E + DE, ...)`` for
+	evenly spaced `t`. For unevenly spaced `t`, the step temperature is taken
+	as the mean temperature of the step, with relative error of order
+	``DE*dT/(R*T**2)``.
+
+	If `A` is given, it is multiplied by ``exp(-omega*(Is - I))``, where `Is`
+	is the shifted integral. Since ``Is - I`` is small, this avoids slow
+	exponentials of large, underflowing arguments.
+	'''
+
+	#set constants
+	R = 8.314/1000 #kJ/mol/K
+
+	omega = 10**np.asarray(log10omega, dtype = float) #s-1
+
+	h, Ts = _rpo_I_steps(I, t, T)
+
+	if A is None:
+		#scale each step of the integral
+		dE = np.gradient(np.asarray(E, dtype = float))
+
+		Is = np.zeros(np.shape(I))
+		Is[1:] = np.cumsum(h*np.exp(-DE/(R*Ts))[:, None], axis = 0)
+
+		return np.exp(-omega*Is)*dE #kJ/mol
+
+	#accumulate the change in each step of the integral; the exponent is
+	# only large where A has underflowed, so cap it to avoid 0*inf
+	D = np.zeros(np.shape(I))
+	D[1:] = np.cumsum(h*np.expm1(-DE/(R*Ts))[:, None], axis = 0)
+
+	return A*np.exp(np.minimum(-omega*D, 700)) #kJ/mol
+
+#define function to calculate the derivative of A with respect to E
+def _rpo_calc_dAdE(A, log10omega, t, T, I):
+	'''
+	Calculates the derivative of the A matrix with respect to a uniform shift
+	in activation energy, such that ``A(E + DE) ~ A + DE*dAdE``.
+
+	Parameters
+	----------
+	A : np.ndarray
+		2d array of the Laplace transform. Shape [`nt` x `nE`].
+
+	log10omega : array-like
+		Arrhenius pre-exponential factor at each energy point. Length `nE`.
+
+	t : array-like
+		Array of timepoints, in seconds. Length `nt`.
+
+	T : array-like
+		Array of temperature, in Kelvin. Length `nt`.
+
+	I : np.ndarray
+		Cumulative temperature integral from ``_rpo_calc_I``.
+		Shape [`nt` x `nE`].
+
+	Returns
+	-------
+	dAdE : np.ndarray
+		2d array of the derivative of A, in mol-1 (*i.e.* kJ/mol per kJ).
+		Shape [`nt` x `nE`].
+
+	Notes
+	-----
+	Since ``A = exp(-omega*I)*dE`` and each step of `I` varies as
+	``exp(-E/RT)``, ``dA/dE = A*omega*sum(h/RT)`` over all previous steps
+	`h`. Only multiplications and a cumulative sum are required.
+	'''
+
+	#set constants
+	R = 8.314/1000 #kJ/mol/K
+
+	omega = 10**np.asarray(log10omega, dtype = float) #s-1
+
+	#calculate -dI/dE
+	h, Ts = _rpo_I_steps(I, t, T)
+
+	mdIdE = np.zeros(np.shape(I))
+	mdIdE[1:] = np.cumsum(h/(R*Ts)[:, None], axis = 0)
+
+	return A*omega*mdIdE
+
+#define function to recover the cumulative temperature integral from A
+def _rpo_I_from_A(A, E, log10omega):
+	'''
+	Recovers the cumulative temperature integral from a DAEM A matrix by
+	inverting ``A = exp(-omega*I)*dE``, without re-evaluating the Arrhenius
+	exponential.
+
+	Parameters
+	----------
+	A : np.ndarray
+		2d array of the Laplace transform from ``_rpo_calc_A``.
+		Shape [`nt` x `nE`].
+
+	E : array-like
+		Array of activation energy points, in kJ. Length `nE`.
+
+	log10omega : array-like
+		Arrhenius pre-exponential factor at each energy point. Length `nE`.
+
+	Returns
+	-------
+	I : np.ndarray
+		2d array of the cumulative temperature integral, in seconds.
+		Shape [`nt` x `nE`].
+
+	Notes
+	-----
+	Where A has underflowed to zero, `I` cannot be recovered and is set such
+	that ``omega*I = 800``, large enough that A remains zero for any small
+	shift in E.
+	'''
+
+	omega = 10**np.asarray(log10omega, dtype = float) #s-1
+	dE = np.gradient(np.asarray(E, dtype = float))
+
+	#invert, capping omega*I where A is zero
+	with np.errstate(divide = 'ignore'):
+		x = np.log(A/dE)
+
+	np.negative(x, out = x)
+	np.minimum(x, 800, out = x)
+
+	return x/omega
+
+#define function to calculate the cumulative temperature integral
+def _rpo_calc_I(E, t, T, nsub = 10):
+	'''
+	Calculates the cumulative temperature integral of the Arrhenius
+	exponential, exp(-E/RT(t)), over time for each time and
+	activation energy point. This is independent of `log10omega`.
+
+	Parameters
+	----------
+	E : array-like
+		Array of activation energy points, in kJ. Length `nE`.
+
+	t : array-like
+		Array of timepoints, in seconds. Length `nt`.
+
+	T : array-like
+		Array of temperature, in Kelvin. Length `nt`.
+
+	nsub : int
+		Number of sub-steps used to integrate between points of a
+		non-uniform time grid. Defaults to 10.
+
+	Returns
+	-------
+	I : np.ndarray
+		2d array of the cumulative temperature integral, in seconds.
+		Shape [`nt` x `nE`].
+
+	Notes
+	-----
+	For evenly spaced `t`, the integral up to each point is the sum over all
+	previous points of ``dt*exp(-E/RT)``, as in previous versions. For 
+	unevenly spaced `t` (*e.g.* an adaptive downsampling grid), this
+	rectangle rule is inaccurate across wide steps, so each step is instead
+	integrated with `nsub` midpoint sub-steps, treating temperature as linear
+	within each step.
+	'''
+
+	#set constants
+	R = 8.314/1000 #kJ/mol/K
+
+	E = np.asarray(E, dtype = float)
+	t = np.asarray(t, dtype = float)
+	T = np.asarray(T, dtype = float)
+
+	nt = len(t)
+	nE = len(E)
+
+	#pre-allocate I
+	I = np.zeros([nt, nE])
+
+	if nt < 2:
+		return I
+
+	steps = np.diff(t)
+
+	#rectangle rule for evenly spaced t
+	if np.allclose(steps, steps[0], rtol = 1e-6):
+
+		#generate integrand for each timestep
+		dt = np.gradient(t)
+		hE = np.outer(dt, np.ones(nE))*np.exp(-np.outer(1/(R*T), E)) #s
+
+		#sum over all previous timesteps
+		I[1:] = np.cumsum(hE[:-1], axis = 0)
+
+	#midpoint sub-steps for unevenly spaced t
+	else:
+
+		Istep = np.zeros([nt - 1, nE])
+		dT = np.diff(T)
+
+		for j in range(nsub):
+			U = T[:-1] + dT*(j + 0.5)/nsub #Kelvin
+			Istep += np.outer(steps/nsub, np.ones(nE))* \
+				np.exp(-np.outer(1/(R*U), E))
+
+		I[1:] = np.cumsum(Istep, axis = 0)
+
+	return I
+
+#define function to get the steps of the cumulative temperature integral
+def _rpo_I_steps(I, t, T):
+	'''
+	Returns the increments of the cumulative temperature integral and the
+	temperature at which each increment was evaluated.
+
+	Parameters
+	----------
+	I : np.ndarray
+		Cumulative temperature integral from ``_rpo_calc_I``.
+		Shape [`nt` x `nE`].
+
+	t : array-like
+		Array of timepoints, in seconds. Length `nt`.
+
+	T : array-like
+		Array of temperature, in Kelvin. Length `nt`.
+
+	Returns
+	-------
+	h : np.ndarray
+		Increment of `I` over each step. Shape [`nt` - 1 x `nE`].
+
+	Ts : np.ndarray
+		Temperature of each step, in Kelvin: the temperature at the start of
+		the step for evenly spaced `t` (as used by ``_rpo_calc_I``) and the
+		mean temperature of the step otherwise. Length `nt` - 1.
+	'''
+
+	t = np.asarray(t, dtype = float)
+	T = np.asarray(T, dtype = float)
+
+	h = np.diff(I, axis = 0)
+	steps = np.diff(t)
+
+	if len(steps) > 0 and np.allclose(steps, steps[0], rtol = 1e-6):
+		Ts = T[:-1]
+
+	else:
+		Ts = 0.5*(T[:-1] + T[1:])
+
+	return h, Ts
@@ -17,6 +17,13 @@ __all__ = ['_bd_plot_bge',
 
 import numpy as np
 
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pyplot on first use
+plt = _lazy_import('matplotlib.pyplot')
+
 #define function to plot carbon flux overlaid by BGE
 def _bd_plot_bge(
 	t_elapsed,
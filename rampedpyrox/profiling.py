@@ -0,0 +1,162 @@
+'''
+This module contains the Profiler class for opt-in timing of the analysis
+pipeline.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+__docformat__ = 'restructuredtext en'
+__all__ = ['Profiler']
+
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pandas on first use
+pd = _lazy_import('pandas')
+
+#import helper functions
+from .profiling_helper import(
+	_PROFILERS,
+	)
+
+class Profiler(object):
+	__doc__='''
+	Context manager recording the wall time, call count, and array sizes of
+	each stage of the analysis pipeline.
+
+	Parameters
+	----------
+	callback : None or function
+		If not `None`, function called with each record (a dictionary) as
+		it is made. Defaults to `None`.
+
+	sample : None or str
+		Label stored with each record, *e.g.* the sample being processed.
+		Can be changed at any time by setting the `sample` attribute.
+		Defaults to `None`.
+
+	Examples
+	--------
+	Profiling the processing of several samples::
+
+		#import modules
+		import rampedpyrox as rp
+
+		with rp.Profiler() as prof:
+			for name, file in files.items():
+				prof.sample = name
+
+				tg = rp.RpoThermogram.from_csv(file)
+				daem = rp.Daem.from_timedata(tg)
+				ec = rp.EnergyComplex.inverse_model(daem, tg)
+
+		#total time of each stage for each sample
+		print(prof.summary())
+
+		#every recorded call
+		prof.to_frame().to_csv('profile.csv')
+
+	Notes
+	-----
+	Stages are:
+
+		'ingest': reading and reducing thermogram, isotope, and IsoCaRB
+		data \\n
+		'model': calculating A matrices \\n
+		'lambda': L-curve lambda selection \\n
+		'nnls': regularized inversions \\n
+		'forward': forward models \\n
+		'E_frac': fraction E distributions \\n
+		'corrections': blank, mass-balance, and KIE corrections
+
+	Stages may be nested (*e.g.* 'nnls' within 'lambda'); each record stores
+	its nesting `depth`, and `summary` only sums outermost calls of each
+	stage by default. When no ``rp.Profiler`` is active, stage functions
+	are called directly. Calls made in worker processes (*e.g.* with
+	``processes > 1``) are not recorded.
+
+	**Attributes**
+
+	records : list
+		List of dictionaries containing the sample, stage, function, wall
+		time (s), argument shapes, and nesting depth of each call.
+	'''
+
+	def __init__(self, callback = None, sample = None):
+
+		self.callback = callback
+		self.sample = sample
+		self.records = []
+
+		self._depth = 0
+
+	def __enter__(self):
+
+		_PROFILERS.append(self)
+
+		return self
+
+	def __exit__(self, *exc):
+
+		_PROFILERS.remove(self)
+
+		return False
+
+	def _record(self, rec):
+		'''
+		Stores a single record and passes it to the callback, if any.
+		'''
+
+		self.records.append(rec)
+
+		if self.callback is not None:
+			self.callback(rec)
+
+	def to_frame(self):
+		'''
+		Returns all records as a ``pd.DataFrame``, one row per call.
+		'''
+
+		return pd.DataFrame(
+			self.records,
+			columns = ['sample', 'stage', 'function', 'time', 'shapes',
+				'depth'])
+
+	def summary(self, nested = False):
+		'''
+		Summarizes records as a table of total wall time (s) and call count
+		of each stage (columns) for each sample (rows).
+
+		Parameters
+		----------
+		nested : boolean
+			If `True`, also includes calls nested within another call of any
+			stage, so that times of nested stages are counted more than
+			once. Defaults to `False`.
+
+		Returns
+		-------
+		summary : pd.DataFrame
+			Table with a ('time', stage) and ('calls', stage) column for each
+			stage.
+		'''
+
+		df = self.to_frame()
+
+		if not nested:
+			df = df[df.depth == 0]
+
+		df = df.fillna({'sample': ''})
+
+		grouped = df.groupby(['sample', 'stage'])['time']
+
+		summary = pd.concat(
+			[grouped.sum().unstack(), grouped.count().unstack()],
+			axis = 1,
+			keys = ['time', 'calls'])
+
+		return summary.fillna(0)
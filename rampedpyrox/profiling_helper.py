@@ -0,0 +1,111 @@
+'''
+This module contains helper functions for opt-in profiling of the analysis
+pipeline.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+__docformat__ = 'restructuredtext en'
+__all__ = ['_PROFILERS',
+			'_arg_shapes',
+			'_stage',
+			]
+
+import functools
+import time
+
+#stack of active profilers; empty unless profiling is enabled
+_PROFILERS = []
+
+#high-resolution timer, falling back to wall time on Python 2
+_clock = getattr(time, 'perf_counter', time.time)
+
+#define function to summarize the array sizes of function arguments
+def _arg_shapes(args):
+	'''
+	Returns the shapes of all array-like positional arguments as a string,
+	*e.g.* '250x300, 250'. ``rp.Model`` instances are represented by the
+	shape of their A matrix.
+
+	Parameters
+	----------
+	args : tuple
+		Positional arguments.
+
+	Returns
+	-------
+	shapes : str
+		Comma-separated shapes.
+	'''
+
+	shapes = []
+
+	for arg in args:
+		shape = getattr(arg, 'shape', None)
+
+		if shape is None:
+			shape = getattr(getattr(arg, 'A', None), 'shape', None)
+
+		if shape is not None:
+			shapes.append('x'.join(str(s) for s in shape))
+
+	return ', '.join(shapes)
+
+#define decorator to record a pipeline stage
+def _stage(name):
+	'''
+	Decorator marking a function as a pipeline stage. When a profiler is
+	active, each call records the stage name, function name, wall time, and
+	argument shapes; otherwise the function is called directly.
+
+	Parameters
+	----------
+	name : str
+		Stage name, *e.g.* 'ingest' or 'nnls'.
+
+	Returns
+	-------
+	decorator : function
+		Decorator preserving the name and docstring of the decorated function.
+
+	Notes
+	-----
+	When no profiler is active, the only overhead is a single check of the
+	(empty) profiler stack.
+	'''
+
+	def decorator(func):
+
+		@functools.wraps(func)
+		def wrapper(*args, **kwargs):
+
+			if not _PROFILERS:
+				return func(*args, **kwargs)
+
+			prof = _PROFILERS[-1]
+			prof._depth += 1
+
+			t0 = _clock()
+
+			try:
+				return func(*args, **kwargs)
+
+			finally:
+				dt = _clock() - t0
+				prof._depth -= 1
+
+				prof._record({
+					'sample': prof.sample,
+					'stage': name,
+					'function': func.__name__,
+					'time': dt,
+					'shapes': _arg_shapes(args),
+					'depth': prof._depth,
+					})
+
+		return wrapper
+
+	return decorator
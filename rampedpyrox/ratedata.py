@@ -11,12 +11,18 @@ __docformat__ = 'restructuredtext en'
 __all__ = ['EnergyComplex']
 
 #import modules
-import matplotlib.pyplot as plt
 import numpy as np
 import warnings
 
 from numpy.linalg import norm
 
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pyplot on first use
+plt = _lazy_import('matplotlib.pyplot')
+
 #import exceptions
 from .exceptions import(
 	ArrayError,
@@ -24,6 +30,10 @@ from .exceptions import(
 	)
 
 #import helper functions
+from .io_helper import(
+	_ArchiveMixin,
+	)
+
 from .core_functions import(
 	assert_len,
 	)
@@ -40,7 +50,7 @@ from .model_helper import(
 	_calc_p,
 	)
 
-class RateData(object):
+class RateData(_ArchiveMixin):
 	'''
 	Class to store rate-dependent data. Intended for subclassing, do not call
 	directly.
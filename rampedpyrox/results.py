@@ -10,12 +10,19 @@ from __future__ import(
 __docformat__ = 'restructuredtext en'
 __all__ = ['RpoIsotopes']
 
-import matplotlib.pyplot as plt
 import numpy as np
 import warnings
 
 from collections import Sequence
 
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pandas and pyplot on first use
+pd = _lazy_import('pandas')
+plt = _lazy_import('matplotlib.pyplot')
+
 #import exceptions
 from .exceptions import(
 	ArrayError,
@@ -24,6 +31,10 @@ from .exceptions import(
 	)
 
 #import helper functions
+from .io_helper import(
+	_ArchiveMixin,
+	)
+
 from .core_functions import(
 	assert_len,
 	)
@@ -40,13 +51,15 @@ from .summary_helper import(
 from .results_helper import(
 	_calc_E_frac,
 	_rpo_blk_corr,
+	_rpo_blk_corr_mc,
 	_rpo_extract_iso,
+	_rpo_iso_inv,
 	_rpo_kie_corr,
 	_rpo_mass_bal_corr,
 	)
 
 
-class Results(object):
+class Results(_ArchiveMixin):
 	'''
 	Class to store resulting data (e.g. Rpo isotopes, pyGC composition, etc.).
 	Intended for subclassing. Do not call directly.
@@ -384,6 +397,14 @@ class RpoIsotopes(Results):
 		The standard deviation of E (kJ) contained in each measured fraction
 		as calculated by the inverse model, length `nFrac`.
 
+	d13C_E : np.ndarray
+		Array of d13C values (VPDB) at each E, as calculated by
+		``RpoIsotopes.calc_iso_E``. Length `nE`.
+
+	Fm_E : np.ndarray
+		Array of Fm values at each E, as calculated by
+		``RpoIsotopes.calc_iso_E``. Length `nE`.
+
 	Fm_corr : np.ndarray
 		Array of the blank-corrected Fm values of each measured fraction, 
 		length `nFrac`.
@@ -556,7 +577,10 @@ class RpoIsotopes(Results):
 			blk_Fm =  (0.555, 0.042),
 			bulk_d13C_true = None,
 			DE = 0.0018,
-			mass_err = 0.01):
+			mass_err = 0.01,
+			engine = None,
+			date_format = '%I:%M:%S %p',
+			kie_method = 'shift'):
 		'''
 		Class method to directly import RPO fraction data from a .csv file and
 		create an ``RpoIsotopes`` class instance.
@@ -593,11 +617,27 @@ class RpoIsotopes(Results):
 			et al., Radiocarbon **2017**. If not `none`, must be inputted in
 			the form [mean, stdev.]
 
+		date_format : str
+			Timestamp format used when `engine` is not `None`. Defaults to
+			'%I:%M:%S %p' (*i.e.* hh:mm:ss AM/PM).
+
 		DE : scalar
 			Value for the difference in E between 12C- and 13C-containing
 			atoms, in kJ. Defaults to 0.0018 (the best-fit value calculated
 			in Hemingway et al., Radiocarbon, **2017**).
 
+		engine : None or str
+			If not `None`, reads `file` in fast mode with the given parser
+			engine ('c' or 'pyarrow'): only the fraction, mass, and isotope
+			columns are parsed, as floats, and timestamps are parsed with
+			`date_format`. Falls back to the default reader if `file` has an
+			unexpected layout. Defaults to `None`.
+
+		kie_method : str
+			How to calculate the transform for 13C-containing atoms when
+			correcting for kinetic fractionation. See ``kie_correct``.
+			Defaults to 'shift'.
+
 		file : str or pd.DataFrame
 			File containing RPO isotope data, either as a string pointing
 			to a .csv file or as a ``pd.DataFrame`` instance.
@@ -605,7 +645,7 @@ class RpoIsotopes(Results):
 		mass_err : float
 			Relative uncertainty in mass measurements, typically as a sum of
 			manometric uncertainty in pressure measurements and uncertainty in
-			vacuum line volumes. Defaults to 0.01 (i.e. 1\% relative 
+			vacuum line volumes. Defaults to 0.01 (i.e. 1 percent relative 
 			uncertainty).
 
 		model : rp.Model
@@ -645,7 +685,9 @@ class RpoIsotopes(Results):
 		#extract data from file
 		d13C, d13C_std, Fm, Fm_std, m, m_std, t_frac = _rpo_extract_iso(
 			file,
-			mass_err)
+			mass_err,
+			engine = engine,
+			date_format = date_format)
 
 		#create RpoIsotopes instance and store raw data
 		ri = cls(
@@ -679,7 +721,8 @@ class RpoIsotopes(Results):
 			ri.kie_correct(
 				model,
 				ratedata,
-				DE = DE)
+				DE = DE,
+				method = kie_method)
 
 		return ri
 
@@ -688,7 +731,10 @@ class RpoIsotopes(Results):
 		blk_d13C = (-29.0, 0.1),
 		blk_flux = (0.375, 0.0583),
 		blk_Fm =  (0.555, 0.042),
-		bulk_d13C_true = None):
+		bulk_d13C_true = None,
+		nmc = None,
+		seed = None,
+		corr = 0):
 		'''
 		Method to blank- and mass-balance correct raw isotope values.
 
@@ -717,6 +763,23 @@ class RpoIsotopes(Results):
 			et al., Radiocarbon **2017**. If not `none`, must be inputted in
 			the form [mean, stdev.]
 
+		nmc : None or int
+			If not `None`, the number of Monte Carlo draws used to calculate
+			blank-corrected uncertainties instead of first-order error
+			propagation. A single blank flux and composition is drawn for all
+			fractions within each draw. Corrected values are unchanged. The
+			blank-corrected draws are stored in `m_corr_mc`, `d13C_corr_mc`,
+			and `Fm_corr_mc`, shape [`nmc` x `nFrac`], before any mass-balance
+			or KIE correction. Defaults to `None`.
+
+		seed : None or int
+			Seed for reproducible Monte Carlo draws. Defaults to `None`.
+
+		corr : scalar
+			Correlation coefficient (0-1) between the measurement errors of
+			different fractions, *e.g.* due to a shared manometer
+			calibration. Only used if `nmc` is not `None`. Defaults to 0.
+
 		Warnings
 		--------
 		UserWarning
@@ -744,14 +807,11 @@ class RpoIsotopes(Results):
 				'd13C has already been mass-balance corrected!'
 				' Proceeding anyway', UserWarning)
 
-		#define constants
-		n = self.nFrac
-
 		#extract d13C from self to be corrected
 		if hasattr(self, 'd13C_corr'):
 			d13C = self.d13C_corr
 			d13C_std = self.d13C_corr_std
-		
+
 		else:
 			d13C = self.d13C_raw
 			d13C_std = self.d13C_raw_std
@@ -774,6 +834,23 @@ class RpoIsotopes(Results):
 			m = self.m_raw
 			m_std = self.m_raw_std
 
+		#propagate uncertainty by Monte Carlo if requested
+		if nmc is not None:
+			d13C_mc, Fm_mc, m_mc = _rpo_blk_corr_mc(
+				d13C,
+				d13C_std,
+				Fm,
+				Fm_std,
+				m,
+				m_std,
+				self.t_frac,
+				blk_d13C = blk_d13C,
+				blk_flux = blk_flux,
+				blk_Fm = blk_Fm,
+				nmc = nmc,
+				seed = seed,
+				corr = corr)
+
 		#blank-correct values
 		d13C, d13C_std, Fm, Fm_std, m, m_std = _rpo_blk_corr(
 			d13C,
@@ -787,6 +864,20 @@ class RpoIsotopes(Results):
 			blk_flux = blk_flux,
 			blk_Fm = blk_Fm)
 
+		#replace first-order uncertainty with Monte Carlo uncertainty and
+		# store the draws
+		if nmc is not None:
+			m_std = np.std(m_mc, axis = 0)
+			self.m_corr_mc = m_mc
+
+			if d13C is not None:
+				d13C_std = np.std(d13C_mc, axis = 0)
+				self.d13C_corr_mc = d13C_mc
+
+			if Fm is not None:
+				Fm_std = np.std(Fm_mc, axis = 0)
+				self.Fm_corr_mc = Fm_mc
+
 		#set bookkeeping flag
 		self._blk_corr = True
 
@@ -803,6 +894,19 @@ class RpoIsotopes(Results):
 			#set bookkeeping flag
 			self._mb_corr = True
 
+		#store corrected values and summary table
+		self._store_corr(d13C, d13C_std, Fm, Fm_std, m, m_std)
+
+	#define method to store blank-corrected values
+	def _store_corr(self, d13C, d13C_std, Fm, Fm_std, m, m_std):
+		'''
+		Stores corrected values, if they exist, and generates the corrected
+		summary table.
+		'''
+
+		#define constants
+		n = self.nFrac
+
 		#store corrected values if they exist
 		if m is not None:
 			self.m_corr = assert_len(m, n)
@@ -838,7 +942,8 @@ class RpoIsotopes(Results):
 		self,
 		model,
 		ratedata,
-		DE = 0.0018):
+		DE = 0.0018,
+		method = 'shift'):
 		'''
 		Method for further correcting d13C values to account for kinetic 
 		isotope fractionation occurring within the instrument.
@@ -857,6 +962,14 @@ class RpoIsotopes(Results):
 			atoms, in kJ. Defaults to 0.0018 (the best-fit value calculated
 			in Hemingway et al., Radiocarbon, **2017**).
 
+		method : str
+			How to calculate the transform for 13C-containing atoms. 'shift'
+			rescales the temperature integral of `model` by the shift in E,
+			which is exact for evenly spaced time points; 'linear' uses the
+			first-order derivative of A with respect to E; and 'daem' builds
+			a new ``rp.Daem`` instance, as in previous versions. Defaults to
+			'shift'.
+
 		Warnings
 		--------
 		UserWarning
@@ -898,7 +1011,8 @@ class RpoIsotopes(Results):
 			d13C_std,
 			model,
 			ratedata,
-			DE = DE)
+			DE = DE,
+			method = method)
 
 		#set bookkeeping flag
 		self._kie_corr = True
@@ -915,6 +1029,94 @@ class RpoIsotopes(Results):
 		#store summary
 		self.ri_corr_info = _calc_ri_info(self, flag = 'corr')
 
+	#define method for inverting fraction isotopes as a function of E
+	def calc_iso_E(self, lam = 0.1, nonneg = True):
+		'''
+		Method for calculating continuous d13C and Fm distributions with
+		respect to E from the isotope values of each fraction.
+
+		Parameters
+		----------
+		lam : scalar
+			Tikhonov regularization weighting factor, penalizing the first
+			derivative of each isotope with respect to E. Defaults to 0.1.
+
+		nonneg : boolean
+			If `True`, constrains Fm and 13C/12C ratios to be non-negative.
+			Defaults to `True`.
+
+		Returns
+		-------
+		resid : pd.Series
+			Residual RMSE between measured and modeled fraction isotope
+			values, indexed by isotope.
+
+		Raises
+		------
+		ValueError
+			If the instance contains neither Fm nor d13C values.
+
+		Notes
+		-----
+		Corrected isotope values are used if they exist, raw values if not.
+		d13C is inverted as the 13C/12C ratio relative to VPDB so that the
+		isotope-weighted distributions, *e.g.* ``p(0,E)*Fm(E)``, are mass-
+		weighted. Fm and d13C are solved as one block system sharing a single
+		factorization (see ``_rpo_iso_inv``); results are stored as `Fm_E`
+		and `d13C_E`.
+
+		See Also
+		--------
+		EnergyComplex.inverse_model
+			Classmethod for inverting thermograms for p(0,E).
+		'''
+
+		#extract isotopes from self, corrected if they exist
+		names = []
+		iso = []
+
+		for name in ['Fm', 'd13C']:
+
+			if hasattr(self, name + '_corr'):
+				vals = getattr(self, name + '_corr')
+
+			elif hasattr(self, name + '_raw'):
+				vals = getattr(self, name + '_raw')
+
+			else:
+				continue
+
+			#convert d13C to ratio
+			if name == 'd13C':
+				vals = vals/1000 + 1
+
+			names.append(name)
+			iso.append(vals)
+
+		if not names:
+			raise ValueError(
+				'calc_iso_E requires Fm and/or d13C values')
+
+		#invert for all isotopes at once
+		iso_E, resid = _rpo_iso_inv(
+			self._p_frac,
+			self._E,
+			np.column_stack(iso),
+			lam = lam,
+			nonneg = nonneg)
+
+		#store results
+		for i, name in enumerate(names):
+
+			if name == 'd13C':
+				self.d13C_E = (iso_E[:,i] - 1)*1000
+				resid[i] = resid[i]*1000
+
+			else:
+				self.Fm_E = iso_E[:,i]
+
+		return pd.Series(resid, index = names)
+
 	#define plotting method
 	def plot(self, ax = None, plt_var = 'p0E', plt_corr = True):
 		'''
@@ -9,28 +9,46 @@ from __future__ import(
 
 __docformat__ = 'restructuredtext en'
 __all__ = ['_calc_cutoff', '_calc_E_frac','_rpo_blk_corr',
-	'_rpo_extract_iso', '_rpo_kie_corr', '_rpo_mass_bal_corr']
+	'_rpo_blk_corr_mc', '_rpo_extract_iso', '_rpo_iso_inv', '_rpo_kie_corr',
+	'_rpo_mass_bal_corr', '_rpo_mass_bal_corr_grouped']
 
 import numpy as np
-import pandas as pd
 import warnings
 
 from collections import Sequence
 from numpy.linalg import norm
-from scipy.optimize import least_squares
-from scipy.optimize import nnls
+
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pandas on first use
+pd = _lazy_import('pandas')
 
 #import Daem
 from .model import(
 	Daem
 	)
 
+#import helper functions
+from .model_helper import(
+	_rpo_calc_A_shift,
+	_rpo_calc_dAdE,
+	_rpo_I_from_A,
+	)
+
+from .mc_helper import(
+	_mc_draw,
+	_mc_rng,
+	)
+
 #import exceptions
 from .exceptions import(
 	ArrayError,
 	FileError,
 	LengthError,
 	ScalarError,
+	StringError,
 	)
 
 #import helper functions
@@ -39,6 +57,14 @@ from .core_functions import(
 	extract_moments,
 	)
 
+from .io_helper import(
+	_read_csv_fast,
+	)
+
+from .profiling_helper import(
+	_stage,
+	)
+
 #define a function to calculate cutoff indices for each RPO fraction
 def _calc_cutoff(result, model):
 	'''
@@ -60,39 +86,44 @@ def _calc_cutoff(result, model):
 		fraction. Length nFrac.
 
 	ind_max : np.ndarray
-		Index in ``timedata.t`` corresponding to the maximum time for each 
+		Index in ``timedata.t`` corresponding to the maximum time for each
 		fraction. Length nFrac.
+
+	Raises
+	------
+	IndexError
+		If the time range of any fraction contains no model time points.
+
+	Notes
+	-----
+	All cutoffs are found at once by binary search of the (increasing) model
+	time array, so any number of fractions, *e.g.* several candidate
+	fraction schemes stacked in `t_frac`, costs O(nFrac log nt).
 	'''
 
-	#extract shapes
-	nFrac = result.nFrac
-	nt = model.nt
-	
 	#extract arrays
-	t_frac = result.t_frac
+	t_frac = np.asarray(result.t_frac)
 	t = model.t
 
-	#pre-allocate index arrays
-	ind_min = np.zeros(nFrac, dtype = int)
-	ind_max = np.zeros(nFrac, dtype = int)
+	#first index with t > t0 and last index with t <= tf for each fraction
+	ind_first = np.searchsorted(t, t_frac[:,0], side = 'right')
+	ind_max = np.searchsorted(t, t_frac[:,1], side = 'right') - 1
 
-	#loop through and calculate indices
-	for i, row in enumerate(t_frac):
+	#fractions without any model time points would give empty slices
+	empty = ind_max < ind_first
 
-		#extract indices for each fraction
-		ind = np.where((t > row[0]) & (t <= row[1]))[0]
-
-		#store first and last indices
-		if ind[0] > 0:
-			ind_min[i] = ind[0] - 1 #subtract one so theres no gap!
-		else:
-			ind_min[i] = ind[0] #don't subtract one if it makes it negative
+	if np.any(empty):
+		raise IndexError(
+			'fraction(s) %s contain no model time points'
+			% list(np.where(empty)[0]))
 
-		ind_max[i] = ind[-1]
+	#subtract one so theres no gap, unless it makes it negative
+	ind_min = np.maximum(ind_first - 1, 0)
 
-	return ind_min, ind_max
+	return ind_min.astype(int), ind_max.astype(int)
 
 #define function to calculate the E values of each RPO fraction
+@_stage('E_frac')
 def _calc_E_frac(result, model, ratedata):
 	'''
 	Method for determining the distribution of E values contained within
@@ -124,6 +155,11 @@ def _calc_E_frac(result, model, ratedata):
 	p_frac : np.ndarray
 		2d array of the distribution of E contained in each RPO fraction,
 		shape [`nFrac` x `nE`].
+
+	Notes
+	-----
+	The rows of A at all cutoffs are extracted at once and the moments of
+	all rows of `p_frac` are calculated together.
 	'''
 
 	#calculate cutoff indices
@@ -133,40 +169,23 @@ def _calc_E_frac(result, model, ratedata):
 	A = model.A
 	E = ratedata.E
 	dE = np.gradient(E)
-	nE = ratedata.nE
-	nF = result.nFrac
 	p = ratedata.p
 
-	#make an empty matrix to store results
-	p_frac = np.zeros([nF, nE])
-	E_frac = np.zeros(nF)
-	E_frac_std = np.zeros(nF)
-
-	#loop through each time window and calculate p0E_diff distribution
-	for i in range(nF):
-
-		#extract indices
-		imin = ind_min[i]
-		imax = ind_max[i]
-
-		#p(E,t) at time 0
-		pt0 = p*A[imin,:]/dE #divide by dE so total area == 1
+	#p(E,t) at time 0 and time final of each fraction, dividing by dE so
+	# total area == 1
+	pt0 = p*A[ind_min,:]/dE
+	ptf = p*A[ind_max,:]/dE
 
-		#p(E,t) at time final
-		ptf = p*A[imax,:]/dE #divide by dE so total area == 1
+	#difference -- i.e. p(E) evolved over Dt
+	p_frac = pt0 - ptf
 
-		#difference -- i.e. p(E) evolved over Dt
-		Dpt = pt0 - ptf
-
-		#store in matrix
-		p_frac[i, :] = Dpt
-
-		#calculate the mean and stdev
-		E_frac[i], E_frac_std[i] = extract_moments(E, Dpt)
+	#calculate the mean and stdev of each fraction
+	E_frac, E_frac_std = extract_moments(E, p_frac)
 
 	return E_frac, E_frac_std, p_frac
 
 #define a function to blank-correct fraction isotopes
+@_stage('corrections')
 def _rpo_blk_corr(
 		d13C, 
 		d13C_std, 
@@ -306,11 +325,110 @@ def _rpo_blk_corr(
 			d13C_std_corr, 
 			Fm_corr, 
 			Fm_std_corr, 
-			m_corr, 
+			m_corr,
 			m_std_corr)
 
+#define function to propagate blank correction uncertainty by Monte Carlo
+@_stage('corrections')
+def _rpo_blk_corr_mc(
+		d13C,
+		d13C_std,
+		Fm,
+		Fm_std,
+		m,
+		m_std,
+		t,
+		blk_d13C = (-29.0, 0.1),
+		blk_flux = (0.375, 0.0583),
+		blk_Fm =  (0.555, 0.042),
+		nmc = 10000,
+		seed = None,
+		corr = 0):
+	'''
+	Propagates measurement and blank uncertainty through the blank
+	correction by Monte Carlo simulation. See ``_rpo_blk_corr`` for the
+	parameters shared with that function.
+
+	Parameters
+	----------
+	nmc : int
+		Number of draws. Defaults to `10000`.
+
+	seed : None or int
+		Seed for reproducible draws. Defaults to `None`.
+
+	corr : scalar
+		Correlation coefficient (0-1) between the measurement errors of
+		different fractions within each draw, *e.g.* due to a shared
+		manometer or standard calibration. Defaults to 0.
+
+	Returns
+	-------
+	d13C_mc : None or np.ndarray
+		Array of corrected d13C draws. Shape [nmc x nFrac].
+
+	Fm_mc : None or np.ndarray
+		Array of corrected Fm draws. Shape [nmc x nFrac].
+
+	m_mc : np.ndarray
+		Array of corrected mass draws (ugC). Shape [nmc x nFrac].
+
+	Notes
+	-----
+	Measured masses and isotope values are drawn with correlation `corr`
+	between fractions, while a single blank flux, blank d13C, and blank Fm
+	are drawn and applied to all fractions within each draw. The resulting
+	draws therefore retain the correlation between fractions introduced by
+	the blank, which first-order propagation in ``_rpo_blk_corr`` ignores.
+
+	References
+	----------
+	[1] J.D. Hemingway et al. (2017) Assessing the blank carbon contribution,
+		isotope mass balance, and kinetic isotope fractionation of the ramped
+		pyrolysis/oxidation instrument at NOSAMS. **Radiocarbon**
+	'''
+
+	rng = _mc_rng(seed)
+
+	#calculate blank mass for each fraction and draw, using a single blank
+	# flux (ug/s) per draw
+	dt = t[:,1] - t[:,0]
+	bl_flux = _mc_draw(rng, blk_flux[0]/1000, blk_flux[1]/1000, nmc)
+	bl_mass = bl_flux*dt #ug
+
+	#correct mass
+	m_mc = _mc_draw(rng, m, m_std, nmc, corr = corr)
+	m_corr = m_mc - bl_mass
+
+	#correct d13C
+	if d13C is not None:
+		d13C_mc = _mc_draw(rng, d13C, d13C_std, nmc, corr = corr)
+		bl_d13C = _mc_draw(rng, blk_d13C[0], blk_d13C[1], nmc)
+
+		d13C_mc = (m_mc*d13C_mc - bl_mass*bl_d13C)/m_corr
+
+	else:
+		d13C_mc = None
+
+	#correct Fm
+	if Fm is not None:
+		Fm_mc = _mc_draw(rng, Fm, Fm_std, nmc, corr = corr)
+		bl_Fm = _mc_draw(rng, blk_Fm[0], blk_Fm[1], nmc)
+
+		Fm_mc = (m_mc*Fm_mc - bl_mass*bl_Fm)/m_corr
+
+	else:
+		Fm_mc = None
+
+	return d13C_mc, Fm_mc, m_corr
+
 #define function to extract Rpo isotope data from .csv file
-def _rpo_extract_iso(file, mass_err):
+@_stage('ingest')
+def _rpo_extract_iso(
+	file,
+	mass_err,
+	engine = None,
+	date_format = '%I:%M:%S %p'):
 	'''
 	Extracts mass, d13C, and Fm from a .csv file to be used for to create an
 	``RpoIsotopes`` result instance.
@@ -325,6 +443,17 @@ def _rpo_extract_iso(file, mass_err):
 		Relative standard deviation on fraction masses. Defaults to 0.01 (i.e.
 		1 percent of measured mass).
 
+	engine : None or str
+		If not `None`, reads `file` in fast mode using the given parser
+		engine ('c' or 'pyarrow'), only parsing the fraction, mass, and
+		isotope columns as floats and parsing timestamps with `date_format`.
+		Falls back to the default reader if `file` has an unexpected layout.
+		Defaults to `None`.
+
+	date_format : str
+		``strftime`` format of the timestamps, only used if `engine` is not
+		`None`. Defaults to '%I:%M:%S %p' (*i.e.* hh:mm:ss AM/PM).
+
 	Returns
 	-------
 	d13C : None or np.ndarray
@@ -374,7 +503,15 @@ def _rpo_extract_iso(file, mass_err):
 
 	#import file as a pd.DataFrame if inputted as a string path and check
 	#that it is in the right format
-	if isinstance(file, str):
+	if isinstance(file, str) and engine is not None:
+		#import only necessary columns
+		file = _read_csv_fast(
+			file,
+			['fraction','ug_frac','d13C','d13C_std','Fm','Fm_std'],
+			date_format = date_format,
+			engine = engine)
+
+	elif isinstance(file, str):
 		# file = pd.DataFrame.from_csv(file)
 
 		#UPDATING TO DEAL WITH DEPRECATED PANDAS CALL 25 JULY 2020
@@ -448,14 +585,120 @@ def _rpo_extract_iso(file, mass_err):
 			m_std,
 			t)
 
+#define function to invert fraction isotopes for continuous isotopes in E
+@_stage('nnls')
+def _rpo_iso_inv(p_frac, E, iso, lam = 0.1, nonneg = True):
+	'''
+	Inverts isotope values of each RPO fraction for continuous isotope values
+	as a function of E, solving all isotopes as one block system.
+
+	Parameters
+	----------
+	p_frac : np.ndarray
+		2d array of the distribution of E contained in each RPO fraction,
+		shape [`nFrac` x `nE`].
+
+	E : np.ndarray
+		Array of E values (kJ/mol), length `nE`.
+
+	iso : np.ndarray
+		2d array of the (mass-weighted, non-negative) isotope values of each
+		fraction, *e.g.* Fm, shape [`nFrac` x `nIso`]. Fractions containing
+		any `NaN` value are ignored.
+
+	lam : scalar
+		Tikhonov regularization weighting factor, `lambda`, penalizing the
+		first derivative of each isotope with respect to E. Defaults to 0.1.
+
+	nonneg : boolean
+		If `True`, constrains isotope values to be non-negative. Defaults to
+		`True`.
+
+	Returns
+	-------
+	iso_E : np.ndarray
+		2d array of the isotope values at each E, shape [`nE` x `nIso`].
+
+	resid : np.ndarray
+		Residual RMSE between measured and modeled fraction isotope values,
+		length `nIso`.
+
+	Notes
+	-----
+	The isotope-weighted distribution of each isotope, ``p(E)*iso(E)``, must
+	integrate to the measured mass-weighted value over each fraction. Since
+	the rows of `p_frac` are the same for all isotopes, this is a block-
+	diagonal system with identical, sparse blocks. Its regularized normal
+	equations are factorized once and solved for all isotopes together. If
+	non-negativity is required but not satisfied, the full sparse block
+	system is instead solved as a single bounded least-squares problem.
+
+	References
+	----------
+	[1] P.C. Hansen (1994) Regularization tools: A Matlab package for analysis
+		and solution of discrete ill-posed problems. *Numerical Algorithms*, 
+		**6**, 1-35.
+	'''
+
+	#import scipy on first use
+	from scipy import sparse
+	from scipy.optimize import lsq_linear
+	from scipy.sparse.linalg import splu
+
+	iso = np.array(iso, dtype = float, ndmin = 2)
+
+	if iso.shape[0] != len(p_frac):
+		iso = iso.T
+
+	#drop fractions without data
+	ind = np.all(np.isfinite(iso), axis = 1)
+	nF, nIso = np.shape(iso[ind])
+	nE = len(E)
+
+	#fraction operator, normalized so each row takes the mean over a fraction
+	G = p_frac[ind]*np.gradient(E)
+	G = sparse.csr_matrix(G/np.sum(G, axis = 1)[:, None])
+
+	#1st derivative operator
+	D = sparse.diags(
+		[-np.ones(nE - 1), np.ones(nE - 1)],
+		[0, 1],
+		shape = (nE - 1, nE))
+
+	#factorize normal equations once and solve for all isotopes
+	M = (G.T.dot(G) + lam**2*D.T.dot(D)).tocsc()
+	iso_E = splu(M).solve(G.T.dot(iso[ind]))
+
+	#solve block system with bounds if necessary
+	if nonneg and np.any(iso_E < 0):
+		I = sparse.identity(nIso)
+
+		A_reg = sparse.vstack([
+			sparse.kron(I, G),
+			lam*sparse.kron(I, D)]).tocsr()
+
+		b_reg = np.concatenate([
+			iso[ind].T.ravel(),
+			np.zeros(nIso*(nE - 1))])
+
+		res = lsq_linear(A_reg, b_reg, bounds = (0, np.inf))
+		iso_E = res.x.reshape(nIso, nE).T
+
+	#calculate errors
+	resid = norm(G.dot(iso_E) - iso[ind], axis = 0)/nF**0.5
+
+	return iso_E, resid
+
 #define function to correct d13C for kinetic fractionation
+@_stage('corrections')
 def _rpo_kie_corr(
 	result,
 	d13C,
 	d13C_std,
 	model,
 	ratedata,
-	DE = 0.0018):
+	DE = 0.0018,
+	method = 'shift'):
 
 	'''
 	Corrects d13C values for each RPO fraction for kinetic isotope effects.
@@ -483,47 +726,90 @@ def _rpo_kie_corr(
 		atoms, in kJ. Defaults to 0.0018 (the best-fit value calculated
 		in Hemingway et al., **2017**).
 
+	method : str
+		How to calculate the transform for 13C-containing atoms. 'shift'
+		rescales the existing temperature integral exactly (see
+		``_rpo_calc_A_shift``), 'linear' uses the first-order expansion
+		``A + DE*dA/dE`` (see ``_rpo_calc_dAdE``), and 'daem' builds a new
+		``rp.Daem`` instance. Defaults to 'shift'.
+
 	Returns
 	-------
 	d13C_corr : np.ndarray
-		Array of the fractionation-corrected d13C values (VPDB) of each 
+		Array of the fractionation-corrected d13C values (VPDB) of each
 		measured fraction, length `nFrac`.
 
 	d13C_corr_std : np.ndarray
 		The standard deviation of `d13C_corr` with length `nFrac`.
+
+	Raises
+	------
+	StringError
+		If `method` is not 'shift', 'linear', or 'daem'.
+
+	Notes
+	-----
+	'shift' is identical to 'daem' for evenly spaced model time points. Since
+	DE is ~1e-5 of E, 'linear' differs from both by order DE**2. Both avoid
+	re-evaluating the Arrhenius exponential by reusing the temperature
+	integral stored with `model` (see ``rp.Daem``, `keep_I`) or, if it is
+	not stored, recovering it from the A matrix of `model`.
 	'''
 
-	#generate daem for 13C-containing atoms
-	daem13 = Daem(model.E+DE, model.log10omega, model.t, model.T)
+	#calculate 12C thermogram
+	p = ratedata.p
+	tg12 = np.dot(model.A, p)
 
-	#calculate ratio of rates, the KIE
-	tg12 = np.dot(model.A,ratedata.p)
-	tg13 = np.dot(daem13.A,ratedata.p)
-	r = np.gradient(tg13)/np.gradient(tg12)
+	#calculate 13C thermogram
+	if method == 'daem':
+		#generate daem for 13C-containing atoms
+		daem13 = Daem(model.E+DE, model.log10omega, model.t, model.T)
+		tg13 = np.dot(daem13.A, p)
+
+	elif method in ['shift', 'linear']:
+		#get temperature integral, recovering it from A if not stored
+		I = getattr(model, '_I', None)
 
-	#for each time slice, calculate KIE-corrected d13C
-	d13C_corr = []
+		if I is None:
+			I = _rpo_I_from_A(model.A, model.E, model.log10omega)
+
+		if method == 'shift':
+			A13 = _rpo_calc_A_shift(
+				model.E, model.log10omega, model.t, model.T, I, DE,
+				A = model.A)
+			tg13 = np.dot(A13, p)
+
+		else:
+			dAdE = _rpo_calc_dAdE(
+				model.A, model.log10omega, model.t, model.T, I)
+			tg13 = tg12 + DE*np.dot(dAdE, p)
+
+	else:
+		raise StringError(
+			'method must be "shift", "linear", or "daem"')
+
+	#calculate ratio of rates, the KIE
+	dtg12 = np.gradient(tg12)
+	r = np.gradient(tg13)/dtg12
 
 	#calculate cutoff indices
 	ind_min, ind_max = _calc_cutoff(result, model)
 
-	#loop through and correct each measurement
-	for mi, ma, d13i in zip(ind_min, ind_max, d13C):
-		
-		#weighted-average kie for each slice
-		kie_i = np.average(r[mi:ma], weights = -np.gradient(tg12)[mi:ma])
+	#weighted-average kie for each slice, using cumulative sums
+	w = -dtg12
+	cw = np.append(0, np.cumsum(w))
+	crw = np.append(0, np.cumsum(r*w))
 
-		#convert measured d13C to ratio
-		R13_i = (d13i/1000 + 1)*0.011237
+	kie = (crw[ind_max] - crw[ind_min])/(cw[ind_max] - cw[ind_min])
 
-		#divide by kie_i to correct
-		R13_i_corr = R13_i/kie_i
+	#convert measured d13C to ratio
+	R13 = (np.asarray(d13C, dtype = float)/1000 + 1)*0.011237
 
-		#convert back to d13C
-		d13C_i_corr = (R13_i_corr/0.011237 - 1)*1000
+	#divide by kie to correct
+	R13_corr = R13/kie
 
-		#append list
-		d13C_corr.append(d13C_i_corr)
+	#convert back to d13C
+	d13C_corr = (R13_corr/0.011237 - 1)*1000
 
 	#since uncertainty is unknown, d13C_std is unchanged
 	d13C_corr_std = d13C_std
@@ -531,6 +817,7 @@ def _rpo_kie_corr(
 	return d13C_corr, d13C_corr_std
 
 #define function to correct d13C for isotope mass balance
+@_stage('corrections')
 def _rpo_mass_bal_corr(
 	d13C,
 	d13C_std,
@@ -606,3 +893,79 @@ def _rpo_mass_bal_corr(
 
 	return d13C_corr, d13C_corr_std
 
+
+#define function to mass-balance correct d13C for many samples at once
+@_stage('corrections')
+def _rpo_mass_bal_corr_grouped(
+	d13C,
+	d13C_std,
+	m,
+	m_std,
+	groups,
+	bulk_d13C_true):
+	'''
+	Corrects d13C values of the fractions of many samples at once for isotope
+	mass balance. See ``_rpo_mass_bal_corr`` for details.
+
+	Parameters
+	----------
+	d13C : np.ndarray
+		Array of the d13C values (VPDB) of the fractions of all samples,
+		length `n`.
+
+	d13C_std : np.ndarray
+		The standard deviation of `d13C` with length `n`.
+
+	m : np.ndarray
+		Array of the masses (ugC) of the fractions of all samples, length `n`.
+
+	m_std : np.ndarray
+		The standard deviation of `m` with length `n`.
+
+	groups : np.ndarray
+		Integer index of the sample of each fraction, length `n`.
+
+	bulk_d13C_true : np.ndarray
+		2d array of the true bulk d13C of each sample, in the form
+		[mean, stdev.]. Shape [`nS` x 2]. Samples with a `NaN` mean are not
+		corrected.
+
+	Returns
+	-------
+	d13C_corr : np.ndarray
+		Array of the mass-balance-corrected d13C values (VPDB), length `n`.
+
+	d13C_corr_std : np.ndarray
+		The standard deviation of `d13C_corr` with length `n`.
+
+	Notes
+	-----
+	Per-sample sums are calculated with ``np.bincount`` in a single pass over
+	all fractions, and agree with ``_rpo_mass_bal_corr`` applied to each
+	sample separately.
+	'''
+
+	groups = np.asarray(groups, dtype = int)
+	bulk_d13C_true = np.asarray(bulk_d13C_true, dtype = float)
+	nS = len(bulk_d13C_true)
+
+	#calculate the fractional contribution by each RPO fraction
+	f = m/np.bincount(groups, weights = m, minlength = nS)[groups]
+
+	#calculate the weighted-average d13C, d13C_std of each sample
+	d13C_wgh = np.bincount(groups, weights = f*d13C, minlength = nS)
+	d13C_wgh_var = np.bincount(groups, weights = (f*d13C_std)**2,
+		minlength = nS)
+
+	#calculate mass-balance-corrected values for samples with a bulk value
+	bulk = bulk_d13C_true[groups]
+	ind = ~np.isnan(bulk[:,0])
+
+	d13C_corr = np.array(d13C, dtype = float)
+	d13C_corr_std = np.array(d13C_std, dtype = float)
+
+	d13C_corr[ind] = d13C[ind] + (bulk[ind,0] - d13C_wgh[groups][ind])
+	d13C_corr_std[ind] = (d13C_std[ind]**2 + bulk[ind,1]**2 + \
+		d13C_wgh_var[groups][ind])**0.5
+
+	return d13C_corr, d13C_corr_std
@@ -0,0 +1,154 @@
+'''
+This module contains the SharedArrays class for sending large arrays to
+worker processes without copying them.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+__docformat__ = 'restructuredtext en'
+__all__ = ['SharedArrays']
+
+import numpy as np
+
+#import helper functions
+from .shared_helper import(
+	_ACTIVE,
+	_ATTACHED,
+	_RELEASED,
+	_close_segments,
+	_share_array,
+	)
+
+class SharedArrays(object):
+	__doc__='''
+	Context manager that moves the large arrays of rampedpyrox objects (*e.g.*
+	``rp.Model.A`` or ``rp.TimeData`` arrays) into shared memory. Within the
+	context, the objects pickle as lightweight handles and are reattached
+	without copying in any process that unpickles them, so that they can be
+	sent to ``multiprocessing`` workers cheaply.
+
+	Parameters
+	----------
+	objs : rp.Model or rp.TimeData
+		Instances whose arrays to share.
+
+	min_bytes : int
+		Only arrays with at least this many bytes are shared. Defaults to
+		65536.
+
+	Examples
+	--------
+	Inverse modeling many thermograms with a single, shared model::
+
+		#import modules
+		import multiprocessing
+		import rampedpyrox as rp
+
+		def invert(job):
+			daem, tg = job
+			return rp.EnergyComplex.inverse_model(daem, tg, lam = 1).p
+
+		if __name__ == '__main__':
+			daem = rp.Daem.from_timedata(tgs[0], nE = 500)
+
+			with rp.SharedArrays(daem, *tgs):
+				with multiprocessing.Pool(4) as pool:
+					P = pool.map(invert, [(daem, tg) for tg in tgs])
+
+	Notes
+	-----
+	Shared arrays are ordinary ``np.ndarray`` instances backed by
+	``multiprocessing.shared_memory`` segments, so writes made in any process
+	are visible to all processes. Arrays that are already memory-mapped
+	read-only from an archive (*i.e.* loaded with ``mmap_mode = 'r'``) are
+	shared by file name and offset instead of being copied.
+
+	On leaving the context, shared arrays are copied back into private memory
+	and all segments are freed. Objects that still refer to freed segments
+	(*e.g.* returned by workers within the context) and attributes reassigned
+	within the context are pickled as usual. Copies made within the context
+	(*e.g.* with ``copy.deepcopy``) refer to the same shared memory.
+
+	Segments still used by arrays in this process (*e.g.* of objects
+	returned by workers within the context) are unmapped once those arrays
+	are deleted. Worker processes keep attached segments open until they
+	exit.
+	Requires Python 3.8 or newer.
+	'''
+
+	def __init__(self, *objs, **kwargs):
+
+		self.objs = objs
+		self.min_bytes = kwargs.pop('min_bytes', 2**16)
+
+		if kwargs:
+			raise TypeError(
+				'Unexpected keyword arguments: %s' % ', '.join(kwargs))
+
+		self._atts = []
+		self._segments = []
+
+	def __enter__(self):
+
+		for obj in self.objs:
+
+			shared = obj.__dict__.setdefault('_shared', {})
+
+			for att, val in list(vars(obj).items()):
+
+				if att in shared or not isinstance(val, np.ndarray) or \
+					val.dtype.hasobject or val.nbytes < self.min_bytes:
+					continue
+
+				handle, view, shm = _share_array(val)
+
+				setattr(obj, att, view)
+				shared[att] = (handle, view)
+				self._atts.append((obj, att))
+
+				if shm is not None:
+					self._segments.append(shm)
+					_ACTIVE[shm.name] = shm
+
+			if not shared:
+				del obj.__dict__['_shared']
+
+		return self
+
+	def __exit__(self, *exc):
+
+		#copy arrays back into private memory
+		for obj, att in self._atts:
+
+			shared = obj.__dict__['_shared']
+			handle, view = shared.pop(att)
+
+			if handle[0] == 'shm' and getattr(obj, att, None) is view:
+				setattr(obj, att, np.array(view))
+
+			if not shared:
+				del obj.__dict__['_shared']
+
+		view = None
+		self._atts = []
+
+		#free segments, including any second mappings of them made in this
+		# process; segments are only unmapped once no arrays use them
+		segments = list(self._segments)
+
+		for shm in self._segments:
+			del _ACTIVE[shm.name]
+			_RELEASED.add(shm.name)
+
+			if shm.name in _ATTACHED:
+				segments.append(_ATTACHED.pop(shm.name))
+
+			shm.unlink()
+
+		_close_segments(segments)
+		self._segments = []
+
+		return False
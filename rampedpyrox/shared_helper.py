@@ -0,0 +1,253 @@
+'''
+This module contains helper functions for sharing arrays of rampedpyrox
+objects with worker processes without copying them.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+__docformat__ = 'restructuredtext en'
+__all__ = ['_ACTIVE',
+			'_RELEASED',
+			'_attach_array',
+			'_close_segments',
+			'_is_live',
+			'_share_array',
+			'_shared_getstate',
+			'_shared_setstate',
+			]
+
+import mmap
+import numpy as np
+
+#shared memory segments attached in this process, kept open until exit
+_ATTACHED = {}
+
+#segments created by SharedArrays contexts in this process that are still
+# active, by name, and names of those that have since been freed
+_ACTIVE = {}
+_RELEASED = set()
+
+#freed segments that could not be closed because arrays still use them
+_CLOSING = []
+
+#define function to create or attach a shared memory segment
+def _shared_memory(name = None, size = 0):
+	'''
+	Creates a new shared memory segment of `size` bytes if `name` is `None`,
+	otherwise attaches to the existing segment `name`.
+	'''
+
+	from multiprocessing import shared_memory
+
+	if name is None:
+		return shared_memory.SharedMemory(create = True, size = size)
+
+	#attached segments are owned by the creating process, so do not let this
+	# process's resource tracker unlink them (Python >= 3.13)
+	try:
+		return shared_memory.SharedMemory(name = name, track = False)
+
+	except TypeError:
+		return shared_memory.SharedMemory(name = name)
+
+#define function to move an array into shared memory
+def _share_array(arr):
+	'''
+	Makes a shared version of an array and a lightweight handle that can be
+	used to attach to it from another process.
+
+	Parameters
+	----------
+	arr : np.ndarray
+		Array to share.
+
+	Returns
+	-------
+	handle : tuple
+		Picklable handle, either ('shm', name, shape, dtype) or ('mmap',
+		file, offset, shape, dtype, order).
+
+	view : np.ndarray
+		Shared array, equal to `arr`.
+
+	shm : None or multiprocessing.shared_memory.SharedMemory
+		Newly created shared memory segment, which the caller must close and
+		unlink. `None` if `arr` is already a read-only memory-mapped file.
+
+	Notes
+	-----
+	Arrays memory-mapped read-only from a file (*e.g.* loaded with
+	``mmap_mode = 'r'``) are shared by file name and offset rather than
+	copied into shared memory.
+	'''
+
+	if isinstance(arr, np.memmap) and arr.mode == 'r' and \
+		isinstance(arr.base, mmap.mmap):
+
+		order = 'F' if arr.flags.f_contiguous and not \
+			arr.flags.c_contiguous else 'C'
+
+		handle = ('mmap', arr.filename, arr.offset, arr.shape,
+			arr.dtype.str, order)
+
+		return handle, arr, None
+
+	shm = _shared_memory(size = max(arr.nbytes, 1))
+
+	view = _buffer_view(shm, arr.shape, arr.dtype)
+	view[...] = arr
+
+	handle = ('shm', shm.name, arr.shape, arr.dtype.str)
+
+	return handle, view, shm
+
+#define function to attach to a shared array
+def _attach_array(handle):
+	'''
+	Returns the shared array described by a handle made by
+	``_share_array``, without copying.
+	'''
+
+	if handle[0] == 'mmap':
+		_, file, offset, shape, dtype, order = handle
+
+		return np.memmap(
+			file,
+			dtype = dtype,
+			mode = 'r',
+			offset = offset,
+			shape = shape,
+			order = order)
+
+	_, name, shape, dtype = handle
+
+	#reuse segments created in this process rather than mapping them twice
+	shm = _ACTIVE.get(name) or _ATTACHED.get(name)
+
+	if shm is None:
+		shm = _ATTACHED[name] = _shared_memory(name = name)
+
+	return _buffer_view(shm, shape, dtype)
+
+#define function to make an array view of a shared memory segment
+def _buffer_view(shm, shape, dtype):
+	'''
+	Returns a writeable array of `shape` and `dtype` backed by `shm`.
+
+	Notes
+	-----
+	Unlike ``np.ndarray(..., buffer = shm.buf)``, the view holds a buffer
+	export of the segment, so ``shm.close()`` raises BufferError rather than
+	unmapping memory still used by the view.
+	'''
+
+	count = int(np.prod(shape))
+
+	return np.frombuffer(shm.buf, dtype = dtype, count = count).reshape(shape)
+
+#define function to close shared memory segments once unused
+def _close_segments(segments):
+	'''
+	Closes shared memory segments in this process. Segments still used by
+	arrays are kept and closed on a later call, once the arrays are gone.
+	'''
+
+	pending = _CLOSING + list(segments)
+	del _CLOSING[:]
+
+	for shm in pending:
+		try:
+			shm.close()
+
+		except BufferError:
+			_CLOSING.append(shm)
+
+#define function to check whether a shared array can still be attached to
+def _is_live(handle):
+	'''
+	Returns `True` if the shared array described by a handle made by
+	``_share_array`` can still be attached to, *i.e.* if it is memory-mapped
+	from a file or its segment has not been freed by a SharedArrays context
+	in this process.
+
+	Notes
+	-----
+	Segments created in another process (*e.g.* in the parent of a worker)
+	are assumed to be live, since their creating context is still active
+	while workers run.
+	'''
+
+	return handle[0] == 'mmap' or handle[1] in _ACTIVE or \
+		handle[1] not in _RELEASED
+
+#define function to get the pickled state of an object with shared arrays
+def _shared_getstate(obj):
+	'''
+	Returns the attribute dictionary of `obj` for pickling, with each shared
+	array replaced by its handle.
+
+	Notes
+	-----
+	Shared arrays are stored in ``obj._shared`` as a dictionary mapping each
+	attribute name to (handle, view). Attributes that have been reassigned
+	since sharing, or whose segment has been freed, are pickled as usual.
+	'''
+
+	state = obj.__dict__
+	shared = state.get('_shared')
+
+	if not shared:
+		return state
+
+	state = dict(state)
+	handles = {}
+
+	for att, (handle, view) in shared.items():
+
+		if state.get(att) is view and _is_live(handle):
+			state[att] = None
+			handles[att] = handle
+
+	if handles:
+		state['_shared'] = handles
+
+	else:
+		del state['_shared']
+
+	return state
+
+#define function to set the unpickled state of an object with shared arrays
+def _shared_setstate(obj, state):
+	'''
+	Sets the attribute dictionary of `obj` from a pickled state, attaching to
+	each shared array.
+
+	Notes
+	-----
+	Arrays whose segment has already been freed by a SharedArrays context in
+	this process are copied into private memory instead, so that the object
+	remains usable and does not pickle stale handles.
+	'''
+
+	handles = state.pop('_shared', None)
+	obj.__dict__.update(state)
+
+	if handles:
+		shared = {}
+
+		for att, handle in handles.items():
+			view = _attach_array(handle)
+
+			if _is_live(handle):
+				shared[att] = (handle, view)
+
+			else:
+				view = np.array(view)
+
+			setattr(obj, att, view)
+
+		if shared:
+			obj._shared = shared
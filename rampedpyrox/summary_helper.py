@@ -16,7 +16,13 @@ __all__ = [
 	]
 
 import numpy as np
-import pandas as pd
+
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pandas on first use
+pd = _lazy_import('pandas')
 
 #import helper functions
 from .core_functions import(
@@ -0,0 +1,203 @@
+'''
+This module contains functions for generating synthetic rampedpyrox data for
+load and accuracy testing.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+__docformat__ = 'restructuredtext en'
+__all__ = ['make_synthetic_thermograms']
+
+import numpy as np
+import os
+
+#import classes
+from .model import(
+	Daem,
+	)
+
+#import helper functions
+from .mc_helper import(
+	_mc_rng,
+	)
+
+from .model_helper import(
+	_calc_ghat_batch,
+	)
+
+from .synthetic_helper import(
+	_synth_labview,
+	_synth_p,
+	)
+
+#define function to generate synthetic thermograms
+def make_synthetic_thermograms(
+	n,
+	beta = 5,
+	E_max = 350,
+	E_min = 50,
+	E_mu = (130, 250),
+	E_sig = (5, 20),
+	log10omega = 10,
+	max_peaks = 3,
+	nE = 250,
+	noise = 0,
+	nt = 250,
+	path = None,
+	ppm_noise = 0,
+	seed = None,
+	T0 = 100,
+	Tf = 1000):
+	'''
+	Generates `n` random multi-peak energy complexes and the corresponding
+	thermograms, forward modeled in bulk onto a shared ``rp.Daem`` instance.
+
+	Parameters
+	----------
+	n : int
+		Number of synthetic samples.
+
+	beta : scalar
+		Ramp rate, in K/min. Defaults to 5.
+
+	E_max : int
+		The maximum activation energy value to consider, in kJ/mol.
+		Defaults to 350.
+
+	E_min : int
+		The minimum activation energy value to consider, in kJ/mol.
+		Defaults to 50.
+
+	E_mu : tuple
+		Range of Gaussian peak means, in kJ/mol, in the form (min, max).
+		Defaults to (130, 250).
+
+	E_sig : tuple
+		Range of Gaussian peak stdev., in kJ/mol, in the form (min, max).
+		Defaults to (5, 20).
+
+	log10omega : scalar, array-like, or lambda function
+		Arrhenius pre-exponential factor. Defaults to 10.
+
+	max_peaks : int
+		Maximum number of Gaussian peaks in each energy complex. Defaults
+		to 3.
+
+	nE : int
+		The number of activation energy points. Defaults to 250.
+
+	noise : scalar
+		Stdev. of Gaussian noise added to the fraction of carbon remaining,
+		`g`. Noisy values are clipped to between 0 and 1. Defaults to 0.
+
+	nt : int
+		The number of timepoints. Defaults to 250.
+
+	path : None or str
+		If not `None`, directory in which to write each thermogram as a
+		LabView-format .csv file named 'synth_<i>_all_data.csv', readable by
+		``rp.RpoThermogram.from_csv`` and ``rp.load_rpo_batch``. Defaults
+		to `None`.
+
+	ppm_noise : scalar
+		Stdev. of Gaussian noise added to the CO2 concentrations (ppm) of
+		written .csv files. Defaults to 0.
+
+	seed : None or int
+		Seed for reproducible draws. Defaults to `None`.
+
+	T0 : scalar
+		Initial temperature, in C. Defaults to 100.
+
+	Tf : scalar
+		Final temperature, in C. Defaults to 1000.
+
+	Returns
+	-------
+	daem : rp.Daem
+		``rp.Daem`` instance shared by all samples.
+
+	P : np.ndarray
+		2d array of the true p(0,E) of each sample. Shape [`n` x `nE`]. An
+		``rp.EnergyComplex`` instance of sample `i` can be created as
+		``rp.EnergyComplex(daem.E, p = P[i])``.
+
+	G : np.ndarray
+		2d array of the (noisy) fraction of carbon remaining at each timepoint
+		(rows) of each sample (columns). Shape [`nt` x `n`].
+
+	See Also
+	--------
+	RpoThermogram.forward_model_batch
+		Method for forward modeling many rate data at once.
+
+	Examples
+	--------
+	Generating 1000 noisy thermograms and inverting the first::
+
+		#import modules
+		import rampedpyrox as rp
+
+		daem, P, G = rp.make_synthetic_thermograms(
+			1000,
+			noise = 0.001,
+			seed = 0)
+
+		tg = rp.RpoThermogram(daem.t, daem.T, g = G[:,0])
+		ec = rp.EnergyComplex.inverse_model(daem, tg)
+
+	Writing LabView files to load-test the ingest path::
+
+		daem, P, G = rp.make_synthetic_thermograms(
+			100,
+			path = 'synthetic/',
+			ppm_noise = 1)
+
+		tgs, isos, errors = rp.load_rpo_batch('synthetic/')
+
+	Notes
+	-----
+	Peak parameters of all samples are drawn at once and all thermograms are
+	forward modeled with a single matrix-matrix product. Only writing .csv
+	files loops over samples. Distributions are returned as an array rather
+	than ``rp.EnergyComplex`` instances since creating summary tables for
+	each instance would dominate the run time for large `n`.
+	'''
+
+	rng = _mc_rng(seed)
+
+	#generate shared E, t, and T arrays and model
+	E = np.linspace(E_min, E_max, nE)
+	tf = (Tf - T0)/beta*60 #s
+	t = np.linspace(0, tf, nt)
+	T = T0 + 273.15 + beta/60*t #K
+
+	daem = Daem(E, log10omega, t, T)
+
+	#draw energy complexes and forward model all at once
+	P = _synth_p(rng, E, n, max_peaks, E_mu, E_sig)
+	G = _calc_ghat_batch(daem, P)
+
+	#add noise
+	if noise > 0:
+		G = G + rng.normal(0, noise, size = G.shape)
+
+	G = np.clip(G, 0, 1)
+
+	#write LabView files if necessary
+	if path is not None:
+
+		if not os.path.isdir(path):
+			os.makedirs(path)
+
+		w = len(str(n - 1))
+
+		for i in range(n):
+			file = _synth_labview(t, T, G[:,i], rng, ppm_noise = ppm_noise)
+			file.to_csv(
+				os.path.join(path, 'synth_%0*d_all_data.csv' % (w, i)))
+
+	return daem, P, G
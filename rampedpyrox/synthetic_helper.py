@@ -0,0 +1,170 @@
+'''
+This module contains helper functions for generating synthetic rampedpyrox
+data.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+__docformat__ = 'restructuredtext en'
+__all__ = ['_synth_labview',
+			'_synth_p',
+			]
+
+import numpy as np
+
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pandas on first use
+pd = _lazy_import('pandas')
+
+#define function to draw random multi-peak distributions of E
+def _synth_p(rng, E, n, max_peaks, E_mu, E_sig):
+	'''
+	Draws `n` random mixtures of Gaussian peaks on a shared E grid.
+
+	Parameters
+	----------
+	rng : np.random.RandomState
+		Random number generator, *e.g.* from ``_mc_rng``.
+
+	E : np.ndarray
+		Array of E values, in kJ/mol. Length `nE`.
+
+	n : int
+		Number of distributions.
+
+	max_peaks : int
+		Maximum number of peaks in each distribution. The number of peaks is
+		drawn uniformly between 1 and `max_peaks`.
+
+	E_mu : tuple
+		Range of peak means, in kJ/mol, in the form (min, max).
+
+	E_sig : tuple
+		Range of peak stdev., in kJ/mol, in the form (min, max).
+
+	Returns
+	-------
+	P : np.ndarray
+		2d array of the pdf of each distribution, each integrating to 1.
+		Shape [`n` x `nE`].
+
+	Notes
+	-----
+	Parameters of all peaks are drawn at once, with the weights of unused
+	peaks set to zero, and peaks are summed one peak index at a time so that
+	memory scales as [`n` x `nE`].
+	'''
+
+	#draw peak parameters for all distributions
+	npeaks = rng.randint(1, max_peaks + 1, size = n)
+	mu = rng.uniform(E_mu[0], E_mu[1], size = (n, max_peaks))
+	sig = rng.uniform(E_sig[0], E_sig[1], size = (n, max_peaks))
+	w = rng.uniform(0.1, 1, size = (n, max_peaks))
+
+	#remove unused peaks
+	w[np.arange(max_peaks) >= npeaks[:, None]] = 0
+
+	#sum peaks
+	P = np.zeros([n, len(E)])
+
+	for k in range(max_peaks):
+		z = (E - mu[:, k, None])/sig[:, k, None]
+		P += w[:, k, None]*np.exp(-0.5*z**2)/sig[:, k, None]
+
+	#normalize so that each integrates to 1
+	P = P/np.sum(P*np.gradient(E), axis = 1)[:, None]
+
+	return P
+
+#define function to generate a LabView-format all_data table
+def _synth_labview(
+	t,
+	T,
+	g,
+	rng,
+	ppm_noise = 0,
+	ppm_total = 2.5e6,
+	start = '10:00:00'):
+	'''
+	Generates a 1-second resolution table in the format of the NOSAMS
+	LabView all_data output from a thermogram.
+
+	Parameters
+	----------
+	t : np.ndarray
+		Array of time, in seconds. Length `nt`.
+
+	T : np.ndarray
+		Array of temperature, in Kelvin. Length `nt`.
+
+	g : np.ndarray
+		Array of the fraction of carbon remaining. Length `nt`.
+
+	rng : np.random.RandomState
+		Random number generator, *e.g.* from ``_mc_rng``.
+
+	ppm_noise : scalar
+		Stdev. of Gaussian noise added to CO2 concentrations, in ppm.
+		Defaults to 0.
+
+	ppm_total : scalar
+		Sum of CO2 concentrations over the run, in ppm*s. Defaults to 2.5e6
+		(similar to the bundled test thermogram).
+
+	start : str
+		Time of the first row. Defaults to '10:00:00'.
+
+	Returns
+	-------
+	file : pd.DataFrame
+		Table with a 'date_time' index and LabView columns, including 'temp'
+		(in C) and 'CO2_scaled' (in ppm).
+	'''
+
+	#interpolate to 1-second resolution
+	secs = np.arange(np.ceil(t[0]), np.floor(t[-1]) + 1)
+	gs = np.interp(secs, t, g)
+	Ts = np.interp(secs, t, T) - 273.15 #convert to C
+
+	#calculate CO2 concentration from rate
+	CO2 = -np.gradient(gs)*ppm_total
+
+	if ppm_noise > 0:
+		CO2 = CO2 + rng.normal(0, ppm_noise, size = len(CO2))
+
+	CO2 = np.round(CO2, 1)
+
+	#make LabView timestamps, e.g. '1:28:16 PM'
+	ind = pd.Timestamp('2000-01-01 ' + start) + pd.to_timedelta(secs, 's')
+	ind = pd.Index(ind.strftime('%I:%M:%S %p').str.lstrip('0'),
+		name = 'date_time')
+
+	#calculate carbon mass
+	ug = np.clip(CO2, 0, None)*1000/ppm_total
+
+	file = pd.DataFrame({
+		'T_room': 25.0,
+		'P_room': 101.325,
+		'CO2_raw': CO2,
+		'corr_int': 0,
+		'corr_slope': 1.0,
+		'temp': np.round(Ts, 6),
+		'CO2_scaled_no_bl_subt': CO2,
+		'flow_rate': 36.5,
+		'dTdt': np.round(np.gradient(Ts)*60, 6),
+		'fraction': 1,
+		'ug_frac': np.round(ug, 6),
+		'ug_sum': np.round(np.cumsum(ug), 6),
+		'CO2_scaled': CO2},
+		index = ind,
+		columns = ['T_room', 'P_room', 'CO2_raw', 'corr_int', 'corr_slope',
+			'temp', 'CO2_scaled_no_bl_subt', 'flow_rate', 'dTdt', 'fraction',
+			'ug_frac', 'ug_sum', 'CO2_scaled'])
+
+	return file
@@ -0,0 +1,272 @@
+'''
+This module contains batch module tests,
+'''
+
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import tempfile
+import warnings
+
+import rampedpyrox as rp
+
+from nose.tools import(
+	assert_almost_equal,
+	assert_equal,
+	assert_is_instance,
+	assert_raises,
+	)
+
+from rampedpyrox.exceptions import(
+	FileError,
+	LengthError,
+	ScalarError,
+	)
+
+#function to load files
+def gen_str(name):
+	p = os.path.join(os.path.dirname(__file__), name)
+	return p
+
+tg_str = gen_str('test_data/thermogram.csv')
+iso_str = gen_str('test_data/isotopes.csv')
+
+#function to make a campaign directory
+def gen_dir():
+	d = tempfile.mkdtemp()
+
+	shutil.copy(tg_str, os.path.join(d, 'a_all_data.csv'))
+	shutil.copy(tg_str, os.path.join(d, 'b_all_data.csv'))
+	shutil.copy(iso_str, os.path.join(d, 'a_isotopes.csv'))
+	shutil.copy(iso_str, os.path.join(d, 'c_all_data.csv')) #wrong file
+	shutil.copy(iso_str, os.path.join(d, 'notes.txt')) #ignored
+
+	return d
+
+#test the batch loader
+class test_load_rpo_batch:
+
+	def test_input_types(self):
+		#assert that a glob matching no files raises exception
+		assert_raises(
+			FileError,
+			rp.load_rpo_batch,
+			'garbage string*.csv')
+
+	def test_pairing_and_errors(self):
+		#assert that files are paired and errors are collected
+		d = gen_dir()
+
+		tgs, isos, errors = rp.load_rpo_batch(
+			d,
+			processes = 2)
+
+		assert_equal(sorted(tgs.keys()), ['a', 'b'])
+		assert_equal(list(isos.keys()), ['a'])
+		assert_equal(list(errors.keys()), [os.path.join(d, 'c_all_data.csv')])
+
+		assert_is_instance(tgs['a'], rp.RpoThermogram)
+		assert_is_instance(isos['a'], pd.DataFrame)
+
+	def test_serial_matches_parallel(self):
+		#assert that loading in a single process gives the same result
+		d = gen_dir()
+
+		tgs, isos, errors = rp.load_rpo_batch(d, processes = 2)
+		tgs1, isos1, errors1 = rp.load_rpo_batch(d, processes = 1)
+
+		assert_equal(all(tgs['a'].g == tgs1['a'].g), True)
+		assert_equal(len(errors), len(errors1))
+
+#test DE calibration
+class test_calibrate_DE:
+
+	def test_recovers_DE(self):
+		#assert that DE used to generate the bulk value is recovered
+		tg = rp.RpoThermogram.from_csv(tg_str, nt = 250)
+		daem = rp.Daem.from_timedata(tg, nE = 200)
+		ec = rp.EnergyComplex.inverse_model(daem, tg, lam = 3)
+		ri = rp.RpoIsotopes.from_csv(iso_str, daem, ec, blk_corr = False,
+			DE = None)
+
+		#calculate bulk value from first-order kie-corrected d13C
+		ri_kie = rp.RpoIsotopes.from_csv(iso_str, daem, ec, blk_corr = False,
+			DE = None)
+		ri_kie.kie_correct(daem, ec, DE = 0.002, method = 'linear')
+
+		f = ri.m_raw/np.sum(ri.m_raw)
+		bulk = [np.sum(f*ri_kie.d13C_corr), 0.1]
+
+		DE, DE_std, cal_info = rp.calibrate_DE(
+			{'a': (daem, ec, ri, bulk)},
+			processes = 1)
+
+		assert_almost_equal(DE, 0.002, places = 6)
+		assert_almost_equal(cal_info.loc['a', 'resid'], 0, places = 6)
+
+	def test_several_thermograms(self):
+		#assert that DE is recovered from samples with different thermograms,
+		# with models built in worker processes
+		samples = {}
+
+		for nt in [200, 250]:
+			tg = rp.RpoThermogram.from_csv(tg_str, nt = nt)
+			daem = rp.Daem.from_timedata(tg, nE = 200)
+			ec = rp.EnergyComplex.inverse_model(daem, tg, lam = 3)
+			ri = rp.RpoIsotopes.from_csv(iso_str, daem, ec, blk_corr = False,
+				DE = None)
+
+			ri_kie = rp.RpoIsotopes.from_csv(iso_str, daem, ec,
+				blk_corr = False, DE = None)
+			ri_kie.kie_correct(daem, ec, DE = 0.002, method = 'linear')
+
+			f = ri.m_raw/np.sum(ri.m_raw)
+			bulk = [np.sum(f*ri_kie.d13C_corr), 0.1]
+
+			samples['tg_%d' % nt] = (tg, ec, ri, bulk)
+
+		for processes in [1, 2]:
+			DE, DE_std, cal_info = rp.calibrate_DE(
+				samples,
+				processes = processes)
+
+			assert_almost_equal(DE, 0.002, places = 6)
+			assert_equal(list(cal_info.index), ['tg_200', 'tg_250'])
+			assert np.allclose(cal_info['resid'], 0, atol = 1e-6)
+
+	def test_input_types(self):
+		#assert that a sample of the wrong length raises exception
+		assert_raises(
+			LengthError,
+			rp.calibrate_DE,
+			[(None, None, [-25, 0.1])])
+
+#test joint inversion of several ramp rates
+class test_inverse_model_multi:
+
+	def test_recovers_log10omega(self):
+		#assert that log10omega used to generate thermograms is recovered
+		E = np.linspace(50, 350, 100)
+		p = np.exp(-0.5*((E - 150)/15)**2) + \
+			0.5*np.exp(-0.5*((E - 220)/20)**2)
+		p = p/np.sum(p*np.gradient(E))
+
+		tgs = []
+
+		for beta in [5/60., 20/60.]:
+			t = np.linspace(0, 800/beta, 200)
+			T = 373 + beta*t
+
+			daem = rp.Daem(E, 10, t, T)
+			g = np.clip(np.inner(daem.A, p), 0, 1)
+
+			tgs.append(rp.RpoThermogram(t, T, g = g))
+
+		ec, daems = rp.inverse_model_multi(
+			tgs,
+			lam = 0.5,
+			log10omega_search = np.linspace(7, 13, 7),
+			nE = 100,
+			processes = 1)
+
+		assert_almost_equal(daems[0].log10omega[0], 10, places = 2)
+		assert_equal(len(daems), 2)
+		assert_is_instance(ec, rp.EnergyComplex)
+
+	def test_input_types(self):
+		#assert that lam must be scalar
+		assert_raises(
+			ScalarError,
+			rp.inverse_model_multi,
+			[],
+			lam = 'auto')
+
+#test loading many samples from a single isotope table
+class test_load_rpo_isotopes:
+
+	def test_matches_from_csv(self):
+		#assert that each sample matches RpoIsotopes.from_csv
+		tg = rp.RpoThermogram.from_csv(tg_str, nt = 250)
+		daem = rp.Daem.from_timedata(tg, nE = 200)
+		ec = rp.EnergyComplex.inverse_model(daem, tg, lam = 3)
+
+		iso = pd.read_csv(iso_str, index_col = 0, parse_dates = True)
+		iso_b = iso.copy()
+		iso_b['d13C'] = iso_b['d13C'] - 1
+
+		table = pd.concat([iso.assign(sample = 'a'), iso_b.assign(sample = 'b')])
+
+		ris, ri_info = rp.load_rpo_isotopes(
+			table,
+			daem,
+			ec,
+			blk_corr = True,
+			bulk_d13C_true = {'a': [-25, 0.1]})
+
+		ri_a = rp.RpoIsotopes.from_csv(iso, daem, ec, blk_corr = True,
+			bulk_d13C_true = [-25, 0.1])
+		ri_b = rp.RpoIsotopes.from_csv(iso_b, daem, ec, blk_corr = True)
+
+		assert_equal(list(ris.keys()), ['a', 'b'])
+		assert_equal(ri_info.shape[0], ri_a.nFrac + ri_b.nFrac)
+		assert np.allclose(ri_info.loc['a'].values, ri_a.ri_corr_info.values)
+		assert np.allclose(ri_info.loc['b'].values, ri_b.ri_corr_info.values)
+
+	def test_input_types(self):
+		#assert that a table without sample column raises exception
+		iso = pd.read_csv(iso_str, index_col = 0, parse_dates = True)
+
+		assert_raises(
+			FileError,
+			rp.load_rpo_isotopes,
+			iso,
+			None,
+			None)
+
+	def test_missing_fm(self):
+		#assert that a sample without Fm matches RpoIsotopes.from_csv
+		tg = rp.RpoThermogram.from_csv(tg_str, nt = 250)
+		daem = rp.Daem.from_timedata(tg, nE = 200)
+		ec = rp.EnergyComplex.inverse_model(daem, tg, lam = 3)
+
+		iso = pd.read_csv(iso_str, index_col = 0, parse_dates = True)
+		iso_b = iso.drop(['Fm', 'Fm_std'], axis = 1)
+
+		table = pd.concat([iso.assign(sample = 'a'), iso_b.assign(sample = 'b')])
+
+		ris, ri_info = rp.load_rpo_isotopes(table, daem, ec)
+
+		ri_a = rp.RpoIsotopes.from_csv(iso, daem, ec)
+		ri_b = rp.RpoIsotopes.from_csv(iso_b, daem, ec)
+
+		assert np.allclose(ri_info.loc['a'].values, ri_a.ri_corr_info.values)
+		assert not hasattr(ris['b'], 'Fm_raw')
+		assert np.allclose(
+			ris['b'].ri_corr_info.values,
+			ri_b.ri_corr_info.values)
+
+	def test_all_skipped(self):
+		#assert that a table without any modeled sample raises exception
+		tg = rp.RpoThermogram.from_csv(tg_str, nt = 250)
+		daem = rp.Daem.from_timedata(tg, nE = 200)
+
+		iso = pd.read_csv(iso_str, index_col = 0, parse_dates = True)
+
+		with warnings.catch_warnings():
+			warnings.simplefilter('ignore')
+
+			assert_raises(
+				FileError,
+				rp.load_rpo_isotopes,
+				iso.assign(sample = 'a'),
+				{'x': daem},
+				None)
+
+if __name__ == '__main__':
+
+	import nose
+
+	nose.runmodule(
+		argv = [__file__, '-vvs', '-x', '--pdb', '--pdb-failure'],
+		exit=False)
@@ -0,0 +1,339 @@
+'''
+This module contains performance benchmarks of the package's hot paths.
+
+Each benchmark is run over a sweep of sizes (nt, nE, nFrac, or number of
+days of IsoCaRB data) using the bundled test data and synthetic inputs. Wall
+time (best of several repeats) and peak memory (from ``tracemalloc``) are
+written to a .json file and, if a baseline file exists, compared against it.
+
+Run from the command line::
+
+	python -m rampedpyrox.tests.benchmarks -o bench.json
+
+	#store the results as the baseline for future comparisons
+	python -m rampedpyrox.tests.benchmarks --update-baseline
+
+	#fail (exit code 1) if any benchmark is >25 percent slower than baseline
+	python -m rampedpyrox.tests.benchmarks -b baseline.json -t 1.25
+
+Timings are machine-specific, so baselines should be generated on the
+machine used for comparison. This module requires Python 3 and is not
+collected by the test runner.
+'''
+
+from __future__ import(
+	division,
+	print_function,
+	)
+
+import argparse
+import datetime
+import gc
+import json
+import numpy as np
+import os
+import pandas as pd
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import rampedpyrox as rp
+
+from rampedpyrox.model_helper import(
+	_calc_p,
+	_rpo_calc_A,
+	)
+
+from rampedpyrox.results_helper import(
+	_calc_E_frac,
+	)
+
+from rampedpyrox.timedata_helper import(
+	_bd_data_reduction,
+	_rpo_extract_tg,
+	)
+
+#function to load files
+def gen_str(name):
+	p = os.path.join(os.path.dirname(__file__), name)
+	return p
+
+file_str = gen_str('test_data/thermogram.csv')
+baseline_str = gen_str('benchmarks_baseline.json')
+
+#size sweeps
+NT = [100, 250, 500]
+NE = [100, 250, 500]
+NFRAC = [5, 20, 100]
+NDAYS = [1, 3]
+
+#function to time a callable and measure its peak memory
+def measure(func, repeat = 3):
+	'''
+	Returns the best wall time (s) of `repeat` calls to `func` and the peak
+	memory (MB) allocated during a separate call.
+	'''
+
+	times = []
+
+	for i in range(repeat):
+		gc.collect()
+		t0 = time.perf_counter()
+		func()
+		times.append(time.perf_counter() - t0)
+
+	#measure memory separately since tracing slows down execution
+	gc.collect()
+	tracemalloc.start()
+
+	try:
+		func()
+		_, peak = tracemalloc.get_traced_memory()
+
+	finally:
+		tracemalloc.stop()
+
+	return min(times), peak/2**20
+
+#function to make a thermogram and model of a given size
+def gen_tg(nt, nE):
+	tg = rp.RpoThermogram.from_csv(file_str, nt = nt)
+	daem = rp.Daem.from_timedata(tg, nE = nE)
+
+	return tg, daem
+
+#function to make synthetic IsoCaRB all_data and sample data
+def gen_bd(ndays, seed = 0):
+	rng = np.random.RandomState(seed)
+
+	n = ndays*24*3600//5
+	ind = pd.date_range('2020-01-01 00:00:03', periods = n, freq = '5s')
+	mins = np.arange(n)*5/60.
+
+	ad = pd.DataFrame({
+		'temp': 25 + rng.normal(0, 0.1, n),
+		'p_room': 1013 + rng.normal(0, 0.5, n),
+		'CO2_scaled': 400 + 300*np.exp(-((mins - 1500)/600)**2) + \
+			rng.normal(0, 2, n),
+		'flow_rate': 30 + rng.normal(0, 0.1, n),
+		}, index = ind)
+	ad.index.name = 'date_time'
+
+	t0 = ind[0].floor('min') + pd.Timedelta('1h')
+	sind = [t0 + pd.Timedelta(hours = 12*i) for i in range(2*ndays - 1)]
+
+	sd = pd.DataFrame({
+		'CO2_bl': 400 + np.zeros(len(sind)),
+		'liq_sample': [0] + [50]*(len(sind) - 1),
+		}, index = pd.DatetimeIndex(sind))
+	sd.index.name = 'date_time'
+
+	return ad, sd
+
+#define benchmark cases, each named 'bench_' + name and yielding (name,
+# params, callable)
+def bench_rpo_calc_A():
+	for nt in NT:
+		for nE in NE:
+			tg, daem = gen_tg(nt, nE)
+
+			yield 'rpo_calc_A', {'nt': nt, 'nE': nE}, \
+				lambda: _rpo_calc_A(daem.E, 10, tg.t, tg.T)
+
+def bench_calc_p():
+	for nt in NT:
+		for nE in NE:
+			tg, daem = gen_tg(nt, nE)
+
+			yield 'calc_p', {'nt': nt, 'nE': nE}, \
+				lambda: _calc_p(daem, tg, 1)
+
+def bench_calc_L_curve():
+	for n in NT[:2]:
+		tg, daem = gen_tg(n, n)
+
+		yield 'calc_L_curve', {'nt': n, 'nE': n, 'nLam': 20}, \
+			lambda: daem.calc_L_curve(tg, nLam = 20)
+
+def bench_rpo_extract_tg():
+	#bundled data
+	for nt in NT:
+		yield 'rpo_extract_tg', {'file': 'test_data', 'nt': nt}, \
+			lambda: _rpo_extract_tg(file_str, nt)
+
+	#synthetic LabView file with a slower ramp (i.e. more rows)
+	d = tempfile.mkdtemp()
+	rp.make_synthetic_thermograms(1, beta = 2, path = d, seed = 0)
+	f = os.path.join(d, 'synth_0_all_data.csv')
+
+	for nt in NT:
+		yield 'rpo_extract_tg', {'file': 'synthetic', 'nt': nt}, \
+			lambda: _rpo_extract_tg(f, nt)
+
+	shutil.rmtree(d)
+
+def bench_calc_E_frac():
+	tg, daem = gen_tg(250, 250)
+	ec = rp.EnergyComplex.inverse_model(daem, tg, lam = 1)
+
+	for nFrac in NFRAC:
+		tb = np.linspace(tg.t[0], tg.t[-1], nFrac + 1)
+		t_frac = np.column_stack((tb[:-1], tb[1:]))
+		ri = rp.RpoIsotopes(daem, ec, t_frac)
+
+		yield 'calc_E_frac', {'nt': 250, 'nE': 250, 'nFrac': nFrac}, \
+			lambda: _calc_E_frac(ri, daem, ec)
+
+def bench_bd_data_reduction():
+	for ndays in NDAYS:
+		ad, sd = gen_bd(ndays)
+
+		yield 'bd_data_reduction', {'ndays': ndays}, \
+			lambda: _bd_data_reduction(ad.copy(), sd.copy())
+
+BENCHMARKS = [
+	bench_rpo_calc_A,
+	bench_calc_p,
+	bench_calc_L_curve,
+	bench_rpo_extract_tg,
+	bench_calc_E_frac,
+	bench_bd_data_reduction,
+	]
+
+#function to make a unique key for each benchmark
+def make_key(name, params):
+	return '%s[%s]' % (name, ','.join('%s=%s' % kv for kv in
+		sorted(params.items())))
+
+#function to run all benchmarks
+def run(repeat = 3, select = None):
+	'''
+	Runs all benchmarks, or those whose name contains `select`, and returns
+	the results as a dictionary.
+	'''
+
+	results = {}
+
+	for bench in BENCHMARKS:
+
+		#skip unselected benchmarks before building their inputs
+		if select is not None and select not in bench.__name__[6:]:
+			continue
+
+		for name, params, func in bench():
+
+			with warnings.catch_warnings():
+				warnings.simplefilter('ignore')
+				t, mem = measure(func, repeat = repeat)
+
+			key = make_key(name, params)
+			results[key] = {
+				'name': name,
+				'params': params,
+				'time': t,
+				'peak_mb': mem,
+				}
+
+			print('%-60s %10.4f s %10.2f MB' % (key, t, mem))
+
+	meta = {
+		'date': datetime.datetime.now().isoformat(),
+		'machine': platform.machine(),
+		'numpy': np.__version__,
+		'pandas': pd.__version__,
+		'platform': platform.platform(),
+		'python': platform.python_version(),
+		'rampedpyrox': rp.__version__,
+		'repeat': repeat,
+		}
+
+	return {'meta': meta, 'results': results}
+
+#function to compare results against a baseline
+def compare(results, baseline, threshold = 1.25, min_time = 1e-3):
+	'''
+	Compares results against a baseline and returns a list of regressions,
+	*i.e.* benchmarks whose time or peak memory exceeds the baseline by more
+	than a factor of `threshold`. Times below `min_time` (s) are ignored.
+	'''
+
+	regressions = []
+
+	print('\n%-60s %10s %10s' % ('benchmark', 'time', 'memory'))
+
+	for key, res in sorted(results['results'].items()):
+
+		base = baseline['results'].get(key)
+
+		if base is None:
+			continue
+
+		rt = res['time']/base['time']
+		rm = res['peak_mb']/base['peak_mb'] if base['peak_mb'] > 0 else 1
+
+		flag = ''
+
+		if rt > threshold and res['time'] > min_time:
+			flag = ' <- slower'
+			regressions.append((key, 'time', rt))
+
+		if rm > threshold:
+			flag = flag or ' <- memory'
+			regressions.append((key, 'peak_mb', rm))
+
+		print('%-60s %9.2fx %9.2fx%s' % (key, rt, rm, flag))
+
+	return regressions
+
+def main(argv = None):
+
+	parser = argparse.ArgumentParser(
+		description = 'Benchmark rampedpyrox hot paths.')
+
+	parser.add_argument('-o', '--output', default = 'benchmarks.json',
+		help = 'file to write results to')
+	parser.add_argument('-b', '--baseline', default = baseline_str,
+		help = 'baseline results to compare against, if the file exists')
+	parser.add_argument('-t', '--threshold', type = float, default = 1.25,
+		help = 'allowed ratio of result to baseline before failing')
+	parser.add_argument('-r', '--repeat', type = int, default = 3,
+		help = 'number of timed repeats, the best of which is stored')
+	parser.add_argument('-k', '--select', default = None,
+		help = 'only run benchmarks whose name contains this string')
+	parser.add_argument('--update-baseline', action = 'store_true',
+		help = 'write results to the baseline file')
+
+	args = parser.parse_args(argv)
+
+	results = run(repeat = args.repeat, select = args.select)
+
+	with open(args.output, 'w') as f:
+		json.dump(results, f, indent = 1, sort_keys = True)
+
+	if args.update_baseline:
+		with open(args.baseline, 'w') as f:
+			json.dump(results, f, indent = 1, sort_keys = True)
+
+		return 0
+
+	if os.path.exists(args.baseline):
+		with open(args.baseline) as f:
+			baseline = json.load(f)
+
+		regressions = compare(results, baseline, threshold = args.threshold)
+
+		if regressions:
+			print('\n%d regression(s) above %.2fx baseline' %
+				(len(regressions), args.threshold))
+
+			return 1
+
+	return 0
+
+if __name__ == '__main__':
+
+	sys.exit(main())
@@ -0,0 +1,170 @@
+'''
+This module contains command-line batch processor tests.
+'''
+
+import json
+import os
+import shutil
+import tempfile
+
+import rampedpyrox as rp
+
+from nose.tools import(
+	assert_equal,
+	assert_raises,
+	assert_true,
+	)
+
+from rampedpyrox.cli import(
+	main,
+	run_config,
+	)
+
+from rampedpyrox.exceptions import(
+	FileError,
+	)
+
+#function to load files
+def gen_str(name):
+	p = os.path.join(os.path.dirname(__file__), name)
+	return p
+
+file_str = gen_str('test_data/thermogram.csv')
+res_str = gen_str('test_data/isotopes.csv')
+
+#function to make a campaign directory and config file
+def make_campaign(d, **kw):
+	camp = os.path.join(d, 'campaign')
+	os.makedirs(camp)
+
+	#two synthetic thermograms sharing a time-temperature history
+	rp.make_synthetic_thermograms(2, path = camp, seed = 0)
+
+	#bundled thermogram with isotopes, plus an unreadable thermogram
+	shutil.copy(file_str, os.path.join(camp, 'real_all_data.csv'))
+	shutil.copy(res_str, os.path.join(camp, 'real_isotopes.csv'))
+
+	with open(os.path.join(camp, 'bad_all_data.csv'), 'w') as f:
+		f.write('not,a,thermogram\n')
+
+	config = {
+		'path': 'campaign',
+		'output': 'out',
+		'processes': 1,
+		'thermogram': {'nt': 100},
+		'model': {'nE': 100},
+		'inverse_model': {'lam': 1.0},
+		'isotopes': {'blk_corr': True},
+		}
+	config.update(kw)
+
+	cf = os.path.join(d, 'config.json')
+
+	with open(cf, 'w') as f:
+		json.dump(config, f)
+
+	return cf
+
+#test the batch processor
+class test_run_config:
+
+	def test_run_and_resume(self):
+		d = tempfile.mkdtemp()
+
+		try:
+			cf = make_campaign(d)
+			out = os.path.join(d, 'out')
+
+			sample_info, frac_info, errors = run_config(cf)
+
+			#assert that good samples are summarized and bad samples collected
+			assert_equal(
+				sorted(sample_info.index),
+				['real', 'synth_0', 'synth_1'])
+			assert_equal(list(errors), ['bad'])
+			assert_equal(
+				sorted(set(frac_info.index.get_level_values('sample'))),
+				['real'])
+
+			for f in ['sample_info.csv', 'frac_info.csv', 'errors.csv']:
+				assert_true(os.path.exists(os.path.join(out, f)))
+
+			#assert that synthetic samples share a cached model
+			assert_equal(len(os.listdir(os.path.join(out, 'models'))), 2)
+
+			#assert checkpoints match a direct analysis
+			tg = rp.RpoThermogram.from_csv(file_str, nt = 100)
+			daem = rp.Daem.from_timedata(tg, nE = 100)
+			ec = rp.EnergyComplex.inverse_model(daem, tg, lam = 1.0)
+
+			sam_dir = os.path.join(out, 'samples')
+			key, = os.listdir(sam_dir)
+
+			objs = rp.load_archive(os.path.join(sam_dir, key, 'real.npz'))
+			assert_true((abs(objs['ec'].p - ec.p) < 1e-10).all())
+
+			#assert that a second run resumes without re-running samples
+			ckpt = os.path.join(sam_dir, key, 'synth_0.npz')
+			mtime = os.path.getmtime(ckpt)
+
+			sample_info2, _, errors2 = run_config(cf)
+
+			assert_equal(os.path.getmtime(ckpt), mtime)
+			assert_equal(list(errors2), ['bad'])
+			assert_true(sample_info2.equals(sample_info))
+
+		finally:
+			shutil.rmtree(d)
+
+	def test_changed_settings(self):
+		d = tempfile.mkdtemp()
+
+		try:
+			cf = make_campaign(d)
+			sample_info, _, _ = run_config(cf)
+
+			#assert that changing an analysis setting re-runs all samples
+			with open(cf) as f:
+				config = json.load(f)
+
+			config['inverse_model']['lam'] = 2.0
+
+			with open(cf, 'w') as f:
+				json.dump(config, f)
+
+			sample_info2, _, _ = run_config(cf)
+
+			assert_equal(len(os.listdir(os.path.join(d, 'out', 'samples'))), 2)
+			assert_true((sample_info2['lam'] == 2.0).all())
+			assert_true((sample_info['lam'] == 1.0).all())
+
+		finally:
+			shutil.rmtree(d)
+
+	def test_main(self):
+		d = tempfile.mkdtemp()
+
+		try:
+			cf = make_campaign(d)
+
+			#assert exit code is 1 if any sample fails
+			assert_equal(main([cf, '-q']), 1)
+
+			os.remove(os.path.join(d, 'campaign', 'bad_all_data.csv'))
+			assert_equal(main([cf, '-q']), 0)
+			assert_true(not os.path.exists(
+				os.path.join(d, 'out', 'errors.csv')))
+
+		finally:
+			shutil.rmtree(d)
+
+	def test_bad_config(self):
+		d = tempfile.mkdtemp()
+
+		try:
+			cf = make_campaign(d, not_a_key = 1)
+
+			assert_raises(FileError, run_config, cf)
+
+		finally:
+			shutil.rmtree(d)
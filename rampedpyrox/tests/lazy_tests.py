@@ -0,0 +1,42 @@
+'''
+This module contains lazy import tests.
+'''
+
+import subprocess
+import sys
+
+from nose.tools import(
+	assert_equal,
+	assert_is,
+	)
+
+from rampedpyrox.lazy_helper import(
+	_lazy_import,
+	)
+
+#test lazy imports
+class test_lazy_import:
+
+	def test_lazy_module(self):
+		#assert that already-imported modules are returned directly
+		assert_is(_lazy_import('sys'), sys)
+
+		#assert that attributes are loaded on first access
+		mod = _lazy_import('colorsys')
+
+		assert_equal(mod.rgb_to_hsv(1, 0, 0), (0.0, 1.0, 1))
+
+	def test_headless_import(self):
+		#assert that importing the package does not load pyplot, pandas,
+		# or scipy
+		code = (
+			'import sys\n'
+			'before = set(sys.modules)\n'
+			'import rampedpyrox\n'
+			'new = set(sys.modules) - before\n'
+			'heavy = ("matplotlib", "pandas", "scipy")\n'
+			'print(sorted(m for m in new if m.split(".")[0] in heavy))\n')
+
+		out = subprocess.check_output([sys.executable, '-c', code])
+
+		assert_equal(out.decode().strip(), '[]')
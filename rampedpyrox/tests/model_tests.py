@@ -22,7 +22,10 @@ from rampedpyrox.model_helper import(
 	_calc_ghat,
 	_calc_p,
 	_calc_R,
-	_rpo_calc_A)
+	_rpo_calc_A,
+	_rpo_I_from_A)
+
+from rampedpyrox import model_helper
 
 from rampedpyrox.exceptions import(
 	ArrayError,
@@ -120,6 +123,32 @@ class test_model_helper_functions:
 		assert_equal(np.max(a), 1)
 		assert_equal(np.min(a), 0)
 
+	def test_A_nonuniform_t(self):
+		#assert that A from a non-uniform grid matches a finely resolved
+		# uniform grid at shared timepoints for a linear ramp
+		tf = np.arange(timedata.t[0], timedata.t[-1], 2.0)
+		Tf = 373.15 + 5*tf/60
+
+		i = np.unique(np.append(np.arange(0, len(tf), 200), 
+			np.arange(1500, 2500, 20)))
+
+		A = _rpo_calc_A(
+			ratedata.E, 
+			10, 
+			tf, 
+			Tf)
+
+		An = _rpo_calc_A(
+			ratedata.E, 
+			10, 
+			tf[i], 
+			Tf[i])
+
+		a = np.divide(A[i] - An, np.gradient(ratedata.E))
+
+		assert_equal(An.shape[0], len(i))
+		assert_almost_equal(np.max(np.abs(a)), 0, places=2)
+
 	def test_A_takes_lambda(self):
 		#input lambda and make sure it works
 		log10omega = lambda ea: 0.02*ea + 5
@@ -189,6 +218,56 @@ class test_model_creation:
 			[1,2,3],
 			[1,1,1])
 
+	def test_keep_I(self):
+		#assert that the temperature integral is only stored on request
+		daem = rp.Daem.from_timedata(timedata, nE = 300, keep_I = True)
+
+		assert not hasattr(model, '_I')
+		assert_equal(np.shape(daem._I), (daem.nt, daem.nE))
+		assert_equal(np.max(np.abs(daem.A - model.A)), 0)
+
+		#assert that a stored integral gives the same KIE correction
+		ri = [rp.RpoIsotopes.from_csv(
+			gen_str('test_data/isotopes.csv'),
+			m,
+			ratedata,
+			DE = 0.0018) for m in [model, daem]]
+
+		assert np.allclose(ri[0].d13C_corr, ri[1].d13C_corr)
+
+	def test_I_from_A(self):
+		#assert that the integral recovered from A matches the stored one
+		daem = rp.Daem.from_timedata(timedata, nE = 300, keep_I = True)
+		I = _rpo_I_from_A(daem.A, daem.E, daem.log10omega)
+		pos = daem.A > 0
+
+		assert np.allclose(I[pos], daem._I[pos], rtol = 1e-6)
+
+		#assert that default KIE corrections do not recalculate the integral
+		def _fail(*args, **kwargs):
+			raise AssertionError('_rpo_calc_I called')
+
+		calc_I = model_helper._rpo_calc_I
+		model_helper._rpo_calc_I = _fail
+
+		try:
+			ri = rp.RpoIsotopes.from_csv(
+				gen_str('test_data/isotopes.csv'),
+				model,
+				ratedata,
+				DE = 0.0018)
+
+		finally:
+			model_helper._rpo_calc_I = calc_I
+
+		ri2 = rp.RpoIsotopes.from_csv(
+			gen_str('test_data/isotopes.csv'),
+			daem,
+			ratedata,
+			DE = 0.0018)
+
+		assert np.allclose(ri.d13C_corr, ri2.d13C_corr)
+
 	# def test_from_data_warnings_and_raises(self):
 
 	# 	#can't test warnings since no other model and ratedata types
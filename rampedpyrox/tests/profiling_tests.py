@@ -0,0 +1,96 @@
+'''
+This module contains profiling module tests.
+'''
+
+import numpy as np
+import os
+
+import rampedpyrox as rp
+
+from nose.tools import(
+	assert_equal,
+	assert_true,
+	)
+
+from rampedpyrox.profiling_helper import(
+	_PROFILERS,
+	)
+
+#function to load files
+def gen_str(name):
+	p = os.path.join(os.path.dirname(__file__), name)
+	return p
+
+file_str = gen_str('test_data/thermogram.csv')
+res_str = gen_str('test_data/isotopes.csv')
+
+#function to run the full pipeline for one sample
+def run_pipeline():
+	tg = rp.RpoThermogram.from_csv(file_str, nt = 100)
+	daem = rp.Daem.from_timedata(tg, nE = 100)
+	ec = rp.EnergyComplex.inverse_model(daem, tg, lam = 1)
+	tg.forward_model(daem, ec)
+	ri = rp.RpoIsotopes.from_csv(res_str, daem, ec, blk_corr = True)
+
+	return ri
+
+#test the Profiler class
+class test_Profiler:
+
+	def test_records_stages(self):
+		#assert that each pipeline stage is recorded for each sample
+		with rp.Profiler() as prof:
+			for name in ['a', 'b']:
+				prof.sample = name
+				run_pipeline()
+
+		df = prof.to_frame()
+		stages = set(df.stage)
+
+		for st in ['ingest', 'model', 'nnls', 'forward', 'E_frac',
+			'corrections']:
+			assert_true(st in stages)
+
+		assert_equal(set(df['sample']), set(['a', 'b']))
+		assert np.all(df.time >= 0)
+
+		#assert summary is samples x stages, with equal counts per sample
+		summary = prof.summary()
+		assert_equal(list(summary.index), ['a', 'b'])
+		assert np.all(summary['calls'].loc['a'] == summary['calls'].loc['b'])
+
+		#assert array sizes are recorded
+		shapes = df[df.function == '_calc_p'].shapes.iloc[0]
+		assert_equal(shapes, '100x100')
+
+	def test_nested_and_callback(self):
+		#assert nested nnls calls in L curve are recorded at depth 1
+		tg = rp.RpoThermogram.from_csv(file_str, nt = 100)
+		daem = rp.Daem.from_timedata(tg, nE = 100)
+
+		recs = []
+
+		with rp.Profiler(callback = recs.append) as prof:
+			daem.calc_L_curve(tg, nLam = 5, plot = False)
+
+		df = prof.to_frame()
+
+		assert_equal(len(recs), len(df))
+		assert_equal(list(df[df.depth == 0].stage), ['lambda'])
+		assert_equal(sum(df.stage == 'nnls'), 5)
+
+		#assert outermost summary counts lambda time only
+		summary = prof.summary()
+		assert_equal(list(summary['time'].columns), ['lambda'])
+
+	def test_disabled(self):
+		#assert that nothing is recorded outside of the context
+		prof = rp.Profiler()
+
+		with prof:
+			pass
+
+		run_pipeline()
+
+		assert_equal(len(prof.records), 0)
+		assert_equal(len(_PROFILERS), 0)
@@ -2,6 +2,7 @@
 This module contains result module tests.
 '''
 
+import copy
 import numpy as np
 import os
 import pandas as pd
@@ -22,7 +23,9 @@ from rampedpyrox.results_helper import(
 	_calc_cutoff,
 	_calc_E_frac,
 	_rpo_blk_corr,
+	_rpo_blk_corr_mc,
 	_rpo_extract_iso,
+	_rpo_iso_inv,
 	_rpo_kie_corr,
 	_rpo_mass_bal_corr,
 	)
@@ -35,7 +38,7 @@ from rampedpyrox.exceptions import(
 	LengthError,
 	# RunModelError,
 	# ScalarError,
-	# StringError,
+	StringError,
 	)
 
 #function to load files
@@ -90,6 +93,17 @@ class test_results_helper_functions:
 		#assert ind_max is always greater than ind_min
 		assert_true(np.all(result.t_frac[1,:] > result.t_frac[0,:]))
 
+		#assert that fractions without model time points raise exception
+		res = copy.copy(result)
+		t = model.t
+		res.t_frac = np.array([[t[0], t[5]], [t[5] + 0.1, t[5] + 0.2]])
+
+		assert_raises(
+			IndexError,
+			_calc_cutoff,
+			res,
+			model)
+
 	def test_calc_E_frac(self):
 		E_frac, E_frac_std, p_frac = _calc_E_frac(
 			result, 
@@ -112,10 +126,141 @@ class test_results_helper_functions:
 		pint = np.sum(phat*np.gradient(ratedata.E))
 		assert_almost_equal(pint, 1.0, places = 3)
 
+	def test_E_frac_matches_loop(self):
+		E_frac, E_frac_std, p_frac = _calc_E_frac(
+			result,
+			model,
+			ratedata)
+
+		#assert batched moments match moments of each fraction
+		for i in range(result.nFrac):
+			mu, sigma = rp.extract_moments(ratedata.E, p_frac[i])
+
+			assert_almost_equal(E_frac[i], mu, places = 10)
+			assert_almost_equal(E_frac_std[i], sigma, places = 10)
+
+		#assert cutoffs match a direct search of the time array
+		ind_min, ind_max = _calc_cutoff(result, model)
+
+		for i, row in enumerate(result.t_frac):
+			ind = np.where((model.t > row[0]) & (model.t <= row[1]))[0]
+
+			assert_equal(ind_min[i], max(ind[0] - 1, 0))
+			assert_equal(ind_max[i], ind[-1])
+
+	def test_kie_corr_methods(self):
+		d13C = result.d13C_raw
+		d13C_std = result.d13C_raw_std
+
+		dd, _ = _rpo_kie_corr(result, d13C, d13C_std, model, ratedata,
+			method = 'daem')
+		ds, _ = _rpo_kie_corr(result, d13C, d13C_std, model, ratedata,
+			method = 'shift')
+		dl, _ = _rpo_kie_corr(result, d13C, d13C_std, model, ratedata,
+			method = 'linear')
+
+		#shift is exact for evenly spaced t, linear is first-order
+		assert np.allclose(ds, dd, atol = 1e-8)
+		assert np.allclose(dl, dd, atol = 1e-3)
+
+		assert_raises(
+			StringError,
+			_rpo_kie_corr,
+			result,
+			d13C,
+			d13C_std,
+			model,
+			ratedata,
+			method = 'garbage')
+
+	def test_blk_corr_mc(self):
+		args = (
+			result.d13C_raw,
+			result.d13C_raw_std,
+			result.Fm_raw,
+			result.Fm_raw_std,
+			result.m_raw,
+			result.m_raw_std,
+			result.t_frac)
+
+		d13C, d13C_std, Fm, Fm_std, m, m_std = _rpo_blk_corr(*args)
+		d13C_mc, Fm_mc, m_mc = _rpo_blk_corr_mc(*args, nmc = 20000, seed = 0)
+
+		#test shapes
+		assert_equal(np.shape(m_mc), (20000, result.nFrac))
+
+		#mass correction is linear, so stdev. must match first-order values
+		assert np.allclose(np.std(m_mc, axis = 0), m_std, rtol = 0.05)
+		assert np.allclose(np.mean(Fm_mc, axis = 0), Fm, atol = 1e-3)
+		assert np.allclose(np.std(Fm_mc, axis = 0), Fm_std, rtol = 0.1)
+
+	def test_blank_correct_mc(self):
+		#assert that Monte Carlo draws are stored and correlated as requested
+		r = []
+
+		for corr in [0, 1]:
+			ri = rp.RpoIsotopes.from_csv(
+				res_str,
+				model,
+				ratedata,
+				blk_corr = False,
+				DE = None)
+
+			ri.blank_correct(nmc = 5000, seed = 0, corr = corr)
+
+			assert_equal(np.shape(ri.m_corr_mc), (5000, ri.nFrac))
+			assert_equal(np.shape(ri.Fm_corr_mc), (5000, ri.nFrac))
+			assert np.allclose(np.std(ri.m_corr_mc, axis = 0), ri.m_corr_std)
+
+			r.append(np.corrcoef(ri.m_corr_mc[:, 0], ri.m_corr_mc[:, 1])[0, 1])
+
+		assert r[1] > r[0]
+		assert r[1] > 0.9
+
+	def test_iso_inv(self):
+		#assert that inverted isotopes reproduce fraction values
+		iso = np.column_stack((result.Fm_raw, result.d13C_raw/1000 + 1))
+
+		iso_E, resid = _rpo_iso_inv(
+			result._p_frac,
+			ratedata.E,
+			iso,
+			lam = 0.01)
+
+		#test shapes and fit
+		assert_equal(np.shape(iso_E), (ratedata.nE, 2))
+		assert np.all(resid < 1e-3)
+
+		#assert that bounded solution is non-negative
+		iso_E, _ = _rpo_iso_inv(
+			result._p_frac,
+			ratedata.E,
+			result.Fm_raw - 0.3,
+			lam = 1)
+
+		assert np.all(iso_E >= 0)
+
 
 class test_result_creation:
 
 	#test bare-bones creation of instance
+	def test_calc_iso_E(self):
+		#assert that continuous isotopes are stored for each isotope
+		ri = copy.deepcopy(result)
+		resid = ri.calc_iso_E(lam = 1)
+
+		assert_equal(list(resid.index), ['Fm', 'd13C'])
+		assert_equal(len(ri.Fm_E), ratedata.nE)
+		assert_equal(len(ri.d13C_E), ratedata.nE)
+
+		#assert that instances without isotopes raise exception
+		ri = rp.RpoIsotopes.from_csv(
+			gen_str('test_data/res_no_iso.csv'),
+			model,
+			ratedata)
+
+		assert_raises(ValueError, ri.calc_iso_E)
+
 	def test_rpo_init(self):
 		t_frac = [[100, 200], [200, 300], [300, 1000]]
 		t_frac = np.array(t_frac)
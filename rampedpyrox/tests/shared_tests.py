@@ -0,0 +1,130 @@
+'''
+This module contains shared memory tests.
+'''
+
+import copy
+import numpy as np
+import operator
+import os
+import pickle
+import shutil
+import tempfile
+
+import rampedpyrox as rp
+
+from nose.tools import(
+	assert_equal,
+	assert_is_instance,
+	assert_true,
+	)
+
+from rampedpyrox.batch_helper import(
+	_map_jobs,
+	)
+
+from rampedpyrox.shared_helper import(
+	_ATTACHED,
+	_CLOSING,
+	)
+
+#function to load files
+def gen_str(name):
+	p = os.path.join(os.path.dirname(__file__), name)
+	return p
+
+file_str = gen_str('test_data/thermogram.csv')
+
+#create some timedata and model instances
+timedata = rp.RpoThermogram.from_csv(
+	file_str,
+	nt = 250)
+
+model = rp.Daem.from_timedata(
+	timedata,
+	nE = 300)
+
+#test the SharedArrays class
+class test_SharedArrays:
+
+	def test_pickle_handles(self):
+		#assert that shared objects pickle as small handles
+		A = model.A.copy()
+		n = len(pickle.dumps(model))
+
+		with rp.SharedArrays(model, timedata):
+			assert_true(len(pickle.dumps(model)) < n/10)
+
+			m = pickle.loads(pickle.dumps(model))
+			assert_true(np.array_equal(m.A, A))
+
+			#assert that results are unchanged
+			ec = rp.EnergyComplex.inverse_model(model, timedata, lam = 1)
+
+		#assert that arrays are restored on exit
+		assert_true(not hasattr(model, '_shared'))
+		assert_equal(type(model.A), np.ndarray)
+		assert_true(np.array_equal(model.A, A))
+		assert_equal(len(pickle.dumps(model)), n)
+
+		ec2 = rp.EnergyComplex.inverse_model(model, timedata, lam = 1)
+		assert_true(np.allclose(ec.p, ec2.p))
+
+	def test_worker_processes(self):
+		#assert that workers attach to shared arrays
+		jobs = [model]*3
+
+		with rp.SharedArrays(model):
+			res = _map_jobs(operator.attrgetter('A'), jobs, 2)
+
+		for A in res:
+			assert_true(np.array_equal(A, model.A))
+
+	def test_resend_after_exit(self):
+		#assert that objects returned by workers can be re-sent to workers
+		# after their segments are freed
+		with rp.SharedArrays(model):
+			res = _map_jobs(copy.copy, [model]*2, 2)
+
+		for m in res:
+			m2 = pickle.loads(pickle.dumps(m))
+
+			assert_true(not hasattr(m2, '_shared'))
+			assert_true(np.array_equal(m2.A, model.A))
+
+		for A in _map_jobs(operator.attrgetter('A'), res, 2):
+			assert_true(np.array_equal(A, model.A))
+
+	def test_no_leaked_mappings(self):
+		#assert that returned objects do not map the parent's segments again
+		n = len(_ATTACHED)
+
+		for i in range(3):
+			with rp.SharedArrays(model):
+				res = _map_jobs(copy.copy, [model]*2, 2)
+
+			#assert that only segments still in use by res remain mapped
+			assert_equal(len(_ATTACHED), n)
+			assert_true(len(_CLOSING) <= 1)
+
+		for m in res:
+			assert_true(np.array_equal(m.A, model.A))
+
+	def test_memmap(self):
+		#assert that read-only memory-mapped arrays are shared by file
+		d = tempfile.mkdtemp()
+
+		try:
+			f = model.save(os.path.join(d, 'daem'))
+			m = rp.Daem.load(f, mmap_mode = 'r')
+
+			with rp.SharedArrays(m):
+				assert_equal(m._shared['A'][0][0], 'mmap')
+
+				m2 = pickle.loads(pickle.dumps(m))
+				assert_is_instance(m2.A, np.memmap)
+				assert_true(np.array_equal(m2.A, model.A))
+
+			del m, m2
+
+		finally:
+			shutil.rmtree(d)
@@ -0,0 +1,73 @@
+'''
+This module contains synthetic module tests,
+'''
+
+import numpy as np
+import shutil
+import tempfile
+
+import rampedpyrox as rp
+
+from nose.tools import(
+	assert_almost_equal,
+	assert_equal,
+	assert_is_instance,
+	)
+
+#test the synthetic thermogram generator
+class test_make_synthetic_thermograms:
+
+	def test_shapes_and_normalization(self):
+		#assert shapes and that each p integrates to 1
+		daem, P, G = rp.make_synthetic_thermograms(
+			50,
+			nE = 100,
+			nt = 80,
+			seed = 0)
+
+		assert_is_instance(daem, rp.Daem)
+		assert_equal(np.shape(P), (50, 100))
+		assert_equal(np.shape(G), (80, 50))
+
+		assert np.allclose(np.sum(P*np.gradient(daem.E), axis = 1), 1)
+		assert np.all((G >= 0) & (G <= 1))
+
+	def test_seed_and_noise(self):
+		#assert that draws are reproducible and noise is added to g
+		_, P0, G0 = rp.make_synthetic_thermograms(5, seed = 1)
+		_, P1, G1 = rp.make_synthetic_thermograms(5, seed = 1, noise = 0.01)
+
+		assert np.allclose(P0, P1)
+		assert_almost_equal(np.std(G1 - G0), 0.01, places = 2)
+
+	def test_labview_round_trip(self):
+		#assert that written files can be read as thermograms
+		d = tempfile.mkdtemp()
+
+		try:
+			daem, P, G = rp.make_synthetic_thermograms(
+				2,
+				path = d,
+				seed = 2)
+
+			tgs, isos, errors = rp.load_rpo_batch(d, processes = 1)
+
+			assert_equal(sorted(tgs.keys()), ['synth_0', 'synth_1'])
+			assert_equal(len(errors), 0)
+
+			#assert that read thermogram matches generated g
+			tg = tgs['synth_0']
+			g = np.interp(tg.t, daem.t, G[:,0])
+
+			assert np.max(np.abs(tg.g - g)) < 0.05
+
+		finally:
+			shutil.rmtree(d)
+
+if __name__ == '__main__':
+
+	import nose
+
+	nose.runmodule(
+		argv = [__file__, '-vvs', '-x', '--pdb', '--pdb-failure'],
+		exit=False)
@@ -7,6 +7,8 @@ This module contains timedata module tests,
 import numpy as np
 import os
 import pandas as pd
+import shutil
+import tempfile
 
 import rampedpyrox as rp
 
@@ -19,12 +21,29 @@ from nose.tools import(
 	)
 
 from rampedpyrox.timedata_helper import(
+	_bd_cache_file,
+	_bd_cache_load,
+	_bd_cache_save,
+	_bd_calc_bge,
+	_bd_calc_bge_mc,
+	_bd_calc_bge_sweep,
+	_bd_data_reduction,
+	_bd_find_gaps,
+	_bd_minute_frame,
+	_bd_minute_init,
+	_bd_minute_read,
+	_bd_rolling,
 	_rpo_extract_tg)
 
+from rampedpyrox.io_helper import(
+	_read_csv_fast,
+	)
+
 from rampedpyrox.exceptions import(
 	ArrayError,
 	FileError,
 	LengthError,
+	ScalarError,
 	StringError,
 	)
 
@@ -106,6 +125,356 @@ class test_rpo_extract_tg:
 		assert_is_instance(t, np.ndarray)
 		assert_is_instance(T, np.ndarray)
 
+	def test_chunked_matches_full(self):
+		#assert that the streaming reduction agrees with the full reduction
+		g, t, T = _rpo_extract_tg(
+			file_str,
+			250,
+			bl_subtract = True)
+
+		gc, tc, Tc = _rpo_extract_tg(
+			file_str,
+			250,
+			bl_subtract = True,
+			chunksize = 1000)
+
+		assert_equal(len(gc), 250)
+		assert_almost_equal(np.max(np.abs(g - gc)), 0, places=3)
+
+	def test_fast_engine_matches_default(self):
+		#assert that fast ingest gives the same result as the default reader
+		g, t, T = _rpo_extract_tg(
+			file_str,
+			250,
+			bl_subtract = True)
+
+		gf, tf, Tf = _rpo_extract_tg(
+			file_str,
+			250,
+			bl_subtract = True,
+			engine = 'c')
+
+		assert_almost_equal(np.max(np.abs(g - gf)), 0, places=10)
+		assert_almost_equal(np.max(np.abs(T - Tf)), 0, places=10)
+
+	def test_fast_chunked_fallback(self):
+		#assert that chunked fast ingest falls back to inferred dtypes if a
+		# column cannot be parsed as float
+		d = tempfile.mkdtemp()
+
+		try:
+			f = os.path.join(d, 'bad_all_data.csv')
+			raw = pd.read_csv(file_str, index_col = 0)
+			raw['CO2_scaled'] = raw['CO2_scaled'].astype(object)
+			raw.iloc[0, raw.columns.get_loc('CO2_scaled')] = 'bad'
+			raw.to_csv(f)
+
+			chunks = _read_csv_fast(
+				f,
+				['CO2_scaled', 'temp'],
+				chunksize = 1000)
+
+			data = pd.concat(list(chunks))
+
+			assert_equal(len(data), len(raw))
+			assert_is_instance(data.index, pd.DatetimeIndex)
+
+		finally:
+			shutil.rmtree(d)
+
+	def test_fast_chunked_fallback_late(self):
+		#assert that chunked fast ingest also falls back if a later chunk
+		# cannot be parsed, without repeating rows
+		d = tempfile.mkdtemp()
+
+		try:
+			f = os.path.join(d, 'bad_all_data.csv')
+			raw = pd.read_csv(file_str, index_col = 0)
+			raw['CO2_scaled'] = raw['CO2_scaled'].astype(object)
+			raw.iloc[2500, raw.columns.get_loc('CO2_scaled')] = 'bad'
+			raw.to_csv(f)
+
+			chunks = _read_csv_fast(
+				f,
+				['CO2_scaled', 'temp'],
+				chunksize = 1000)
+
+			data = pd.concat(list(chunks))
+
+			assert_equal(len(data), len(raw))
+			assert_equal(list(data['temp']), list(raw['temp']))
+			assert_is_instance(data.index, pd.DatetimeIndex)
+
+		finally:
+			shutil.rmtree(d)
+
+	def test_adaptive_grid(self):
+		#assert that adaptive grids are strictly increasing and length nt
+		for grid in ['carbon', 'curvature']:
+			g, t, T = _rpo_extract_tg(
+				file,
+				100,
+				bl_subtract = True,
+				grid = grid)
+
+			assert_equal(len(t), 100)
+			assert_equal(all(np.diff(t) > 0), True)
+			assert_almost_equal(np.max(g), 1, places=2)
+
+		#assert that it doesn't take a garbage string for `grid`
+		assert_raises(
+			StringError,
+			_rpo_extract_tg,
+			file,
+			100,
+			grid = 'garbage')
+
+#test the biodecay helper functions
+class test_bd_rolling:
+
+	def test_numpy_matches_pandas(self):
+		#assert that the numpy engine gives the same result as pandas
+		ind = pd.date_range('2017-01-01', periods = 500, freq = 'T')
+		ind = ind.delete(np.arange(200, 230))
+
+		x = pd.Series(400 + np.sin(np.arange(470)/10.), index = ind)
+		x[[5, 300]] = np.nan
+
+		for window in [10, 11, 100, '10min']:
+			for calc in ['mean', 'median', 'sum']:
+				rp_ = _bd_rolling(x, window = window, calc = calc)
+				rn = _bd_rolling(x, window = window, calc = calc, 
+					engine = 'numpy')
+
+				assert_almost_equal(np.max(np.abs(rp_ - rn)), 0, places=8)
+
+	def test_input_strings(self):
+		#assert that garbage strings raise exceptions
+		x = pd.Series(np.arange(20.))
+
+		assert_raises(
+			ValueError,
+			_bd_rolling,
+			x,
+			calc = 'garbage')
+
+		assert_raises(
+			ValueError,
+			_bd_rolling,
+			x,
+			engine = 'garbage')
+
+#test the biodecay data reduction cache
+class test_bd_cache:
+
+	def test_cache_round_trip(self):
+		#assert that cached reduced data are identical and keyed by params
+		ind = pd.date_range('2017-01-01', periods = 50, freq = 'T')
+		ad = pd.DataFrame({'CO2_scaled': np.arange(50.)}, index = ind)
+		sd = pd.DataFrame({'CO2_bl': np.arange(3)}, index = ind[[0, 10, 20]])
+
+		d = tempfile.mkdtemp()
+		kw = {'Vhs0': 4000, 'chunksize': None}
+
+		try:
+			f = _bd_cache_file(d, ad, sd, kw)
+			_bd_cache_save(f, ad, sd)
+			ad2, sd2 = _bd_cache_load(f)
+
+			pd.testing.assert_frame_equal(ad, ad2)
+			pd.testing.assert_frame_equal(sd, sd2)
+
+			#chunksize does not change the key, other parameters do
+			assert_equal(f, _bd_cache_file(d, ad, sd, {'Vhs0': 4000}))
+			assert f != _bd_cache_file(d, ad, sd, {'Vhs0': 3000})
+			assert f != _bd_cache_file(d, ad + 1, sd, kw)
+
+		finally:
+			shutil.rmtree(d)
+
+#test biodecay bacterial growth efficiency
+class test_bd_bge:
+
+	def test_bge_sweep_matches_single(self):
+		#assert that each sweep scenario matches a single BGE calculation
+		ind = pd.date_range('2017-01-01', periods = 100, freq = 'T')
+		Cflux = pd.Series(1 + np.sin(np.arange(100)/20.)**2, index = ind)
+		Cflux_err = 0.1*Cflux
+		cc = pd.Series([1e5, 2e5, 4e5, 5e5], index = ind[[0, 30, 60, 99]])
+
+		alpha = [[50, 1], [20, 5]]
+		sw = _bd_calc_bge_sweep(Cflux, cc, Cflux_err = Cflux_err,
+			cell_counts_err = [None, 0.05], alpha = alpha)
+
+		for i, e in enumerate([None, 0.05]):
+			bge = _bd_calc_bge(Cflux, cc, Cflux_err = Cflux_err,
+				cell_counts_err = e, alpha = alpha[i])
+
+			assert np.isnan(bge['mean'][0])
+			assert np.allclose(sw['mean'][i][1:], bge['mean'][1:])
+			assert np.allclose(sw['err'][i][1:], bge['err'][1:])
+
+		assert_raises(
+			ValueError,
+			_bd_calc_bge_sweep,
+			Cflux,
+			cc,
+			cell_counts_err = [None, 0.01, 0.05],
+			alpha = alpha)
+
+#test biodecay Monte Carlo uncertainty
+class test_bd_monte_carlo:
+
+	def test_bge_mc(self):
+		#assert that Monte Carlo BGE draws agree with first-order values when
+		# only flux is uncertain
+		ind = pd.date_range('2017-01-01', periods = 100, freq = 'T')
+		Cflux = pd.Series(1 + np.sin(np.arange(100)/20.)**2, index = ind)
+		Cflux_err = 0.1*Cflux
+		cc = pd.Series([1e5, 2e5, 4e5, 5e5], index = ind[[0, 30, 60, 99]])
+
+		bge = _bd_calc_bge(Cflux, cc, Cflux_err = Cflux_err,
+			alpha = [50, 0])
+		draws = _bd_calc_bge_mc(Cflux, cc, Cflux_err = Cflux_err,
+			alpha = [50, 0], nmc = 20000, seed = 0)
+
+		assert_equal(draws.shape, (20000, 4))
+		assert np.allclose(np.mean(draws[:, 1:], axis = 0), bge['mean'][1:],
+			rtol = 0.01)
+		assert np.allclose(np.std(draws[:, 1:], axis = 0), bge['err'][1:],
+			rtol = 0.05)
+
+	def test_bge_mc_corr(self):
+		#assert that fully correlated cell count errors give fully correlated
+		# BGE draws
+		ind = pd.date_range('2017-01-01', periods = 100, freq = 'T')
+		Cflux = pd.Series(1 + np.sin(np.arange(100)/20.)**2, index = ind)
+		cc = pd.Series([1e5, 2e5, 4e5, 5e5], index = ind[[0, 30, 60, 99]])
+
+		r = []
+
+		for corr in [0, 1]:
+			draws = _bd_calc_bge_mc(Cflux, cc, cell_counts_err = 0.05,
+				alpha = [50, 0], nmc = 5000, seed = 0, corr = corr)
+
+			r.append(np.corrcoef(draws[:, 1], draws[:, 3])[0, 1])
+
+		assert abs(r[0]) < 0.1
+		assert r[1] > 0.99
+
+		assert_raises(
+			ScalarError,
+			_bd_calc_bge_mc,
+			Cflux,
+			cc,
+			corr = 2)
+
+#test the biodecay 1-minute reader
+class test_bd_minute_reader:
+
+	def test_multiple_files(self):
+		#assert that overlapping split files give the same 1-minute data
+		ind = pd.date_range('2017-01-01', periods = 600, freq = '15s')
+		ind = ind.delete(np.arange(300, 340))
+		n = len(ind)
+
+		ad = pd.DataFrame({
+			'temp': 25 + np.sin(np.arange(n)),
+			'p_room': 101. + np.cos(np.arange(n)),
+			'CO2_scaled': 400. + np.arange(n) % 7,
+			'flow_rate': 30. + np.zeros(n),
+			}, index = ind)
+		ad.index.name = 'date_time'
+
+		d = tempfile.mkdtemp()
+
+		try:
+			f1 = os.path.join(d, 'all_1.csv')
+			f2 = os.path.join(d, 'all_2.csv')
+			ad[:250].to_csv(f1)
+			ad[200:].to_csv(f2)
+
+			reader = _bd_minute_init([f1, f2])
+			_bd_minute_read(reader, chunksize = 37)
+
+		finally:
+			shutil.rmtree(d)
+
+		ad1 = _bd_minute_frame(reader)
+		ad2 = ad.resample('1T').median()
+
+		pd.testing.assert_frame_equal(ad1, ad2, check_freq = False)
+
+		#assert that the 10-minute gap is found
+		assert_equal(len(_bd_find_gaps(ad1, max_gap = 5)), 1)
+		assert_equal(len(_bd_find_gaps(ad1, max_gap = 10)), 0)
+
+#make synthetic IsoCaRB all_data and sam_data frames
+def gen_bd_data(n = 2400):
+	ind = pd.date_range('2017-01-01', periods = n, freq = '15s')
+	ind.name = 'date_time'
+
+	ad = pd.DataFrame({
+		'temp': 25 + np.sin(np.arange(n)/50.),
+		'p_room': 101. + np.cos(np.arange(n)/50.),
+		'CO2_scaled': 400. + 50*np.exp(-np.arange(n)/800.) + np.arange(n) % 7,
+		'flow_rate': 30. + np.zeros(n),
+		}, index = ind)
+
+	sd = pd.DataFrame({
+		'CO2_bl': [2., 1., 0.5],
+		'liq_sample': [0., 10., 10.],
+		}, index = ind[[240, 1200, 2200]])
+
+	return ad, sd
+
+#test biodecay data reduction
+class test_bd_data_reduction:
+
+	def test_chunked_and_refresh_match_batch(self):
+		#assert that chunked reading and incremental refreshing give the same
+		# reduced data as reading the whole file at once
+		ad, sd = gen_bd_data()
+		kw = {'Vhs0': 3750, 'Vmedia0': 2000, 'Fsysblk': [35, 1]}
+
+		d = tempfile.mkdtemp()
+
+		try:
+			fa = os.path.join(d, 'all_data.csv')
+			fs = os.path.join(d, 'sam_data.csv')
+			ad.to_csv(fa)
+			sd.to_csv(fs)
+
+			ad0, _ = _bd_data_reduction(fa, fs, **kw)
+			ad1, _ = _bd_data_reduction(fa, fs, chunksize = 97, **kw)
+
+			pd.testing.assert_frame_equal(ad0, ad1, check_freq = False)
+
+			#write the first part of the run, then append the rest
+			ad[:1000].to_csv(fa)
+			sd[:1].to_csv(fs)
+
+			bd = rp.BioDecay.from_csv(fa, fs, chunksize = 97, **kw)
+
+			with open(fa, 'a') as f:
+				ad[1000:].to_csv(f, header = False)
+
+			sd.to_csv(fs)
+			bd = bd.refresh()
+
+			pd.testing.assert_frame_equal(ad0, bd.all_data, check_freq = False)
+
+			#assert that the reader is not archived but everything else is
+			bd2 = rp.BioDecay.load(bd.save(os.path.join(d, 'bd')))
+
+			assert not hasattr(bd2, '_refresh_args')
+			assert_equal(
+				set(vars(bd2)),
+				set(vars(bd)) - set(['_refresh_args']))
+
+		finally:
+			shutil.rmtree(d)
+
 #test creating thermogram instances
 class test_thermogram_creation:
 
@@ -191,6 +560,175 @@ class test_thermogram_creation:
 		assert_equal(all(tg.t), all(tg_str.t))
 		assert_equal(all(tg.T), all(tg_str.T))
 
+	def test_follow_matches_chunked(self):
+		#assert that following a completed file matches the streaming reduction
+		tgs = list(rp.RpoThermogram.follow(
+			file_str,
+			nt = 250,
+			poll = 0,
+			timeout = 0))
+
+		g, t, T = _rpo_extract_tg(
+			file_str,
+			250,
+			bl_subtract = True,
+			chunksize = 1000)
+
+		assert_is_instance(tgs[-1], rp.RpoThermogram)
+		assert_almost_equal(np.max(np.abs(tgs[-1].g - g)), 0, places=10)
+
+	def test_follow_growing_file(self):
+		#assert that following a file while rows are appended, with a
+		# partially written last line, matches reading the rows so far
+		with open(file_str, 'rb') as f:
+			lines = f.read().splitlines(True)
+
+		header, rows = lines[0], lines[1:]
+
+		d = tempfile.mkdtemp()
+
+		try:
+			f = os.path.join(d, 'all_data.csv')
+			fc = os.path.join(d, 'complete.csv')
+
+			with open(f, 'wb') as fo:
+				fo.write(header)
+
+			gen = rp.RpoThermogram.follow(
+				f,
+				nt = 100,
+				poll = 0.01,
+				timeout = 0.5)
+
+			#write the run in steps, each ending with half of a line (the
+			# first 40 percent are needed for a provisional thermogram)
+			n = 0
+
+			for i in [int(len(rows)*fr) for fr in [0.4, 0.55, 0.7, 0.85]]:
+				with open(f, 'ab') as fo:
+					fo.write(rows[n][len(rows[n])//2:] if n else b'')
+					fo.writelines(rows[n+1 if n else 0:i])
+					fo.write(rows[i][:len(rows[i])//2])
+
+				n = i
+				tg = next(gen)
+
+				#compare with a completed file of the rows written so far
+				with open(fc, 'wb') as fo:
+					fo.write(header)
+					fo.writelines(rows[:i])
+
+				tgc = list(rp.RpoThermogram.follow(
+					fc,
+					nt = 100,
+					poll = 0,
+					timeout = 0))[-1]
+
+				assert_almost_equal(np.max(np.abs(tg.t - tgc.t)), 0, places=10)
+				assert_almost_equal(np.max(np.abs(tg.g - tgc.g)), 0, places=10)
+
+			#finish the run without a trailing newline
+			with open(f, 'ab') as fo:
+				fo.write(rows[n][len(rows[n])//2:])
+				fo.writelines(rows[n+1:])
+
+			with open(f, 'rb') as fo:
+				data = fo.read()
+
+			with open(f, 'wb') as fo:
+				fo.write(data.rstrip(b'\r\n'))
+
+			tg = list(gen)[-1]
+
+			g, t, T = _rpo_extract_tg(
+				file_str,
+				100,
+				bl_subtract = True,
+				chunksize = 1000)
+
+			assert_almost_equal(np.max(np.abs(tg.g - g)), 0, places=10)
+			assert_almost_equal(np.max(np.abs(tg.T - T)), 0, places=10)
+
+		finally:
+			shutil.rmtree(d)
+
+	def test_archive_round_trip(self):
+		#assert that saving and loading an archive preserves all data
+		tg = rp.RpoThermogram.from_csv(
+			file,
+			nt = 250)
+
+		daem = rp.Daem.from_timedata(tg, keep_I = True)
+
+		ec = rp.EnergyComplex.inverse_model(
+			daem,
+			tg,
+			lam = 3)
+
+		tg.forward_model(daem, ec)
+
+		ri = rp.RpoIsotopes.from_csv(
+			gen_str('test_data/isotopes.csv'),
+			daem,
+			ec,
+			DE = None)
+
+		d = tempfile.mkdtemp()
+
+		try:
+			f = rp.save_archive(
+				os.path.join(d, 'sample'),
+				tg = tg,
+				ec = ec,
+				daem = daem,
+				ri = ri)
+
+			objs = rp.load_archive(f)
+			tg2 = rp.RpoThermogram.load(f)
+
+			assert_is_instance(objs['tg'], rp.RpoThermogram)
+			assert_is_instance(objs['ec'], rp.EnergyComplex)
+			assert_equal(tg2.nt, tg.nt)
+			assert_equal(np.max(np.abs(tg2.ghat - tg.ghat)), 0)
+			assert_equal(np.max(np.abs(objs['ec'].p - ec.p)), 0)
+			assert_equal(all(tg2.tg_info == tg.tg_info), True)
+
+			#assert that private model attributes are kept
+			daem2 = objs['daem']
+
+			assert_is_instance(daem2, rp.Daem)
+			assert_equal(np.max(np.abs(daem2.A - daem.A)), 0)
+
+			assert_equal(np.max(np.abs(daem2._I - daem._I)), 0)
+
+			#assert that a loaded RpoIsotopes instance can be used further
+			ri2 = objs['ri']
+
+			ax = ri2.plot(plt_var = 'p0E')
+			ax.figure.clf()
+
+			ri.kie_correct(daem, ec, DE = 0.0018)
+			ri2.kie_correct(daem2, objs['ec'], DE = 0.0018)
+
+			pd.testing.assert_frame_equal(ri2.ri_corr_info, ri.ri_corr_info)
+
+			#assert that loading the wrong type raises exception
+			assert_raises(
+				FileError,
+				rp.RpoIsotopes.load,
+				os.path.join(d, 'sample.npz'),
+				name = 'tg')
+
+			f = rp.save_archive(os.path.join(d, 'tg'), tg = tg)
+
+			assert_raises(
+				FileError,
+				rp.Daem.load,
+				f)
+
+		finally:
+			shutil.rmtree(d)
+
 #test inputting data into thermogram instancece
 class test_thermogram_modeled_input:
 
@@ -298,6 +836,39 @@ class test_thermogram_modeled_input:
 		assert_equal(len(tg.dghatdT), 250)
 		assert_equal(len(tg.ghat), 250)
 
+	def test_forward_model_batch(self):
+
+		#assert that batch results match single forward model
+		tg = rp.RpoThermogram.from_csv(
+			file,
+			nt = 250)
+
+		daem = rp.Daem.from_timedata(tg)
+
+		ec = rp.EnergyComplex.inverse_model(
+			daem,
+			tg,
+			lam = 3)
+
+		tg.forward_model(daem, ec)
+
+		ghat, dghatdt, dghatdT, resid = tg.forward_model_batch(
+			daem,
+			[ec, 0.5*ec.p])
+
+		assert_equal(np.shape(ghat), (250, 2))
+		assert np.allclose(ghat[:,0], tg.ghat)
+		assert np.allclose(dghatdt[:,0], tg.dghatdt)
+		assert np.allclose(dghatdT[:,0], tg.dghatdT)
+		assert_almost_equal(resid[0], tg.resid)
+
+		#assert that p vectors must be the right length
+		assert_raises(
+			ArrayError,
+			tg.forward_model_batch,
+			daem,
+			np.ones([2, 10]))
+
 #test plotting data
 class test_thermogram_plots:
 
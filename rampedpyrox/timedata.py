@@ -10,12 +10,21 @@ from __future__ import(
 __docformat__ = 'restructuredtext en'
 __all__ = ['RpoThermogram']
 
-import matplotlib.pyplot as plt
 import numpy as np
+import os
+import time
 import warnings
 
 from numpy.linalg import norm
 
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pandas and pyplot on first use
+pd = _lazy_import('pandas')
+plt = _lazy_import('matplotlib.pyplot')
+
 #import exceptions
 from .exceptions import(
 	ArrayError,
@@ -23,6 +32,10 @@ from .exceptions import(
 	)
 
 #import helper functions
+from .io_helper import(
+	_ArchiveMixin,
+	)
+
 from .core_functions import(
 	assert_len,
 	derivatize,
@@ -41,17 +54,33 @@ from .summary_helper import(
 
 from .model_helper import(
 	_calc_ghat,
+	_calc_ghat_batch,
+	)
+
+from .shared_helper import(
+	_shared_getstate,
+	_shared_setstate,
 	)
 
 from .timedata_helper import(
+	_bd_all_files,
+	_bd_cache_file,
+	_bd_cache_load,
+	_bd_cache_save,
 	_rpo_extract_tg,
+	_rpo_tail_init,
+	_rpo_tail_read,
+	_rpo_tail_tg,
 	_bd_calc_bge,
+	_bd_calc_bge_mc,
+	_bd_calc_bge_sweep,
 	_bd_data_reduction,
+	_bd_minute_init,
 	_bd_extract_profile,
 	)
 
 
-class TimeData(object):
+class TimeData(_ArchiveMixin):
 	'''
 	Class to store time-dependent data. Intended for subclassing, do not call
 	directly.
@@ -119,6 +148,13 @@ class TimeData(object):
 	def from_csv(cls, file):
 		raise NotImplementedError
 
+	#define pickling methods so that shared arrays are sent as handles
+	def __getstate__(self):
+		return _shared_getstate(self)
+
+	def __setstate__(self, state):
+		_shared_setstate(self, state)
+
 	#define method for forward-modeling rate data using a given model
 	def forward_model(self, model, ratedata):
 		'''
@@ -158,6 +194,137 @@ class TimeData(object):
 		#populate with modelled data
 		self.input_estimated(ghat)
 
+	#define method for forward-modeling many rate data at once
+	def forward_model_batch(self, model, ratedatas):
+		'''
+		Forward-models many rate data for a given model at once, without
+		storing results in the ``rp.TimeData`` instance.
+
+		Parameters
+		----------
+		model : rp.Model
+			``rp.Model`` instance used to calculate the forward model.
+
+		ratedatas : list or array-like
+			List of ``rp.RateData`` instances, or 2d array of p vectors,
+			shape [`n` x `nk`] (`nE` for DAEM).
+
+		Returns
+		-------
+		ghat : np.ndarray
+			2d array of estimated fraction of total carbon remaining at each
+			timestep (rows) for each distribution (columns). Shape
+			[`nt` x `n`].
+
+		dghatdt : np.ndarray
+			Derivative of `ghat` with respect to time. Shape [`nt` x `n`].
+
+		dghatdT : np.ndarray
+			Derivative of `ghat` with respect to temperature. Shape
+			[`nt` x `n`].
+
+		resid : None or np.ndarray
+			Residual RMSE between true and modeled time data of each
+			distribution, length `n`. `None` if the ``rp.TimeData``
+			instance has no true data, `g`.
+
+		Raises
+		------
+		ArrayError
+			If any ``rp.RateData`` instance has no attribute `p`.
+
+		ArrayError
+			If `ratedatas` is not of length `nk` (`nE` for DAEM) in the
+			second dimension.
+
+		ArrayError
+			If `nt` is not the same in the ``rp.Model`` instance and the
+			``rp.TimeData`` instance.
+
+		Warnings
+		--------
+		UserWarning
+			If the time-temperature data in the ``rp.Model`` instance do not 
+			match the time-temperature data in the ``rp.TimeData`` instance.
+
+		See Also
+		--------
+		forward_model
+			Method for forward-modeling and storing a single ``rp.RateData``
+			instance.
+
+		Examples
+		--------
+		Posterior-predictive thermograms for an array of sampled p
+		distributions, `ps`, of shape [`n` x `nE`]::
+
+			ghat, dghatdt, dghatdT, resid = tg.forward_model_batch(daem, ps)
+
+		Notes
+		-----
+		All distributions are forward modeled with a single matrix-matrix
+		product, and derivatives and residuals are calculated for all
+		columns at once.
+		'''
+
+		#warn if self and model t and T arrays do not match
+		td_type = type(self).__name__
+		mod_type = type(model).__name__
+
+		if (self.t != model.t).any() or (self.T != model.T).any():
+			warnings.warn(
+				'rp.TimeTata instance of type %s and rp.Model instance of'
+				' type %s do not contain matching time-temperature arrays.'
+				' Check that the model does not correspond to a different'
+				' rp.TimeData instance' %(td_type, mod_type), UserWarning)
+
+		#raise exception if not the right shape
+		if model.nt != self.nt:
+			raise ArrayError(
+				'Cannot combine model with nt = %r and TimeData with'
+				' nt = %r. Check that the model does not correspond to a'
+				' different rp.TimeData instance' % (model.nt, self.nt))
+
+		#extract p vectors from rate data if necessary
+		if not isinstance(ratedatas, np.ndarray):
+			P = []
+
+			for rd in ratedatas:
+
+				if hasattr(rd, 'nE') or hasattr(rd, 'nk'):
+
+					if not hasattr(rd, 'p'):
+						raise ArrayError(
+							'RateData has no p array!')
+
+					rd = rd.p
+
+				P.append(rd)
+
+			ratedatas = P
+
+		P = np.array(ratedatas, dtype = float, ndmin = 2)
+		nk = np.shape(model.A)[1]
+
+		if P.shape[1] != nk:
+			raise ArrayError(
+				'Cannot combine model with nk = %r and p vectors of length'
+				' %r' % (nk, P.shape[1]))
+
+		#calculate forward-modelled g estimates and derivatives
+		ghat = _calc_ghat_batch(model, P)
+		dghatdt = derivatize(ghat, self.t)
+		dghatdT = derivatize(ghat, self.T)
+
+		#calculate RMSE if the model has true data, g
+		if hasattr(self, 'g'):
+			resid = norm(self.g[:, None] - ghat, axis = 0)/self.nt**0.5
+
+		else:
+			resid = None
+
+		return ghat, dghatdt, dghatdT, resid
+
 	#define method for inputting the results from a model fit
 	def input_estimated(self, ghat):
 		'''
@@ -481,7 +648,12 @@ class RpoThermogram(TimeData):
 			cls, 
 			file, 
 			bl_subtract = True, 
-			nt = 250):
+			nt = 250,
+			chunksize = None,
+			engine = None,
+			date_format = '%I:%M:%S %p',
+			grid = 'uniform',
+			mix = 0.25):
 		'''
 		Class method to directly import RPO data from a .csv file and create
 		an ``rp.RpoThermogram`` class instance.
@@ -501,6 +673,36 @@ class RpoThermogram(TimeData):
 		nt : int
 			The number of time points to use. Defaults to 250.
 
+		chunksize : None or int
+			If not `None`, reads `file` this many rows at a time and
+			integrates CO2 directly on the native timestamps, keeping memory
+			use bounded for long runs. Defaults to `None`.
+
+		engine : None or str
+			If not `None`, reads `file` in fast mode with the given parser
+			engine ('c' or 'pyarrow'): only the `temp` and `CO2_scaled`
+			columns are parsed, as floats, and timestamps are parsed with
+			`date_format`. Falls back to the default reader if `file` has an
+			unexpected layout. Defaults to `None`.
+
+		date_format : str
+			Timestamp format used when `engine` is not `None`. Defaults to
+			'%I:%M:%S %p' (*i.e.* hh:mm:ss AM/PM).
+
+		grid : str
+			How to place the `nt` time points. 'uniform' uses evenly spaced
+			points; 'carbon' concentrates points where carbon evolves
+			fastest, so each point represents a similar amount of carbon;
+			'curvature' concentrates points where the thermogram curves most.
+			Non-uniform grids resolve peaks with fewer points, giving smaller
+			``rp.Daem`` models that are faster to build and invert. Defaults
+			to 'uniform'.
+
+		mix : float
+			Fraction (0-1) of the point density that is evenly spaced when
+			`grid` is not 'uniform', so that no region of the run is left 
+			without points. Defaults to 0.25.
+
 		Notes
 		-----
 		If using the `all_data` file generated by the NOSAMS RPO LabView 
@@ -540,10 +742,130 @@ class RpoThermogram(TimeData):
 		g, t, T = _rpo_extract_tg(
 			file, 
 			nt, 
-			bl_subtract = bl_subtract)
+			bl_subtract = bl_subtract,
+			chunksize = chunksize,
+			engine = engine,
+			date_format = date_format,
+			grid = grid,
+			mix = mix)
 
 		return cls(t, T, g = g)
 
+	#define class method for following a .csv file as it is written
+	@classmethod
+	def follow(
+			cls,
+			file,
+			bl_subtract = True,
+			nt = 250,
+			poll = 1.0,
+			timeout = None,
+			date_format = '%I:%M:%S %p'):
+		'''
+		Class method to follow an RPO `all_data` .csv file while it is still
+		being written and repeatedly create up-to-date, provisional
+		``rp.RpoThermogram`` class instances.
+
+		Parameters
+		----------
+		file : str
+			Path to the growing .csv file.
+
+		bl_subtract : Boolean
+			Tells the program whether or not to linearly subtract a
+			provisional baseline, from the average of the first 100 seconds
+			to the average of the most recent 100 seconds of ppmCO2. Defaults
+			to `True`.
+
+		nt : int
+			The number of time points to use. Defaults to 250.
+
+		poll : float
+			Number of seconds to wait between checks for new data. Defaults
+			to 1.0.
+
+		timeout : None or float
+			Number of seconds without new data after which the file is
+			considered complete and following stops. If `None`, follows the
+			file indefinitely. Defaults to `None`.
+
+		date_format : str or None
+			``strftime`` format of the timestamps. If `None`, format is
+			inferred. Defaults to '%I:%M:%S %p' (*i.e.* hh:mm:ss AM/PM).
+
+		Yields
+		------
+		tg : rp.RpoThermogram
+			Provisional thermogram containing all data written so far. A new
+			instance is yielded each time new rows are appended.
+
+		Raises
+		------
+		FileError
+			If `file` is not a path string.
+
+		FileError
+			If `file` does not contain "CO2_scaled" and "temp" columns.
+
+		Examples
+		--------
+		Watching a run as it is recorded::
+
+			#import modules
+			import rampedpyrox as rp
+
+			for tg in rp.RpoThermogram.follow('all_data.csv', timeout = 600):
+				print(tg.tg_info)
+
+		Notes
+		-----
+		Only the rows appended since the previous check are parsed; running
+		cumulative CO2 and temperature are carried between checks, so the
+		cost of each update does not include re-reading the file. Until the
+		run is complete, `g` is normalized to the carbon evolved so far and 
+		the final baseline is taken from the most recent data. Once the file
+		is complete, results agree with ``from_csv`` using `chunksize`.
+
+		See Also
+		--------
+		from_csv
+			Classmethod for creating ``rp.RpoThermogram`` instance from a
+			completed .csv file.
+		'''
+
+		state = _rpo_tail_init(file, date_format = date_format)
+		last = time.time()
+
+		while True:
+
+			if _rpo_tail_read(state) > 0:
+				last = time.time()
+
+				g, t, T = _rpo_tail_tg(
+					state,
+					nt,
+					bl_subtract = bl_subtract)
+
+				if g is not None:
+					yield cls(t, T, g = g)
+
+			elif timeout is not None and time.time() - last > timeout:
+
+				#read a final unterminated line, if any
+				if _rpo_tail_read(state, final = True) > 0:
+					g, t, T = _rpo_tail_tg(
+						state,
+						nt,
+						bl_subtract = bl_subtract)
+
+					if g is not None:
+						yield cls(t, T, g = g)
+
+				return
+
+			else:
+				time.sleep(poll)
+
 	#define method for inputting forward-modelled data
 	def forward_model(self, model, ratedata):
 		'''
@@ -805,16 +1127,27 @@ class BioDecay(TimeData):
 		IRGA_error = 1.0,
 		mano_error = 0.01,
 		bl_subtract = True,
-		nt = 250,):
+		nt = 250,
+		chunksize = None,
+		rolling_engine = 'pandas',
+		cache_dir = None,
+		nmc = None,
+		seed = None,
+		corr = 0,
+		max_gap = None):
 		'''
-		Class method to directly import IsoCaRB data from a .csv file and 
+		Class method to directly import IsoCaRB data from a .csv file and
 		create an ``rp.BioDecay`` class instance.
 
 		Parameters
 		----------
-		all_file : str or pd.DataFrame
+		all_file : str, list, or pd.DataFrame
 			File containing timeseries data, either as a path string or a
-			dataframe.
+			dataframe. Experiments logged across several files can be passed
+			as a list of path strings or a glob pattern (*e.g.*
+			'run/all_data_*.csv'). Files are ordered by their first
+			timestamp, overlapping rows are dropped, and the files are read
+			in blocks without first being combined.
 
 		sam_file : str or pd.DataFrame
 			File containing sampling data (baseline checks, liquid subsampling
@@ -869,6 +1202,52 @@ class BioDecay(TimeData):
 		nt : int
 			The number of time points to use. Defaults to `250`.
 
+		chunksize : None or int
+			If not `None` and `all_file` is not a dataframe, reads `all_file`
+			this many rows at a time, resampling each block to 1-minute
+			medians so that memory grows with the run length in minutes
+			rather than with the raw log length. Results are identical to
+			reading the entire file. The returned
+			instance can then be updated with ``refresh`` as the (last) file
+			grows. Several files are always read in blocks, using 10000 rows
+			if `None`. Defaults to `None`.
+
+		rolling_engine : str
+			Engine used for the rolling median spike filter and rolling mean
+			derivative smoothing, either 'pandas' or 'numpy'. Both give the
+			same result; 'numpy' is faster for long records. Defaults to
+			'pandas'.
+
+		cache_dir : None or str
+			If not `None`, directory in which to cache the reduced `all_data`
+			and `sam_data`. The cache is keyed by the contents of `all_file`
+			and `sam_file` and the reduction parameters, so later calls with
+			the same inputs load the reduced data directly instead of
+			repeating the data reduction. Defaults to `None`.
+
+		nmc : None or int
+			If not `None`, the number of Monte Carlo draws used to propagate
+			IRGA, system blank, and manometric uncertainty to the carbon flux
+			uncertainty, 'Cflux_err', instead of first-order error
+			propagation. Only the standard deviation of the draws is kept,
+			since storing every draw at every timepoint would require
+			`nmc` times the memory of `all_data`. Defaults to `None`.
+
+		seed : None or int
+			Seed for reproducible Monte Carlo draws. Defaults to `None`.
+
+		corr : scalar
+			Correlation coefficient (0-1) between the Monte Carlo ppmCO2
+			errors at different timepoints, *e.g.* due to a drifting IRGA
+			calibration. 0 draws independent errors, 1 a single shared
+			error. Only used if `nmc` is not `None`. Defaults to 0.
+
+		max_gap : None or int
+			Longest run of minutes without data, *e.g.* between consecutive
+			log files, that is filled by linear interpolation. A
+			``FileError`` is raised for longer gaps. If `None`, all gaps are
+			interpolated. Defaults to `None`.
+
 		Notes
 		-----
 		If using the `all_data` file generated by the IsoCaRB LabView 
@@ -905,27 +1284,94 @@ class BioDecay(TimeData):
 			a .csv file.
 		'''
 
-		#extract all data from file and perform data reduction, blank
-		# correction, and volume normalization calculations
-		ad, sd = _bd_data_reduction(
+		#expand lists and glob patterns of all_data files
+		files = _bd_all_files(all_file)
+
+		if files is not None and len(files) == 1:
+			all_file = files[0]
+
+		#make a reader if chunked reading or several files are requested
+		if files is not None and (chunksize is not None or len(files) > 1):
+			reader = _bd_minute_init(files)
+
+		else:
+			reader = None
+
+		#store reduction parameters
+		kw = {
+			'mins_before_zero': mins_before_zero,
+			'Vmedia0': Vmedia0,
+			'Vhs0': Vhs0,
+			'Fsysblk': Fsysblk,
+			'downsampled_dt': downsampled_dt,
+			'Ctot_mano': Ctot_mano,
+			'IRGA_error': IRGA_error,
+			'mano_error': mano_error,
+			'chunksize': chunksize,
+			'rolling_engine': rolling_engine,
+			'nmc': nmc,
+			'seed': seed,
+			'corr': corr,
+			'max_gap': max_gap,
+			}
+
+		#get cache file if caching is requested
+		if cache_dir is not None:
+			cache = _bd_cache_file(cache_dir, all_file, sam_file, kw)
+
+		else:
+			cache = None
+
+		return cls._from_reduction(
 			all_file,
 			sam_file,
-			mins_before_zero = mins_before_zero,
-			Vmedia0 = Vmedia0,
-			Vhs0 = Vhs0,
-			Fsysblk = Fsysblk,
-			downsampled_dt = downsampled_dt,
-			Ctot_mano = Ctot_mano,
-			IRGA_error = IRGA_error,
-			mano_error = mano_error)
+			reader,
+			kw,
+			bl_subtract,
+			nt,
+			cache = cache)
+
+	#define class method for creating instance from reduced data
+	@classmethod
+	def _from_reduction(
+		cls,
+		all_file,
+		sam_file,
+		reader,
+		kw,
+		bl_subtract,
+		nt,
+		cache = None):
+		'''
+		Performs data reduction and creates an ``rp.BioDecay`` instance. See
+		``from_csv`` for parameters. If `cache` is the path of an existing
+		cache file, the reduced data are loaded from it instead; if it does not
+		exist, the reduced data are written to it.
+		'''
+
+		if cache is not None and os.path.exists(cache):
+			#load previously reduced data
+			ad, sd = _bd_cache_load(cache)
+
+		else:
+			#extract all data from file and perform data reduction, blank
+			# correction, and volume normalization calculations
+			ad, sd = _bd_data_reduction(
+				all_file,
+				sam_file,
+				reader = reader,
+				**kw)
+
+			if cache is not None:
+				_bd_cache_save(cache, ad, sd)
 
 		#using 't_elapsed' and 'ugC_minL' columns, downsample and calculate
 		# `t` and `g`, the fraction of OC remaining.
 
 		#extract data from file (use same helper function as thermogram)
 		g, t, T = _bd_extract_profile(
-			ad, 
-			nt, 
+			ad,
+			nt,
 			bl_subtract = bl_subtract)
 
 		#store in class instance
@@ -935,10 +1381,66 @@ class BioDecay(TimeData):
 		bd.all_data = ad
 		bd.sam_data = sd
 
+		#store reader and parameters for refreshing
+		if reader is not None:
+			bd._refresh_args = (sam_file, reader, kw, bl_subtract, nt)
+
 		return bd
 
+	#define method for updating an instance as the all_data file grows
+	def refresh(self):
+		'''
+		Creates an updated ``rp.BioDecay`` instance after new rows have been
+		appended to the `all_data` file, only reading the new rows.
+
+		Returns
+		-------
+		bd : rp.BioDecay
+			Updated instance containing all data written so far.
+
+		Raises
+		------
+		ValueError
+			If the instance was not created using ``from_csv`` with a path
+			string and `chunksize`.
+
+		Notes
+		-----
+		Only raw rows appended since the previous read are parsed and
+		resampled to 1-minute medians. The later reduction steps (spike
+		removal, baseline, headspace, and flux calculations) depend on the
+		entire record, *e.g.* through centered windows and manometric
+		rescaling, and are therefore repeated on all 1-minute data. Memory
+		use and the cost of each refresh are therefore not bounded, but grow
+		with the run length in minutes rather than with the number of raw
+		rows. The `sam_file` is re-read if it is a path string. This instance
+		is not modified, but it shares its reader with the returned instance
+		and therefore should not be refreshed again.
+		'''
+
+		if not hasattr(self, '_refresh_args'):
+			raise ValueError(
+				'refresh requires an instance created using from_csv with a'
+				' path string and chunksize')
+
+		sam_file, reader, kw, bl_subtract, nt = self._refresh_args
+
+		return self._from_reduction(
+			reader['file'],
+			sam_file,
+			reader,
+			kw,
+			bl_subtract,
+			nt)
+
 	#define method for calculating bacterial growth efficiency
-	def calc_BGE(self, cell_counts_err = None, alpha = [50, 1]):
+	def calc_BGE(
+		self,
+		cell_counts_err = None,
+		alpha = [50, 1],
+		nmc = None,
+		seed = None,
+		corr = 0):
 		'''
 		Function to calculate bacterial growth efficiency (BGE) over the 
 		course of a biodecay experiment using 'all_data' and 'sam_data'
@@ -955,9 +1457,24 @@ class BioDecay(TimeData):
 			have 1 % relative uncertainty). Defaults to `None`.
 
 		alpha : list
-			List of mass of carbon per cell and associated uncertainty 
+			List of mass of carbon per cell and associated uncertainty
 			(+/- 1 sigma), in femtograms. Defaults to `[50, 1]`.
 
+		nmc : None or int
+			If not `None`, the number of Monte Carlo draws used to calculate
+			BGE uncertainty instead of first-order error propagation. Unlike
+			first-order propagation, the per-cell carbon mass error is then
+			shared by all cell counts. The draws are stored in `BGE_mc`.
+			Defaults to `None`.
+
+		seed : None or int
+			Seed for reproducible Monte Carlo draws. Defaults to `None`.
+
+		corr : scalar
+			Correlation coefficient (0-1) between the Monte Carlo cell count
+			errors, *e.g.* due to a shared counting calibration. Only used if
+			`nmc` is not `None`. Defaults to 0.
+
 		Raises
 		------
 		AttributeError
@@ -993,8 +1510,90 @@ class BioDecay(TimeData):
 			cell_counts_err = cell_counts_err,
 			alpha = alpha)
 
+		#replace first-order uncertainty with Monte Carlo uncertainty and
+		# store the draws, shape [nmc x n]
+		if nmc is not None:
+			self.BGE_mc = _bd_calc_bge_mc(
+				self.all_data['ugC_minL'],
+				self.sam_data['cell_ct'],
+				Cflux_err = self.all_data['Cflux_err'],
+				cell_counts_err = cell_counts_err,
+				alpha = alpha,
+				nmc = nmc,
+				seed = seed,
+				corr = corr)
+
+			self.BGE.loc[self.BGE.index[1:], 'err'] = \
+				np.std(self.BGE_mc[:, 1:], axis = 0)
+
 		return
 
+	#define function to calculate BGE for many scenarios
+	def calc_BGE_sweep(self, alpha, cell_counts_err = None):
+		'''
+		Function to calculate bacterial growth efficiency (BGE) for many
+		combinations of per-cell carbon mass and cell count uncertainty, *e.g.*
+		for sensitivity analysis. Requires that 'sam_data' contains column
+		called 'cell_ct'.
+
+		Parameters
+		----------
+		alpha : array-like
+			Array of shape [m x 2] containing the mass of carbon per cell and
+			associated uncertainty (+/- 1 sigma), in femtograms, for each of
+			`m` scenarios.
+
+		cell_counts_err : None, scalar, pd.Series, or list
+			Cell count uncertainty for each scenario, each entry being any
+			type accepted by ``calc_BGE``. If not a list, the same uncertainty
+			is used for all scenarios. Defaults to `None`.
+
+		Returns
+		-------
+		BGE : pd.DataFrame
+			Dataframe containing calculated BGE values and associated error
+			at each cell count timepoint. Columns are a ``pd.MultiIndex`` of
+			('mean' or 'err', scenario number).
+
+		Raises
+		------
+		AttributeError
+			If BioDecay object does not contain 'all_data' or 'sam_data'
+			attributes.
+
+		AttributeError
+			If BioDecay object 'sam_data' table does not contain a column
+			called 'cell_ct'.
+
+		Notes
+		-----
+		Unlike ``calc_BGE``, the result is returned rather than stored. The
+		carbon respired between cell counts is integrated only once for all
+		scenarios.
+		'''
+
+		#check that object has all_data and sam_data attributes
+		if not hasattr(self, 'all_data') or not hasattr(self, 'sam_data'):
+			raise AttributeError(
+				'bd object does not have "all_data" and/or "sam_data"' \
+				' attributes. Try importing from csv files.')
+
+		#check that sam_data has 'cell_ct' column
+		if 'cell_ct' not in self.sam_data.columns:
+			raise AttributeError(
+				'sam_data attribute in bd object does not contain "cell_ct"' \
+				' column. Double check inputted data')
+
+		#calculate BGE for all scenarios
+		BGE = _bd_calc_bge_sweep(
+			self.all_data['ugC_minL'],
+			self.sam_data['cell_ct'],
+			Cflux_err = self.all_data['Cflux_err'],
+			cell_counts_err = cell_counts_err,
+			alpha = alpha)
+
+		return BGE
+
 	#define method for inputting forward-modelled data
 	def forward_model(self, model, ratedata):
 		'''
@@ -8,28 +8,263 @@ from __future__ import(
 	)
 
 __docformat__ = 'restructuredtext en'
-__all__ = ['_bd_calc_bge',
+__all__ = ['_bd_all_files',
+			'_bd_bge_arrays',
+			'_bd_bge_integrate',
+			'_bd_calc_bge',
+			'_bd_calc_bge_mc',
+			'_bd_calc_bge_sweep',
 			'bd_calc_telapsed',
+			'_bd_cache_file',
+			'_bd_cache_load',
+			'_bd_cache_save',
 			'_bd_calc_ugCminL',
+			'_bd_calc_ugCminL_mc',
+			'_bd_cc_err',
 			'_bd_correct_baseline',
 			'_bd_correct_headspace',
 			'_bd_data_reduction',
 			'_bd_extract_profile',
+			'_bd_find_gaps',
+			'_bd_minute_frame',
+			'_bd_minute_init',
+			'_bd_minute_read',
+			'_bd_minute_read_file',
+			'_bd_roll_values',
 			'_bd_rolling',
 			'_rpo_extract_tg',
+			'_rpo_grid',
+			'_rpo_iter_chunks',
+			'_rpo_stream_tg',
+			'_rpo_tail_init',
+			'_rpo_tail_read',
+			'_rpo_tail_tg',
 			]
 
+import glob
+import io
+import json
+import hashlib
 import numpy as np
-import pandas as pd
-import scipy.signal as signal
+import os
 
-from scipy.interpolate import interp1d
+from .lazy_helper import(
+	_lazy_import,
+	)
+
+#import pandas and scipy.signal on first use
+pd = _lazy_import('pandas')
+signal = _lazy_import('scipy.signal')
 
 #import exceptions
 from .exceptions import(
 	FileError,
+	ScalarError,
+	StringError,
+	)
+
+#import helper functions
+from .io_helper import(
+	_ARCHIVE_VERSION,
+	_hash_input,
+	_load_archive,
+	_read_csv_fast,
+	_replace_file,
+	_save_archive,
+	_to_datetime_index,
+	)
+
+from .mc_helper import(
+	_mc_blocks,
+	_mc_draw,
+	_mc_rng,
+	)
+
+from .profiling_helper import(
+	_stage,
 	)
 
+#reduction parameters that do not change the reduced data
+_BD_CACHE_IGNORE = ['chunksize', 'rolling_engine']
+
+#define function to expand a list or glob pattern of all_data files
+def _bd_all_files(all_file):
+	'''
+	Expands an `all_data` file argument into a list of paths ordered by the
+	first timestamp in each file.
+
+	Parameters
+	----------
+	all_file : str, list, or pd.DataFrame
+		Path string, glob pattern (*e.g.* 'run/all_data_*.csv'), or list of
+		path strings. Dataframes are returned as `None`.
+
+	Returns
+	-------
+	files : None or list
+		List of paths, or `None` if `all_file` is a dataframe.
+
+	Raises
+	------
+	FileError
+		If `all_file` is a glob pattern that does not match any files.
+
+	FileError
+		If `all_file` is not str, list, or ``pd.DataFrame`` instance.
+	'''
+
+	if isinstance(all_file, pd.DataFrame):
+		return None
+
+	elif isinstance(all_file, (list, tuple)):
+		files = list(all_file)
+
+	elif isinstance(all_file, str):
+		if not any(c in all_file for c in '*?['):
+			return [all_file]
+
+		files = glob.glob(all_file)
+
+		if not files:
+			raise FileError(
+				'all_file pattern %r does not match any files' % all_file)
+
+	else:
+		raise FileError(
+			'all_file must be pd.DataFrame instance, path string, or list of'
+			' path strings')
+
+	#order by first timestamp, falling back to name for empty files
+	def first(f):
+		ind = pd.read_csv(f, index_col = 0, parse_dates = True, nrows = 1).index
+
+		return (ind[0] if len(ind) > 0 else pd.Timestamp.max, f)
+
+	return sorted(files, key = first)
+
+#define function to get the cache file for a biodecay data reduction
+def _bd_cache_file(cache_dir, all_file, sam_file, kw):
+	'''
+	Returns the path of the cached reduced data for a given set of input
+	files and reduction parameters.
+
+	Parameters
+	----------
+	cache_dir : str
+		Directory containing cached reductions. Created if it does not exist.
+
+	all_file : str, list, or pd.DataFrame
+		The `all_data` file(s) or dataframe.
+
+	sam_file : str or pd.DataFrame
+		The `sam_data` file or dataframe.
+
+	kw : dict
+		Keyword arguments passed to ``_bd_data_reduction``.
+
+	Returns
+	-------
+	file : str
+		Path of the cache file, which may not yet exist.
+
+	Notes
+	-----
+	The key is a hash of the contents of `all_file` and `sam_file`, the
+	reduction parameters (excluding those that only change how the
+	reduction is performed, *e.g.* `chunksize`), and the archive version.
+	Editing either input file or changing any parameter therefore results in
+	a new cache file rather than a stale result.
+	'''
+
+	params = {k: v for k, v in kw.items() if k not in _BD_CACHE_IGNORE}
+
+	files = _bd_all_files(all_file)
+
+	if files is not None:
+		all_hash = [_hash_input(f) for f in files]
+
+	else:
+		all_hash = _hash_input(all_file)
+
+	key = json.dumps({
+		'all_file': all_hash,
+		'sam_file': _hash_input(sam_file),
+		'params': params,
+		'version': _ARCHIVE_VERSION,
+		}, sort_keys = True, default = str)
+
+	if not os.path.isdir(cache_dir):
+		os.makedirs(cache_dir)
+
+	name = 'bd_' + hashlib.sha256(key.encode()).hexdigest()[:32] + '.npz'
+
+	return os.path.join(cache_dir, name)
+
+#define function to load cached biodecay reduced data
+def _bd_cache_load(file):
+	'''
+	Loads reduced `all_data` and `sam_data` dataframes from a cache file
+	written by ``_bd_cache_save``.
+
+	Parameters
+	----------
+	file : str
+		Path of the cache file.
+
+	Returns
+	-------
+	all_data : pd.DataFrame
+		Reduced `all_data` dataframe.
+
+	sam_data : pd.DataFrame
+		Reduced `sam_data` dataframe.
+	'''
+
+	_, attrs = _load_archive(file, mmap_mode = None)['reduction']
+
+	all_data = attrs['all_data']
+	sam_data = attrs['sam_data']
+
+	#restore the 1-minute frequency, which is not stored
+	all_data.index = pd.DatetimeIndex(all_data.index, freq = 'infer')
+
+	return all_data, sam_data
+
+#define function to save biodecay reduced data to a cache file
+def _bd_cache_save(file, all_data, sam_data):
+	'''
+	Saves reduced `all_data` and `sam_data` dataframes to an uncompressed
+	binary cache file, stored column by column.
+
+	Parameters
+	----------
+	file : str
+		Path of the cache file.
+
+	all_data : pd.DataFrame
+		Reduced `all_data` dataframe.
+
+	sam_data : pd.DataFrame
+		Reduced `sam_data` dataframe.
+
+	Notes
+	-----
+	The file is first written under a temporary name and then renamed so
+	that an interrupted write never leaves a partial cache file.
+	'''
+
+	class _Reduction(object):
+		pass
+
+	red = _Reduction()
+	red.all_data = all_data
+	red.sam_data = sam_data
+
+	tmp = _save_archive(file[:-len('.npz')] + '.tmp%d' % os.getpid(),
+		{'reduction': red})
+
+	_replace_file(tmp, file)
+
 #define function to calculate bacterial growth efficiency (BGE)
 def _bd_calc_bge(
 	Cflux,
@@ -44,7 +279,7 @@ def _bd_calc_bge(
 	Parameters
 	----------
 	Cflux : pd.Series
-		Series containing carbon flux in ugC min-1 L-1, with pd.DatetimeIndex 
+		Series containing carbon flux in ugC min-1 L-1, with pd.DatetimeIndex
 		as index.
 
 	cell_counts : pd.Series
@@ -64,13 +299,13 @@ def _bd_calc_bge(
 		uncertainty). Defaults to `None`.
 
 	alpha : list
-		List of mass of carbon per cell and associated uncertainty 
+		List of mass of carbon per cell and associated uncertainty
 		(+/- 1 sigma), in femtograms. Defaults to `[50, 1]`.
 
 	Returns
 	-------
 	BGE : pd.DataFrame
-		Dataframe containing calculated BGE values and associated error, 
+		Dataframe containing calculated BGE values and associated error,
 		reported at the final timepoint for a given value.
 
 	Raises
@@ -78,100 +313,362 @@ def _bd_calc_bge(
 	ValueError
 		If `cell_counts` timestamps are not contained in `Cflux` index.
 
+	See Also
+	--------
+	_bd_calc_bge_sweep
+		Calculates BGE for many `alpha` and `cell_counts_err` scenarios.
+
 	References
 	----------
 	PER CELL CARBON MASS REFERENCE? GET FROM NAGISSA!
 
 	'''
 
+	#calculate BGE for a single scenario
+	bge, bge_err, cc_inds = _bd_bge_arrays(
+		Cflux,
+		cell_counts,
+		Cflux_err,
+		[cell_counts_err],
+		[alpha])
+
+	#concatenate into dataframe
+	BGE = pd.DataFrame(
+		{'mean': bge[0], 'err': bge_err[0]},
+		index = cc_inds,
+		columns = ['mean','err'])
+
+	return BGE
+
+#define function to calculate BGE for many scenarios at once
+def _bd_calc_bge_sweep(
+	Cflux,
+	cell_counts,
+	Cflux_err = None,
+	cell_counts_err = None,
+	alpha = [[50, 1]]):
+	'''
+	Function to calculate bacterial growth efficiency (BGE) for many
+	combinations of per-cell carbon mass and cell count uncertainty in a
+	single call.
+
+	Parameters
+	----------
+	Cflux : pd.Series
+		Series containing carbon flux in ugC min-1 L-1, with pd.DatetimeIndex
+		as index.
+
+	cell_counts : pd.Series
+		Series containing cell counts at each sampling point (in units of
+		cells per mL), with pd.DatetimeIndex as index.
+
+	Cflux_err : None or pd.Series
+		Series containing Cflux uncertainty. If `None`, Cflux is assumed to
+		be known perfectly. Defaults to `None`.
+
+	cell_counts_err : None, scalar, pd.Series, or list
+		Cell count uncertainty for each scenario, each entry being any type
+		accepted by ``_bd_calc_bge``. If not a list, the same uncertainty is
+		used for all scenarios. Defaults to `None`.
+
+	alpha : array-like
+		Array of shape [m x 2] containing the mass of carbon per cell and
+		associated uncertainty (+/- 1 sigma), in femtograms, for each
+		scenario. Defaults to `[[50, 1]]`.
+
+	Returns
+	-------
+	BGE : pd.DataFrame
+		Dataframe containing calculated BGE values and associated error,
+		reported at the final timepoint for a given value. Columns are a
+		``pd.MultiIndex`` of ('mean' or 'err', scenario number).
+
+	Raises
+	------
+	ValueError
+		If `cell_counts` timestamps are not contained in `Cflux` index.
+
+	ValueError
+		If `alpha` and `cell_counts_err` contain different numbers of
+		scenarios and neither contains a single scenario.
+
+	Notes
+	-----
+	The carbon respired between cell counts does not depend on the scenario
+	and is integrated only once; each scenario then only requires array
+	operations on the (short) cell count arrays.
+	'''
+
+	#make a list of scenarios if a single uncertainty is given
+	if not isinstance(cell_counts_err, list):
+		cell_counts_err = [cell_counts_err]
+
+	bge, bge_err, cc_inds = _bd_bge_arrays(
+		Cflux,
+		cell_counts,
+		Cflux_err,
+		cell_counts_err,
+		alpha)
+
+	#concatenate into dataframe
+	m = bge.shape[0]
+
+	BGE = pd.DataFrame(
+		np.column_stack([bge.T, bge_err.T]),
+		index = cc_inds,
+		columns = pd.MultiIndex.from_product([['mean','err'], range(m)]))
+
+	return BGE
+
+#define function to calculate BGE arrays for one or more scenarios
+def _bd_bge_arrays(
+	Cflux,
+	cell_counts,
+	Cflux_err,
+	cell_counts_errs,
+	alphas):
+	'''
+	Calculates BGE and its uncertainty as arrays for one or more scenarios.
+	See ``_bd_calc_bge`` and ``_bd_calc_bge_sweep`` for parameters.
+
+	Returns
+	-------
+	bge : np.ndarray
+		Array of BGE values. Shape [m x n], where `m` is the number of
+		scenarios and `n` is the number of cell counts. The first column is
+		NaN (no carbon respired before the first cell count).
+
+	bge_err : np.ndarray
+		Array of BGE uncertainty. Shape [m x n].
+
+	cc_inds : pd.DatetimeIndex
+		Timestamps of the cell counts. Length `n`.
+
+	Raises
+	------
+	ValueError
+		If `cell_counts` timestamps are not contained in `Cflux` index.
+
+	ValueError
+		If `alphas` and `cell_counts_errs` contain different numbers of
+		scenarios and neither contains a single scenario.
+
+	Notes
+	-----
+	Flux is integrated between cell counts by differencing cumulative sums at
+	the cell count positions, found by index lookup, rather than by grouping
+	a back-filled fraction label. NaN fluxes are treated as zero, as in a
+	grouped sum.
+	'''
+
 	#only retain timepoints with cell count values
-	cell_counts.dropna(inplace = True)
-	
+	cell_counts = cell_counts.dropna()
+
 	#calcualte indices for cell count timepoints
 	cc_inds = cell_counts.index
+	cc = cell_counts.values.astype(float)
 
-	#check indices
-	if not all([a in Cflux.index for a in cc_inds]):
+	#integrate flux between cell counts
+	DcumC, DcumC_err = _bd_bge_integrate(Cflux, cc_inds, Cflux_err)
+
+	#make scenario arrays, shape [m x 1] for alpha and [m x n] for errors
+	alphas = np.atleast_2d(np.asarray(alphas, dtype = float))
+	a = alphas[:, 0:1]
+	a_err = alphas[:, 1:2]
+
+	cc_err = np.array([_bd_cc_err(e, cell_counts) for e in cell_counts_errs])
+
+	if len(a) != len(cc_err) and 1 not in [len(a), len(cc_err)]:
+		raise ValueError(
+			'alpha and cell_counts_err must contain the same number of' \
+			' scenarios, or a single scenario')
+
+	#calculate microbial biomass C difference in ug L-1 and uncertainty
+	Dcc = np.diff(cc)
+
+	DcellC = np.diff(a * cc * 1e-6, axis = 1)
+	DcellC_err = 1e-6 * ((Dcc * a_err)**2 + \
+		(a * cc_err[:, 1:])**2 )**0.5
+
+	#calculate fractions and associated error, first entry is NaN
+	x = DcumC[1:] / DcellC
+	x_err = ((DcumC_err[1:] / DcellC)**2 + \
+		(DcumC[1:] * DcellC_err / (DcellC**2) )**2)**0.5
+
+	#calculate BGE and error
+	nan = np.full((len(x), 1), np.nan)
+
+	bge = np.column_stack([nan, 1 / (1 + x)])
+	bge_err = np.column_stack([nan, x_err * (1 + x)**-2])
+
+	return bge, bge_err, cc_inds
+
+#define function to integrate carbon flux between cell counts
+def _bd_bge_integrate(Cflux, cc_inds, Cflux_err = None):
+	'''
+	Integrates carbon flux, and its uncertainty, between consecutive cell
+	count timepoints.
+
+	Parameters
+	----------
+	Cflux : pd.Series
+		Series containing carbon flux in ugC min-1 L-1, with pd.DatetimeIndex
+		as index.
+
+	cc_inds : pd.DatetimeIndex
+		Timestamps of the cell counts. Length `n`.
+
+	Cflux_err : None or pd.Series
+		Series containing Cflux uncertainty. Defaults to `None`.
+
+	Returns
+	-------
+	DcumC : np.ndarray
+		Carbon respired since the previous cell count, in ug L-1. The first
+		entry is NaN. Length `n`.
+
+	DcumC_err : np.ndarray
+		Uncertainty of `DcumC`, assuming independent flux errors. Length `n`.
+
+	Raises
+	------
+	ValueError
+		If `cc_inds` timestamps are not contained in `Cflux` index.
+	'''
+
+	#find positions and check indices
+	pos = Cflux.index.get_indexer(cc_inds)
+
+	if (pos < 0).any():
 		raise ValueError(
 			'cell_count timestamps not contained in Cflux index.' \
 			' Check timestamps!')
 
 	#if errors are NoneType, make arrays of zeros instead
 	if Cflux_err is None:
-		Cflux_err = pd.Series(
-			0,
-			index = Cflux.index
-			)
+		Cflux_err = np.zeros(len(Cflux))
 
-	if cell_counts_err is None:
-		cell_counts_err = pd.Series(
-			0,
-			index = cell_counts.index
-			)
+	else:
+		Cflux_err = Cflux_err.reindex(Cflux.index).values
 
-	#or if scalar, broadcast out to be a Series
-	elif type(cell_counts_err) in [int, float]:
-		cell_counts_err = cell_counts_err * cell_counts
+	#calculate timestep in minutes
+	Dt = np.gradient(Cflux.index) / pd.Timedelta(minutes = 1)
 
-	#calculate microbial biomass C in ug L-1 at each time point
-	cellC = alpha[0] * cell_counts * 1e-6
-	cellC_err = 1e-6 * ((cell_counts * alpha[1])**2 + \
-		(alpha[0] * cell_counts_err)**2 )**0.5
+	#integrate between cell counts as differences of cumulative sums
+	cumC = np.append(0, np.nancumsum(Cflux.values * Dt))
+	cumV = np.append(0, np.nancumsum((Cflux_err * Dt)**2))
 
-	#calculate difference and drop first entry (will be NaN)
-	DcellC = cellC.diff()[1:]
+	DcumC = np.append(np.nan, np.diff(cumC[pos + 1]))
+	DcumC_err = np.append(np.nan, np.diff(cumV[pos + 1]))**0.5
 
-	#calculate cellC difference uncertainty
-	Dcell_counts = cell_counts.diff()[1:]
-	DcellC_err = 1e-6 * ((Dcell_counts * alpha[1])**2 + \
-		(alpha[0] * cell_counts_err)**2 )**0.5
+	return DcumC, DcumC_err
 
-	#calculate timestep in minutes
-	Dt = np.gradient(Cflux.index) / pd.Timedelta(minutes = 1)
+#define function to draw BGE values
+def _bd_calc_bge_mc(
+	Cflux,
+	cell_counts,
+	Cflux_err = None,
+	cell_counts_err = None,
+	alpha = [50, 1],
+	nmc = 10000,
+	seed = None,
+	corr = 0):
+	'''
+	Propagates uncertainty in carbon flux, cell counts, and per-cell carbon
+	mass to bacterial growth efficiency (BGE) by Monte Carlo simulation.
 
-	#calculate fractions, broadcast onto Cflux index, and ffill
-	nfrac = len(cell_counts)
-	frac = pd.Series(np.arange(nfrac), cc_inds)
-	frac = frac.reindex(
-		index = Cflux.index
-		)
-	frac.fillna(
-		method = 'bfill', 
-		inplace = True
-		)
+	Parameters
+	----------
+	Cflux : pd.Series
+		Series containing carbon flux in ugC min-1 L-1, with pd.DatetimeIndex
+		as index.
 
-	#group by fraction
-	Cflux_grouped = (Cflux * Dt).groupby(frac)
-	Cflux_err_grouped = ((Cflux_err * Dt)**2).groupby(frac)
+	cell_counts : pd.Series
+		Series containing cell counts at each sampling point (in units of
+		cells per mL), with pd.DatetimeIndex as index.
 
-	#calculate grouped sum
-	DcumC_cc = Cflux_grouped.sum()
-	DcumC_cc.index = cc_inds #reset index to cc_inds
-	DcumC_cc[0] = np.nan #make first entry NaN (before first cell count)
+	Cflux_err : None or pd.Series
+		Series containing Cflux uncertainty. Defaults to `None`.
 
-	#calculate grouped error
-	DcumC_cc_err = Cflux_err_grouped.sum()**0.5
-	DcumC_cc_err.index = cc_inds #reset index to cc_inds
-	DcumC_cc_err[0] = np.nan #make first entry NaN (before first cell count)
+	cell_counts_err : None, scalar, or pd.Series
+		Cell count uncertainty, as in ``_bd_calc_bge``. Defaults to `None`.
 
-	#calculate fractions and associated error
-	x = DcumC_cc / DcellC
-	x_err = ((DcumC_cc_err / DcellC)**2 + \
-		(DcumC_cc * DcellC_err / (DcellC**2) )**2)**0.5
+	alpha : list
+		List of mass of carbon per cell and associated uncertainty
+		(+/- 1 sigma), in femtograms. Defaults to `[50, 1]`.
 
-	#calculate BGE and error
-	bge = 1 / (1 + x)
-	bge_err = x_err * (1 + x)**-2
+	nmc : int
+		Number of draws. Defaults to `10000`.
 
-	#concatenate into dataframe
-	BGE = pd.concat([bge, bge_err], 
-		axis = 1
-		)
+	seed : None or int
+		Seed for reproducible draws. Defaults to `None`.
 
-	#add column names
-	BGE.columns = ['mean','err']
+	corr : scalar
+		Correlation coefficient (0-1) between the errors of the cell counts
+		within each draw, *e.g.* due to a shared counting calibration.
+		Defaults to 0.
 
-	return BGE
+	Returns
+	-------
+	draws : np.ndarray
+		Array of BGE draws. Shape [nmc x n], where `n` is the number of cell
+		counts. The first column is NaN.
+
+	Raises
+	------
+	ValueError
+		If `cell_counts` timestamps are not contained in `Cflux` index.
+
+	Notes
+	-----
+	Cell counts are drawn with correlation `corr`, while a single per-cell
+	carbon mass is drawn for all cell counts within a draw, such that the
+	error in `alpha` is correlated between consecutive BGE values. Flux errors at each
+	timepoint are assumed independent, so the carbon respired between cell
+	counts is drawn directly from its integrated uncertainty.
+	'''
+
+	rng = _mc_rng(seed)
+
+	#only retain timepoints with cell count values
+	cell_counts = cell_counts.dropna()
+	cc = cell_counts.values.astype(float)
+	cc_err = _bd_cc_err(cell_counts_err, cell_counts)
+
+	#integrate flux between cell counts
+	DcumC, DcumC_err = _bd_bge_integrate(Cflux, cell_counts.index, Cflux_err)
+
+	#draw inputs, shape [nmc x n]
+	DcumC_mc = _mc_draw(rng, DcumC[1:], DcumC_err[1:], nmc)
+	cc_mc = _mc_draw(rng, cc, cc_err, nmc, corr = corr)
+	a_mc = _mc_draw(rng, alpha[0], alpha[1], nmc)
+
+	#calculate BGE for each draw
+	DcellC = np.diff(a_mc * cc_mc * 1e-6, axis = 1)
+	x = DcumC_mc / DcellC
+
+	nan = np.full((int(nmc), 1), np.nan)
+
+	return np.column_stack([nan, 1 / (1 + x)])
+
+#define function to make a cell count uncertainty array
+def _bd_cc_err(cell_counts_err, cell_counts):
+	'''
+	Converts a cell count uncertainty (None, fractional scalar, or series) to
+	an array with the same length as `cell_counts`.
+	'''
+
+	if cell_counts_err is None:
+		return np.zeros(len(cell_counts))
+
+	#if scalar, assumed to be fractional uncertainty
+	elif np.isscalar(cell_counts_err):
+		return cell_counts_err * cell_counts.values.astype(float)
+
+	elif isinstance(cell_counts_err, pd.Series):
+		return cell_counts_err.reindex(cell_counts.index).values.astype(float)
+
+	return np.asarray(cell_counts_err, dtype = float)
 
 #define function to calculate elapsed time
 def _bd_calc_telapsed(
@@ -332,8 +829,117 @@ def _bd_calc_ugCminL(
 
 	return Cflux, Cflux_err
 
-#define function to correct for baseline drift
-def _bd_correct_baseline(
+#define function to propagate carbon flux uncertainty by Monte Carlo
+def _bd_calc_ugCminL_mc(
+	input_data,
+	input_data_err,
+	flow_rate,
+	t_elapsed,
+	p_room,
+	T_room,
+	Vmedia,
+	Fsysblk = [10, 1],
+	Ctot_mano = None,
+	mano_error = 0.01,
+	nmc = 10000,
+	seed = None,
+	corr = 0,
+	blocksize = None):
+	'''
+	Propagates IRGA, system blank, and manometric uncertainty to carbon flux
+	by Monte Carlo simulation. See ``_bd_calc_ugCminL`` for the parameters
+	shared with that function.
+
+	Parameters
+	----------
+	nmc : int
+		Number of draws. Defaults to `10000`.
+
+	seed : None or int
+		Seed for reproducible draws. Defaults to `None`.
+
+	corr : scalar
+		Correlation coefficient (0-1) between the ppmCO2 errors at different
+		timepoints within each draw, *e.g.* due to a drifting IRGA
+		calibration. Defaults to 0.
+
+	blocksize : None or int
+		Number of draws to hold in memory at a time. If `None`, chosen such
+		that each block contains about 10^7 values. Defaults to `None`.
+
+	Returns
+	-------
+	Cflux_err : pd.Series
+		Series containing the standard deviation of the drawn carbon flux in
+		ugC min-1 L-1.
+
+	Notes
+	-----
+	Within each draw, ppmCO2 errors have correlation `corr` between
+	timepoints, while a single system blank flux and a single manometric
+	yield are drawn and applied to all timepoints. The photometric yield used for rescaling is
+	recalculated from each draw, so the correlation between the rescaling
+	factors and the flux at each timepoint is retained. First-order
+	propagation in ``_bd_calc_ugCminL`` instead adds the rescaling errors in
+	quadrature at each timepoint. Draws are made in blocks and only their
+	running sums are kept, so memory does not grow with `nmc`.
+	'''
+
+	rng = _mc_rng(seed)
+
+	#calculate multiplying scalar
+	R = 8.314e3 #mL*kPa/K/mol
+	Mco2 = 12.01 #g/mol
+	alpha = Mco2 / (R * (T_room + 273.15)) #ug/kPa/mL/ppm
+
+	k = np.asarray(alpha * p_room * flow_rate, dtype = float)
+	x = np.asarray(input_data, dtype = float)
+	x_err = np.asarray(input_data_err, dtype = float)
+	V = np.asarray(Vmedia, dtype = float)
+
+	Dt = np.gradient(input_data.index) / pd.Timedelta(minutes = 1)
+	days = np.asarray(t_elapsed)[-1] / (60 * 24) #since F in days
+
+	n = len(x)
+
+	if blocksize is None:
+		blocksize = 10**7 // max(n, 1)
+
+	#keep running sums of deviations from the undrawn flux
+	Cflux0 = 1000 * x * k / V
+	s1 = np.zeros(n)
+	s2 = np.zeros(n)
+
+	for b in _mc_blocks(nmc, blocksize):
+
+		#draw ppmCO2 and calculate flux and photometric yield
+		Cflux = _mc_draw(rng, x, x_err, b, corr = corr) * k
+		Ctot_photo = np.nansum(Cflux * Dt, axis = 1)[:, None]
+
+		#re-scale to remove system blank flux
+		if Fsysblk is not None:
+			Ctot_sysblk = _mc_draw(rng, Fsysblk[0], Fsysblk[1], b) * days
+			Cflux = Cflux * (Ctot_photo - Ctot_sysblk) / Ctot_photo
+
+		#re-scale to match manometric yield
+		if Ctot_mano is not None:
+			Ctot_mano_mc = _mc_draw(rng, Ctot_mano, Ctot_mano*mano_error, b)
+			Cflux = Cflux * Ctot_mano_mc / Ctot_photo
+
+		#re-scale for volume remaining at each time point
+		d = 1000 * Cflux / V - Cflux0
+
+		s1 += np.sum(d, axis = 0)
+		s2 += np.sum(d**2, axis = 0)
+
+	Cflux_err = pd.Series(
+		np.sqrt(np.maximum(s2/nmc - (s1/nmc)**2, 0)),
+		index = input_data.index)
+
+	return Cflux_err
+
+#define function to correct for baseline drift
+def _bd_correct_baseline(
 	input_data,
 	baselines,
 	IRGA_error = 1):
@@ -430,7 +1036,8 @@ def _bd_correct_headspace(
 	flow_rate,
 	samples,
 	Vmedia0 = 2000,
-	Vhs0 = 4000):
+	Vhs0 = 4000,
+	rolling_engine = 'pandas'):
 	'''
 	Function to correct biodecay ppmCO2 values for headspace averaging and
 	volume changes due to liquid sub-sampling.
@@ -455,6 +1062,10 @@ def _bd_correct_headspace(
 	Vhs0 : scalar
 		Initial headspace volume for experiment, in mL. Defaults to 4000.
 
+	rolling_engine : str
+		Engine used to smooth the ppmCO2 derivative, either 'pandas' or
+		'numpy'. See ``_bd_rolling``. Defaults to 'pandas'.
+
 	Returns
 	-------
 	hs_corr : pd.Series
@@ -506,10 +1117,11 @@ def _bd_correct_headspace(
 		dCdt_vals, 
 		index = input_data.index)
 
-	dCdt = _bd_rolling(dCdt, 
+	dCdt = _bd_rolling(dCdt,
 		window = 100,
 		center = True,
-		calc = 'mean')
+		calc = 'mean',
+		engine = rolling_engine)
 
 	# finally, correct for headspace averaging using first-order, linear ODE
 	hs_corr = (Vhs/flow_rate) * dCdt + input_data
@@ -517,6 +1129,7 @@ def _bd_correct_headspace(
 	return hs_corr, Vmedia
 
 #define function to input biodecay data and perform reduction calculations
+@_stage('ingest')
 def _bd_data_reduction(
 	all_file,
 	sam_file,
@@ -527,16 +1140,24 @@ def _bd_data_reduction(
 	downsampled_dt = None,
 	Ctot_mano = None,
 	IRGA_error = 1.0,
-	mano_error = 0.01):
+	mano_error = 0.01,
+	chunksize = None,
+	reader = None,
+	rolling_engine = 'pandas',
+	nmc = None,
+	seed = None,
+	corr = 0,
+	max_gap = None):
 	'''
 	Inputs `all_data` file file from IsoCaRB instrument at Harvard and
 	performs all necessary data corrections and checks.
 
 	Parameters
 	----------
-	all_file : str or pd.DataFrame
+	all_file : str, list, or pd.DataFrame
 		File containing timeseries data, either as a path string or a
-		dataframe.
+		dataframe. Experiments logged across several files can be passed as
+		a list of path strings or a glob pattern; see ``_bd_minute_read``.
 
 	sam_file : str or pd.DataFrame
 		File containing sampling data (baseline checks, liquid subsampling
@@ -578,6 +1199,39 @@ def _bd_data_reduction(
 		of total mass (i.e. a value of 0.01 means 1% relative uncertainty).
 		Defualts to `0.01`.
 
+	chunksize : None or int
+		If not `None` and `all_file` is a path string, reads `all_file` this
+		many rows at a time, resampling each block to 1-minute medians before
+		reading the next so that the raw high-frequency log is never held in
+		memory. Defaults to `None`.
+
+	reader : None or dict
+		Reader state created by ``_bd_minute_init``. If not `None`, only rows
+		appended to the file since the previous call are read, and
+		`all_file` is ignored. `reader` is updated in place. Defaults to
+		`None`.
+
+	rolling_engine : str
+		Engine used for rolling medians and means, either 'pandas' or
+		'numpy'. See ``_bd_rolling``. Defaults to 'pandas'.
+
+	nmc : None or int
+		If not `None`, the number of Monte Carlo draws used to calculate the
+		carbon flux uncertainty (see ``_bd_calc_ugCminL_mc``) instead of
+		first-order error propagation. Defaults to `None`.
+
+	seed : None or int
+		Seed for reproducible Monte Carlo draws. Defaults to `None`.
+
+	corr : scalar
+		Correlation coefficient (0-1) between the Monte Carlo ppmCO2 errors
+		at different timepoints. Only used if `nmc` is not `None`. Defaults
+		to 0.
+
+	max_gap : None or int
+		Longest run of minutes without data, *e.g.* between consecutive log
+		files, that is filled by linear interpolation. If `None`, all gaps
+		are interpolated. Defaults to `None`.
 
 	Returns
 	-------
@@ -593,11 +1247,14 @@ def _bd_data_reduction(
 	Raises
 	------
 	FileError
-		If `all_file` is not str or ``pd.DataFrame`` instance.
+		If `all_file` is not str, list, or ``pd.DataFrame`` instance.
 
 	FileError
 		If `sam_file` is not str or ``pd.DataFrame`` instance.
 
+	FileError
+		If `all_file` contains a gap longer than `max_gap` minutes.
+
 	FileError
 		If index of `all_file` is not ``pd.DatetimeIndex`` instance.
 
@@ -642,9 +1299,27 @@ def _bd_data_reduction(
 	'''
 
 	#check all_file data format and raise appropriate errors
-	
+
+	#make a reader if chunked reading or several files are requested
+	if reader is None and not isinstance(all_file, pd.DataFrame):
+		files = _bd_all_files(all_file)
+
+		if chunksize is not None or len(files) > 1:
+			reader = _bd_minute_init(files)
+
+		else:
+			all_file = files[0]
+
 	#all_file format
-	if isinstance(all_file, str):
+	if reader is not None:
+		#read new rows and get 1-minute medians
+		_bd_minute_read(
+			reader,
+			chunksize = chunksize if chunksize is not None else 10000)
+
+		all_data = _bd_minute_frame(reader)
+
+	elif isinstance(all_file, str):
 		#import as dataframe
 		all_data = pd.read_csv(
 			all_file,
@@ -715,11 +1390,23 @@ def _bd_data_reduction(
 	#---------------------------------------------------#
 
 	#because seconds might have gotten dropped during import, downsample to
-	# once per minute by averaging over all points in a given minute
-	all_data = all_data.resample(
-		'1T'
-		).median()
-	
+	# once per minute by averaging over all points in a given minute (already
+	# done block-by-block if using a reader)
+	if reader is None:
+		all_data = all_data.resample(
+			'1T'
+			).median()
+
+	#check for gaps that are too long to interpolate
+	if max_gap is not None:
+		gaps = _bd_find_gaps(all_data, max_gap)
+
+		if gaps:
+			raise FileError(
+				'all_file contains %d gap(s) longer than %r minutes, the'
+				' first from %s to %s' % (len(gaps), max_gap, gaps[0][0],
+				gaps[0][1]))
+
 	all_data.interpolate(
 		method = 'linear', 
 		inplace = True
@@ -739,7 +1426,8 @@ def _bd_data_reduction(
 		all_data['CO2_scaled'],
 		window = 10,
 		center = True,
-		calc = 'median'
+		calc = 'median',
+		engine = rolling_engine
 		)
 
 	#--------------------------#
@@ -761,7 +1449,8 @@ def _bd_data_reduction(
 		all_data['flow_rate'],
 		sam_data['liq_sample'],
 		Vmedia0 = Vmedia0,
-		Vhs0 = Vhs0
+		Vhs0 = Vhs0,
+		rolling_engine = rolling_engine
 		)
 
 	#-----------------------------------------------------------#
@@ -781,6 +1470,24 @@ def _bd_data_reduction(
 		mano_error = mano_error
 		)
 
+	#replace first-order uncertainty with Monte Carlo uncertainty
+	if nmc is not None:
+		all_data['Cflux_err'] = _bd_calc_ugCminL_mc(
+			all_data['CO2_nohs'],
+			all_data['CO2_err'],
+			all_data['flow_rate'],
+			all_data['t_elapsed'],
+			all_data['p_room'],
+			all_data['temp'],
+			Vmedia,
+			Fsysblk = Fsysblk,
+			Ctot_mano = Ctot_mano,
+			mano_error = mano_error,
+			nmc = nmc,
+			seed = seed,
+			corr = corr
+			)
+
 	#---------------#
 	# 5) DOWNSAMPLE #
 	#---------------#
@@ -849,6 +1556,9 @@ def _bd_extract_profile(
 
 	'''
 
+	#import scipy on first use
+	from scipy.interpolate import interp1d
+
 	#check data format and raise appropriate errors
 	if not isinstance(all_data, pd.DataFrame):
 		raise FileError(
@@ -924,12 +1634,429 @@ def _bd_extract_profile(
 
 	return g, t, T
 
+#define function to find gaps in 1-minute data
+def _bd_find_gaps(all_data, max_gap = 1):
+	'''
+	Finds runs of consecutive 1-minute rows without CO2 data.
+
+	Parameters
+	----------
+	all_data : pd.DataFrame
+		Dataframe of 1-minute medians containing a "CO2_scaled" column, with
+		a row for every minute.
+
+	max_gap : int
+		Only runs longer than this many minutes are returned. Defaults to 1.
+
+	Returns
+	-------
+	gaps : list
+		List of (first missing timestamp, last missing timestamp) tuples.
+	'''
+
+	#find starts and ends of runs of missing rows
+	miss = np.append(0, np.append(
+		all_data['CO2_scaled'].isnull().values.astype(int), 0))
+	d = np.diff(miss)
+
+	i0 = np.where(d == 1)[0]
+	i1 = np.where(d == -1)[0]
+
+	ind = all_data.index
+
+	return [(ind[a], ind[b - 1]) for a, b in zip(i0, i1) if b - a > max_gap]
+
+#define function to get 1-minute medians from a reader
+def _bd_minute_frame(reader):
+	'''
+	Returns the 1-minute medians of all rows read so far by a reader,
+	including the most recent (possibly incomplete) minute.
+
+	Parameters
+	----------
+	reader : dict
+		Reader state created by ``_bd_minute_init`` and updated by
+		``_bd_minute_read``.
+
+	Returns
+	-------
+	all_data : pd.DataFrame
+		Dataframe of 1-minute medians, with a row for every minute (minutes
+		without data contain NaN), identical to resampling the entire file.
+	'''
+
+	frames = [reader['minutes']]
+
+	if reader['carry'] is not None and len(reader['carry']) > 0:
+		frames.append(reader['carry'].resample('1T').median())
+
+	frames = [f for f in frames if f is not None]
+
+	if not frames:
+		raise FileError(
+			'all_file does not contain any rows')
+
+	#concatenate and restore rows for minutes without data
+	all_data = pd.concat(frames)
+
+	return all_data.asfreq('1T')
+
+#define function to initialize a reader for chunked IsoCaRB reduction
+def _bd_minute_init(all_file):
+	'''
+	Initializes the state used to read one or more IsoCaRB `all_data` files
+	in blocks of rows, resampling each block to 1-minute medians.
+
+	Parameters
+	----------
+	all_file : str or list
+		Path to the `all_data` file, or list of paths to consecutive files.
+
+	Returns
+	-------
+	reader : dict
+		Dictionary containing the files, the index and byte offset of the
+		first unread line, the header, the raw rows of the most recent
+		(possibly incomplete) minute, and the 1-minute medians of all
+		complete minutes read so far.
+
+	Raises
+	------
+	FileError
+		If `all_file` is not a path string or a list of path strings.
+	'''
+
+	if isinstance(all_file, str):
+		all_file = [all_file]
+
+	if not isinstance(all_file, (list, tuple)) or not all_file or \
+		not all([isinstance(f, str) for f in all_file]):
+		raise FileError(
+			'all_file must be a path string or list of path strings when'
+			' reading in chunks')
+
+	reader = {
+		'files': list(all_file),
+		'ifile': 0,
+		'file': all_file[0],
+		'offset': 0,
+		'header': None,
+		'carry': None,
+		'minutes': None,
+		'tmax': None,
+		'cutoff': None,
+		}
+
+	return reader
+
+#define function to read new rows into a reader
+def _bd_minute_read(reader, chunksize = 10000):
+	'''
+	Reads all complete lines appended to the file(s) since the last call,
+	`chunksize` lines at a time, and resamples them to 1-minute medians.
+
+	Parameters
+	----------
+	reader : dict
+		Reader state created by ``_bd_minute_init``. Updated in place.
+
+	chunksize : int
+		The number of rows to parse at a time. Defaults to `10000`.
+
+	Returns
+	-------
+	n : int
+		Number of new rows read.
+
+	Raises
+	------
+	FileError
+		If index of `all_file` is not ``pd.DatetimeIndex`` instance.
+
+	FileError
+		If `all_file` does not contain "temp", "p_room", "CO2_scaled", and
+		"flow_rate" columns.
+
+	Notes
+	-----
+	Raw rows belonging to the most recent minute are carried over to the
+	next block (or next call) so that every 1-minute median is calculated
+	from all of the rows in that minute, exactly as when resampling the
+	entire file at once. A partially written final line of the last file is
+	left unread until it is completed.
+
+	Files are read in order as one continuous log. Rows of a file that are
+	not later than the last row of the preceding files (*i.e.* overlapping
+	records) are dropped, keeping the first. Only the last file is followed
+	as it grows.
+	'''
+
+	n = 0
+
+	while True:
+		last = reader['ifile'] == len(reader['files']) - 1
+		n += _bd_minute_read_file(reader, chunksize, final = not last)
+
+		if last:
+			break
+
+		#move on to the next file, dropping rows that overlap
+		reader['ifile'] += 1
+		reader['file'] = reader['files'][reader['ifile']]
+		reader['offset'] = 0
+		reader['header'] = None
+		reader['cutoff'] = reader['tmax']
+
+	return n
+
+#define function to read new rows of the current file into a reader
+def _bd_minute_read_file(reader, chunksize = 10000, final = False):
+	'''
+	Reads new rows of the current file of a reader. See ``_bd_minute_read``.
+
+	Parameters
+	----------
+	final : boolean
+		If `True`, the file is complete and a final line without a newline
+		is also read. Defaults to `False`.
+	'''
+
+	ad_cols = ['temp','p_room','CO2_scaled','flow_rate']
+	n = 0
+
+	with open(reader['file'], 'rb') as f:
+		f.seek(reader['offset'])
+
+		#store header on first read
+		if reader['header'] is None:
+			header = f.readline()
+
+			if not header.endswith(b'\n') and not final:
+				return 0
+
+			reader['header'] = header
+			reader['offset'] = f.tell()
+
+		while True:
+
+			#read up to chunksize complete lines
+			lines = []
+
+			for line in f:
+				if not line.endswith(b'\n'):
+					if not final:
+						break
+
+					line = line + b'\n'
+
+				lines.append(line)
+
+				if len(lines) >= chunksize:
+					break
+
+			if not lines:
+				break
+
+			reader['offset'] += sum(len(l) for l in lines)
+			n += len(lines)
+
+			#parse block
+			chunk = pd.read_csv(
+				io.BytesIO(reader['header'] + b''.join(lines)),
+				index_col = 0,
+				parse_dates = True)
+
+			if not isinstance(chunk.index, pd.DatetimeIndex):
+				raise FileError(
+					'all_file index (first column of csv file) must be' \
+					' in date_time format (pd.DatetimeIndex instance)'
+					)
+
+			elif not all([a in chunk.columns for a in ad_cols]):
+				raise FileError(
+					'all_file must contain columns: %r' % ad_cols
+					)
+
+			#drop rows already read from preceding files
+			if reader['cutoff'] is not None:
+				chunk = chunk[chunk.index > reader['cutoff']]
+
+			if len(chunk) == 0:
+				continue
+
+			if reader['tmax'] is None or chunk.index[-1] > reader['tmax']:
+				reader['tmax'] = chunk.index[-1]
+
+			#add rows carried over from the previous block
+			if reader['carry'] is not None:
+				chunk = pd.concat([reader['carry'], chunk])
+
+			#carry rows in the final minute, resample the rest
+			last = chunk.index[-1].floor('T')
+			done = chunk.index < last
+
+			reader['carry'] = chunk[~done]
+
+			if done.any():
+				minutes = chunk[done].resample('1T').median()
+
+				if reader['minutes'] is None:
+					reader['minutes'] = minutes
+
+				else:
+					reader['minutes'] = pd.concat(
+						[reader['minutes'], minutes])
+
+	return n
+
+#define function to calculate rolling values on arrays
+def _bd_roll_values(
+	values,
+	index = None,
+	window = 10,
+	center = True,
+	calc = 'median',
+	blocksize = 100000):
+	'''
+	Calculates rolling means, medians, or sums directly on numpy arrays,
+	matching the results of ``pd.Series.rolling``.
+
+	Parameters
+	----------
+	values : array-like
+		Array of values to be rolled. Length `n`.
+
+	index : None or pd.DatetimeIndex
+		Timestamps of each value, only used if `window` is a time width.
+		Defaults to `None`.
+
+	window : int, str, or pd.Timedelta
+		Number of timesteps, or time width (*e.g.* '10min'), of the window.
+		Defaults to 10.
+
+	center : boolean
+		Tells the funciton whether or not to center the rolling values.
+		Defaults to `True`.
+
+	calc : str
+		Type of rolling value to take. Either 'mean', 'median', or 'sum'.
+		Defaults to 'median'.
+
+	blocksize : int
+		Number of count-based rolling medians to calculate at a time,
+		limiting memory use to `blocksize` x `window` values. Defaults to
+		100000.
+
+	Returns
+	-------
+	rolled : np.ndarray
+		Array of rolled values, length `n`. Values without a complete window
+		(count-based windows) or without any data (time-based windows) are
+		NaN.
+
+	Raises
+	------
+	ValueError
+		If `window` is a time width and `index` is not a
+		``pd.DatetimeIndex``.
+
+	Notes
+	-----
+	Means and sums are calculated from differences of cumulative sums in
+	O(n). Count-based medians are calculated by sorting blocks of a strided
+	view of the data, which for short windows (*e.g.* the 10-minute spike
+	filter) is faster than the skiplist used by pandas. Time-based medians
+	are calculated on each window slice.
+
+	As in pandas, count-based windows require all `window` values to be
+	non-NaN, while time-based windows ignore NaNs and include values with
+	times in (t - width, t], or (t - width/2, t + width/2] if centered.
+	'''
+
+	x = np.asarray(values, dtype = float)
+	n = len(x)
+
+	rolled = np.full(n, np.nan)
+
+	#count non-NaN values and sum them using cumulative sums
+	isval = ~np.isnan(x)
+	cnt = np.zeros(n + 1, dtype = np.int64)
+	np.cumsum(isval, out = cnt[1:])
+
+	if calc in ['mean', 'sum']:
+		csum = np.zeros(n + 1)
+		np.cumsum(np.where(isval, x, 0), out = csum[1:])
+
+	if isinstance(window, (int, np.integer)):
+		w = int(window)
+
+		if n < w:
+			return rolled
+
+		#calculate for each complete window, then shift into position
+		off = w//2 if center else w - 1
+		full = (cnt[w:] - cnt[:-w]) == w
+
+		if calc in ['mean', 'sum']:
+			r = csum[w:] - csum[:-w]
+
+			if calc == 'mean':
+				r = r/w
+
+		else:
+			#median over sorted blocks of a strided view of the data
+			view = np.lib.stride_tricks.sliding_window_view(x, w)
+			r = np.empty(n - w + 1)
+
+			for b in range(0, n - w + 1, blocksize):
+				srt = np.sort(view[b:b + blocksize], axis = 1)
+				r[b:b + blocksize] = 0.5*(srt[:,(w - 1)//2] + srt[:,w//2])
+
+		rolled[off:off + n - w + 1] = np.where(full, r, np.nan)
+
+		return rolled
+
+	#find first (inclusive) and last (exclusive) position of each time window
+	if not isinstance(index, pd.DatetimeIndex):
+		raise ValueError(
+			'time-based windows require a pd.DatetimeIndex')
+
+	ns = index.values.astype('datetime64[ns]').astype(np.int64)
+	width = pd.Timedelta(window).value
+
+	if center:
+		lo = np.searchsorted(ns, ns - width/2, side = 'right')
+		hi = np.searchsorted(ns, ns + width/2, side = 'right')
+
+	else:
+		lo = np.searchsorted(ns, ns - width, side = 'right')
+		hi = np.arange(1, n + 1)
+
+	count = cnt[hi] - cnt[lo]
+	valid = count > 0
+
+	if calc in ['mean', 'sum']:
+		r = csum[hi] - csum[lo]
+
+		if calc == 'mean':
+			r = r/np.where(valid, count, 1)
+
+		rolled[valid] = r[valid]
+
+	else:
+		#median over each time-based window slice
+		for i in np.where(valid)[0]:
+			rolled[i] = np.nanmedian(x[lo[i]:hi[i]])
+
+	return rolled
+
 #define function to calculate rolling values
 def _bd_rolling(
 	input_data,
 	window = 10,
 	center = True,
-	calc = 'median'):
+	calc = 'median',
+	engine = 'pandas'):
 	'''
 	Function to calculate rolling values (means, medians, etc.) for biodecay
 	experiment.
@@ -939,9 +2066,11 @@ def _bd_rolling(
 	input_data : pd.Series
 		Series containing a ppmCO2 array to be rolled.
 
-	window : int
-		Number of timesteps to integrate over for rolling values. Devaults to
-		10.
+	window : int, str, or pd.Timedelta
+		Number of timesteps to integrate over for rolling values. If a str
+		(*e.g.* '10min') or ``pd.Timedelta``, the time width of the window,
+		which requires `input_data` to have a ``pd.DatetimeIndex``. Devaults
+		to 10.
 
 	center : boolean
 		Tells the funciton whether or not to center the rolling values.
@@ -951,6 +2080,11 @@ def _bd_rolling(
 		Type of rolling value to take. Either 'mean', 'median', or 'sum'.
 		Defaults to 'median'.
 
+	engine : str
+		Either 'pandas', which uses ``pd.Series.rolling``, or 'numpy', which
+		uses ``_bd_roll_values``. Both give the same result. Defaults to
+		'pandas'.
+
 	Returns
 	-------
 	rolled : pd.Series
@@ -961,11 +2095,15 @@ def _bd_rolling(
 	ValueError
 		If `calc` is not one of 'mean', 'median', or 'sum'.
 
+	ValueError
+		If `engine` is not one of 'pandas' or 'numpy'.
+
 	Notes
 	-----
-	`window` is the window width *not* the time width. If `input_data`
-	contains uneven timesteps, then `window` will not be a constant size in
-	time. (termed "ragged" in pandas notation.)
+	If `window` is an int, it is the window width *not* the time width. If
+	`input_data` contains uneven timesteps, then `window` will not be a
+	constant size in time. (termed "ragged" in pandas notation.) For ragged
+	data, pass a time width instead.
 	'''
 
 	#raise errors
@@ -973,14 +2111,31 @@ def _bd_rolling(
 		raise ValueError(
 			'calc: %r not recognized. Must be mean, median, or sum' % calc)
 
-	#calculate rolling
-	roll = input_data.rolling(
-		window = window,
-		center = center,
-		)
+	if engine == 'numpy':
+		#execute rolling on underlying arrays
+		rolled = pd.Series(
+			_bd_roll_values(
+				input_data.values,
+				input_data.index,
+				window = window,
+				center = center,
+				calc = calc),
+			index = input_data.index,
+			name = input_data.name)
+
+	elif engine == 'pandas':
+		#calculate rolling
+		roll = input_data.rolling(
+			window = window,
+			center = center,
+			)
+
+		#execute rolling
+		rolled = getattr(roll, calc)()
 
-	#execute rolling
-	rolled = getattr(roll, calc)()
+	else:
+		raise ValueError(
+			'engine: %r not recognized. Must be pandas or numpy' % engine)
 
 	#forward- and back-fill nans
 	rolled = rolled.fillna(
@@ -994,10 +2149,16 @@ def _bd_rolling(
 	return rolled
 
 #define function to extract variables from .csv file
+@_stage('ingest')
 def _rpo_extract_tg(
 	file, 
 	nt, 
-	bl_subtract = True):
+	bl_subtract = True,
+	chunksize = None,
+	engine = None,
+	date_format = '%I:%M:%S %p',
+	grid = 'uniform',
+	mix = 0.25):
 	'''
 	Extracts time, temperature, and carbon remaining vectors from `all_data`
 	file generated by NOSAMS RPO LabView program.
@@ -1017,11 +2178,38 @@ def _rpo_extract_tg(
 		Treats baseline as linear from the average of the first 100 points in
 		CO2 to the average of the last 100 points in CO2. Defaults to`True`.
 
-	Returns
-	-------
-	g : np.ndarray
-		Array of the true fraction of carbon remaining at each timepoint.
-		Length `nt`.
+	chunksize : None or int
+		If not `None`, the number of rows to read at a time using the
+		streaming reduction in ``_rpo_stream_tg``, which integrates CO2 on
+		the native timestamps instead of upsampling to a 1-second grid.
+		Defaults to `None`.
+
+	engine : None or str
+		If not `None`, reads `file` in fast mode using the given parser
+		engine ('c' or 'pyarrow'), only parsing the "CO2_scaled" and "temp"
+		columns as floats and parsing timestamps with `date_format`. Falls
+		back to the default reader if `file` has an unexpected layout.
+		Defaults to `None`.
+
+	date_format : str
+		``strftime`` format of the timestamps, only used if `engine` is not
+		`None`. Defaults to '%I:%M:%S %p' (*i.e.* hh:mm:ss AM/PM).
+
+	grid : str
+		How to place the `nt` time points. 'uniform' uses evenly spaced
+		points, 'carbon' places points by cumulative carbon evolved, and
+		'curvature' places points by the curvature of `g`. See
+		``_rpo_grid``. Defaults to 'uniform'.
+
+	mix : float
+		Fraction (0-1) of the point density that is evenly spaced when `grid`
+		is not 'uniform'. Defaults to 0.25.
+
+	Returns
+	-------
+	g : np.ndarray
+		Array of the true fraction of carbon remaining at each timepoint.
+		Length `nt`.
 	
 	t : np.ndarray
 		Array of time, in seconds. Length `nt`.
@@ -1040,6 +2228,9 @@ def _rpo_extract_tg(
 	FileError
 		If `file` does not contain "CO2_scaled" and "temp" columns.
 
+	StringError
+		If `grid` is not 'uniform', 'carbon', or 'curvature'.
+
 	Notes
 	-----
 	Noisy data, especially at the beginning of the run, could lead to `g`
@@ -1049,8 +2240,42 @@ def _rpo_extract_tg(
 
 	'''
 
+	#import scipy on first use
+	from scipy.interpolate import interp1d
+
+	#check grid string
+	if grid not in ['uniform', 'carbon', 'curvature']:
+		raise StringError(
+			'grid must be "uniform", "carbon", or "curvature"')
+
+	#use the streaming reduction if chunked reading is requested
+	if chunksize is not None:
+		g, t, T = _rpo_stream_tg(
+			file,
+			nt if grid == 'uniform' else 10*nt,
+			bl_subtract = bl_subtract,
+			chunksize = chunksize,
+			engine = engine,
+			date_format = date_format)
+
+		if grid == 'uniform':
+			return g, t, T
+
+		#place adaptive points using the finely resolved thermogram
+		ta = _rpo_grid(t, 1 - g, nt, grid = grid, mix = mix)
+
+		return np.interp(ta, t, g), ta, np.interp(ta, t, T)
+
 	#check data format and raise appropriate errors
-	if isinstance(file, str):
+	if isinstance(file, str) and engine is not None:
+		#import only necessary columns as dataframe
+		file = _read_csv_fast(
+			file,
+			['CO2_scaled','temp'],
+			date_format = date_format,
+			engine = engine)
+
+	elif isinstance(file, str):
 		#import as dataframe
 		file = pd.read_csv(
 			file,
@@ -1115,14 +2340,18 @@ def _rpo_extract_tg(
 	alpha[alpha < 0.0] = 0.0
 
 	#generate t array
-	t0 = secs[0]; tf = secs[-1]
-	dt = (tf-t0)/nt
+	if grid == 'uniform':
+		t0 = secs[0]; tf = secs[-1]
+		dt = (tf-t0)/nt
 
-	#make downsampled points at midpoint
-	t = np.linspace(t0, tf, nt + 1) + dt/2 
-	
-	#drop last point since it's beyond tf
-	t = t[:-1] 
+		#make downsampled points at midpoint
+		t = np.linspace(t0, tf, nt + 1) + dt/2 
+
+		#drop last point since it's beyond tf
+		t = t[:-1] 
+
+	else:
+		t = _rpo_grid(secs, alpha, nt, grid = grid, mix = mix)
 
 	#generate functions to down-sample
 	fT = interp1d(secs, Temp)
@@ -1133,3 +2362,636 @@ def _rpo_extract_tg(
 	g = 1-fg(t)
 
 	return g, t, T
+
+
+#define function to place adaptive time points
+def _rpo_grid(secs, alpha, nt, grid = 'carbon', mix = 0.25):
+	'''
+	Places `nt` non-uniformly spaced time points such that point density is
+	highest where carbon evolves (or where the thermogram curves) fastest.
+
+	Parameters
+	----------
+	secs : np.ndarray
+		Finely resolved, evenly spaced array of time, in seconds.
+
+	alpha : np.ndarray
+		Fraction of carbon evolved at each point in `secs`.
+
+	nt : int
+		The number of time points to place.
+
+	grid : str
+		Either 'carbon', in which point density is proportional to the rate
+		of carbon evolution, or 'curvature', in which point density is
+		proportional to the square root of the curvature of `alpha`.
+		Defaults to 'carbon'.
+
+	mix : float
+		Fraction (0-1) of the point density that is evenly spaced, ensuring
+		that regions with little carbon evolution are not left empty.
+		Defaults to 0.25.
+
+	Returns
+	-------
+	t : np.ndarray
+		Strictly increasing array of time points, in seconds. Length `nt`.
+
+	Raises
+	------
+	ScalarError
+		If `mix` is not between 0 and 1.
+
+	StringError
+		If `grid` is not 'carbon' or 'curvature'.
+
+	Notes
+	-----
+	Points are placed at the midpoints of `nt` bins of equal cumulative
+	density, so 'carbon' bins each contain roughly the same amount of carbon.
+	The square root of the curvature minimizes the error of linearly
+	interpolating `g` between points. Rates are smoothed over a window of
+	``len(secs)/nt`` points before calculating curvature.
+	'''
+
+	#check inputs
+	if not 0 <= mix <= 1:
+		raise ScalarError(
+			'mix must be between 0 and 1')
+
+	nt = int(nt)
+	x = (secs - secs[0])/(secs[-1] - secs[0])
+
+	#calculate cumulative point density
+	if grid == 'carbon':
+		W = np.maximum.accumulate(np.clip(alpha, 0, 1))
+
+	elif grid == 'curvature':
+		#smooth rate before taking derivative to avoid fitting noise
+		w = max(1, len(secs)//nt)
+		k = np.ones(w)/w
+
+		r = np.convolve(np.gradient(alpha, secs), k, mode = 'same')
+		c = np.convolve(np.abs(np.gradient(r, secs))**0.5, k, mode = 'same')
+
+		W = np.append(0, np.cumsum(0.5*(c[1:] + c[:-1])*np.diff(secs)))
+
+	else:
+		raise StringError(
+			'grid must be "carbon" or "curvature"')
+
+	W = W - W[0]
+
+	if W[-1] > 0:
+		W = W/W[-1]
+
+	#mix with uniform density, keeping W strictly increasing
+	W = mix*x + (1 - mix)*W + 1e-12*x
+	W = W/W[-1]
+
+	#place points at the midpoint of each equal-density bin
+	q = (np.arange(nt) + 0.5)/nt
+
+	return np.interp(q, W, secs)
+
+#define generator to read RPO files in chunks of rows
+def _rpo_iter_chunks(
+	file,
+	chunksize,
+	engine = None,
+	date_format = '%I:%M:%S %p'):
+	'''
+	Yields successive blocks of rows from an RPO `all_data` file without
+	loading the entire file into memory.
+
+	Parameters
+	----------
+	file : str or pd.DataFrame
+		File containing thermogram data, either as a path string or a
+		dataframe.
+
+	chunksize : int
+		The number of rows to yield at a time.
+
+	engine : None or str
+		If not `None`, only parses the necessary columns as floats and parses
+		timestamps with `date_format`. Defaults to `None`.
+
+	date_format : str
+		``strftime`` format of the timestamps, only used if `engine` is not
+		`None`. Defaults to '%I:%M:%S %p' (*i.e.* hh:mm:ss AM/PM).
+
+	Yields
+	------
+	chunk : pd.DataFrame
+		Dataframe containing at most `chunksize` rows, with
+		pd.DatetimeIndex as index.
+
+	Raises
+	------
+	FileError
+		If `file` is not str or ``pd.DataFrame`` instance.
+
+	FileError
+		If index of `file` is not ``pd.DatetimeIndex`` instance.
+
+	FileError
+		If `file` does not contain "CO2_scaled" and "temp" columns.
+	'''
+
+	#make a chunk iterator for each input type
+	if isinstance(file, str) and engine is not None:
+		chunks = _read_csv_fast(
+			file,
+			['CO2_scaled','temp'],
+			date_format = date_format,
+			chunksize = int(chunksize))
+
+	elif isinstance(file, str):
+		chunks = pd.read_csv(
+			file,
+			index_col = 0,
+			parse_dates = True,
+			chunksize = int(chunksize))
+
+	elif isinstance(file, pd.DataFrame):
+		n = int(chunksize)
+		chunks = (file.iloc[i:i + n] for i in range(0, len(file), n))
+
+	else:
+		raise FileError(
+			'file must be pd.DataFrame instance or path string')
+
+	for chunk in chunks:
+
+		#check data format for every chunk
+		if not all([a in chunk.columns for a in ['CO2_scaled','temp']]):
+			raise FileError(
+				'file must have "CO2_scaled" and "temp" columns')
+
+		elif not isinstance(chunk.index, pd.DatetimeIndex):
+			raise FileError(
+				'file index must be pd.DatetimeIndex instance')
+
+		yield chunk
+
+#define function to extract thermogram vectors in a single streaming pass
+def _rpo_stream_tg(
+	file, 
+	nt, 
+	bl_subtract = True,
+	chunksize = 10000,
+	engine = None,
+	date_format = '%I:%M:%S %p'):
+	'''
+	Extracts time, temperature, and carbon remaining vectors from `all_data`
+	file generated by NOSAMS RPO LabView program, reading the file in chunks
+	so that memory use does not grow with run length.
+
+	Parameters
+	----------
+	file : str or pd.DataFrame
+		File containing thermogram data, either as a path string or a
+		dataframe.
+
+	nt : int 
+		The number of time points to use.
+
+	bl_subtract : Boolean
+		Tells the program whether or not to linearly subtract the baseline
+		such that ppm CO2 returns to 0 at the beginning and end of the run. 
+		Treats baseline as linear from the average of the first 100 seconds
+		of CO2 to the average of the last 100 seconds of CO2. Defaults to
+		`True`.
+
+	chunksize : int
+		The number of rows to read at a time. Defaults to `10000`.
+
+	engine : None or str
+		If not `None`, only parses the necessary columns as floats and parses
+		timestamps with `date_format`. Defaults to `None`.
+
+	date_format : str
+		``strftime`` format of the timestamps, only used if `engine` is not
+		`None`. Defaults to '%I:%M:%S %p' (*i.e.* hh:mm:ss AM/PM).
+
+	Returns
+	-------
+	g : np.ndarray
+		Array of the true fraction of carbon remaining at each timepoint.
+		Length `nt`.
+	
+	t : np.ndarray
+		Array of time, in seconds. Length `nt`.
+
+	T : np.ndarray
+		Array of temperature, in Kelvin. Length `nt`.
+
+	Raises
+	------
+	FileError
+		If `file` is not str or ``pd.DataFrame`` instance.
+	
+	FileError
+		If index of `file` is not ``pd.DatetimeIndex`` instance.
+
+	FileError
+		If `file` does not contain "CO2_scaled" and "temp" columns.
+
+	FileError
+		If `file` does not contain any rows.
+
+	Notes
+	-----
+	Rather than interpolating to a 1-second grid, CO2 is integrated directly
+	on the native (possibly irregular) timestamps using the trapezoid rule
+	and the cumulative curve is interpolated onto the downsampled midpoints.
+	The file is read twice: once to find the run length and baseline levels,
+	and once to integrate. Only one chunk plus `nt`-length arrays are held in
+	memory at any time. Results agree with ``_rpo_extract_tg`` to within the
+	difference between trapezoid and 1-second rectangle integration.
+
+	'''
+
+	#ensure nt is int
+	nt = int(nt)
+
+	#first pass: find run length and initial/final baseline levels
+	t_first = None
+	secs_max = 0.
+	head = [0., 0] #running sum and count of CO2 in the first 100 seconds
+	tail_secs = np.array([])
+	tail_CO2 = np.array([])
+
+	for chunk in _rpo_iter_chunks(
+			file,
+			chunksize,
+			engine = engine,
+			date_format = date_format):
+
+		if len(chunk) == 0:
+			continue
+
+		if t_first is None:
+			t_first = chunk.index[0]
+
+		secs_c = (chunk.index - t_first).seconds.values.astype(float)
+		CO2_c = chunk.CO2_scaled.values.astype(float)
+
+		#update head sum
+		ih = secs_c < 100
+		head[0] += np.sum(CO2_c[ih])
+		head[1] += np.sum(ih)
+
+		#update tail buffer, only keeping the final 100 seconds
+		secs_max = max(secs_max, np.max(secs_c))
+		tail_secs = np.append(tail_secs, secs_c)
+		tail_CO2 = np.append(tail_CO2, CO2_c)
+
+		it = tail_secs >= secs_max - 100
+		tail_secs = tail_secs[it]
+		tail_CO2 = tail_CO2[it]
+
+	if t_first is None:
+		raise FileError(
+			'file does not contain any rows')
+
+	#calculate initial and final bl and cumulative baseline function
+	if bl_subtract is True:
+		bl0 = head[0]/head[1]
+		blf = np.average(tail_CO2)
+
+	else:
+		bl0 = blf = 0.
+
+	def cum_bl(s):
+		return bl0*s + (blf - bl0)*s**2/(2*secs_max)
+
+	#generate t array
+	t0 = 0.; tf = secs_max
+	dt = (tf-t0)/nt
+
+	#make downsampled points at midpoint and drop last point
+	t = (np.linspace(t0, tf, nt + 1) + dt/2)[:-1]
+
+	#pre-allocate downsampled arrays
+	cum = np.zeros(nt)
+	T = np.zeros(nt)
+
+	#second pass: integrate CO2 and interpolate onto t, carrying the last
+	# row of each chunk into the next one
+	carry = None
+
+	for chunk in _rpo_iter_chunks(
+			file,
+			chunksize,
+			engine = engine,
+			date_format = date_format):
+
+		if len(chunk) == 0:
+			continue
+
+		secs_c = (chunk.index - t_first).seconds.values.astype(float)
+		CO2_c = chunk.CO2_scaled.values.astype(float)
+		T_c = chunk.temp.values.astype(float)
+
+		if carry is None:
+			cum_c = np.zeros(len(secs_c))
+
+		else:
+			secs_c = np.append(carry[0], secs_c)
+			CO2_c = np.append(carry[1], CO2_c)
+			T_c = np.append(carry[2], T_c)
+			cum_c = np.append(carry[3], np.zeros(len(secs_c) - 1))
+
+		#trapezoid-rule cumulative integral of CO2
+		dcum = 0.5*(CO2_c[1:] + CO2_c[:-1])*np.diff(secs_c)
+		cum_c[1:] = cum_c[0] + np.cumsum(dcum)
+
+		#interpolate onto all t points falling within this chunk
+		it = (t >= secs_c[0]) & (t <= secs_c[-1])
+		cum[it] = np.interp(t[it], secs_c, cum_c)
+		T[it] = np.interp(t[it], secs_c, T_c)
+
+		carry = (secs_c[-1], CO2_c[-1], T_c[-1], cum_c[-1])
+
+	#subtract baseline and calculate alpha
+	tot = carry[3] - cum_bl(secs_max)
+	alpha = (cum - cum_bl(t))/tot
+
+	#assert that alpha remains between 0 and 1 (noisy data at the beginning 
+	# and end of the run could lead to alpha *slightly* outside fo this range)
+	alpha[alpha > 1.0] = 1.0
+	alpha[alpha < 0.0] = 0.0
+
+	#create final arrays
+	T = T + 273.15 #convert to K
+	g = 1 - alpha
+
+	return g, t, T
+
+#define function to initialize the state for tailing a growing RPO file
+def _rpo_tail_init(file, date_format = '%I:%M:%S %p'):
+	'''
+	Initializes the state used to incrementally read an RPO `all_data` file
+	that is still being written by the NOSAMS RPO LabView program.
+
+	Parameters
+	----------
+	file : str
+		Path to the growing .csv file.
+
+	date_format : str or None
+		``strftime`` format of the timestamps. If `None`, format is inferred.
+		Defaults to '%I:%M:%S %p' (*i.e.* hh:mm:ss AM/PM).
+
+	Returns
+	-------
+	state : dict
+		Dictionary containing the byte offset of the first unread line, the
+		header, the time of the first row, and running buffers of seconds,
+		cumulative CO2, CO2, and temperature for all rows read so far, of
+		which the first `n` entries are filled.
+
+	Raises
+	------
+	FileError
+		If `file` is not a path string.
+	'''
+
+	if not isinstance(file, str):
+		raise FileError(
+			'file must be a path string')
+
+	state = {
+		'file': file,
+		'date_format': date_format,
+		'offset': 0,
+		'header': None,
+		't_first': None,
+		'n': 0,
+		'secs': np.empty(1024),
+		'cum': np.empty(1024),
+		'CO2': np.empty(1024),
+		'T': np.empty(1024),
+		'head': [0., 0],
+		}
+
+	return state
+
+#define function to append rows to the running buffers of the tail state
+def _rpo_tail_append(state, secs, cum, CO2, T):
+	'''
+	Appends new rows to the running buffers of a tail state, doubling the
+	buffer length whenever it is full so that appending is amortized O(1)
+	per row.
+	'''
+
+	n = state['n']
+	m = n + len(secs)
+	size = len(state['secs'])
+
+	if m > size:
+		while size < m:
+			size *= 2
+
+		for key in ['secs', 'cum', 'CO2', 'T']:
+			buf = np.empty(size)
+			buf[:n] = state[key][:n]
+			state[key] = buf
+
+	state['secs'][n:m] = secs
+	state['cum'][n:m] = cum
+	state['CO2'][n:m] = CO2
+	state['T'][n:m] = T
+	state['n'] = m
+
+#define function to read newly appended rows of a growing RPO file
+def _rpo_tail_read(state, final = False):
+	'''
+	Reads and parses only the complete lines appended to the file since the
+	last call, updating the running cumulative CO2 and temperature state.
+
+	Parameters
+	----------
+	state : dict
+		State dictionary created by ``_rpo_tail_init``. Updated in place.
+
+	final : Boolean
+		If `True`, also reads a final line that is not terminated by a
+		newline (*i.e.* once the file is known to be complete). Defaults to
+		`False`.
+
+	Returns
+	-------
+	n : int
+		Number of new rows read.
+
+	Raises
+	------
+	FileError
+		If the file does not contain "CO2_scaled" and "temp" columns.
+
+	Notes
+	-----
+	Unless `final` is `True`, a partially written final line is left unread
+	until it is completed.
+	Cumulative CO2 is integrated with the trapezoid rule on the native
+	timestamps, carrying the last row of the previous read forward, so the
+	cost of each call only depends on the number of new rows.
+	'''
+
+	#read all new bytes
+	with open(state['file'], 'rb') as f:
+		f.seek(state['offset'])
+		new = f.read()
+
+	#only keep complete lines
+	if final is True and new.strip():
+		new = new.rstrip(b'\r\n') + b'\n'
+		end = len(new)
+
+	else:
+		end = new.rfind(b'\n') + 1
+
+	if end == 0:
+		return 0
+
+	new = new[:end]
+	state['offset'] += end
+
+	#store header on first read
+	if state['header'] is None:
+		i = new.find(b'\n') + 1
+		state['header'] = new[:i]
+		new = new[i:]
+
+		cols = state['header'].decode().strip().split(',')
+
+		if not all([a in cols for a in ['CO2_scaled','temp']]):
+			raise FileError(
+				'file must have "CO2_scaled" and "temp" columns')
+
+	if not new.strip():
+		return 0
+
+	#parse new rows
+	chunk = pd.read_csv(
+		io.BytesIO(state['header'] + new),
+		index_col = 0)
+
+	idx = _to_datetime_index(chunk.index, state['date_format'])
+
+	if state['t_first'] is None:
+		state['t_first'] = idx[0]
+
+	secs_c = (idx - state['t_first']).seconds.values.astype(float)
+	CO2_c = chunk.CO2_scaled.values.astype(float)
+	T_c = chunk.temp.values.astype(float)
+
+	#update head sum for the initial baseline
+	ih = secs_c < 100
+	state['head'][0] += np.sum(CO2_c[ih])
+	state['head'][1] += np.sum(ih)
+
+	#trapezoid-rule cumulative integral of CO2, carrying the last row
+	n = state['n']
+
+	if n == 0:
+		cum_c = np.append(0, np.cumsum(
+			0.5*(CO2_c[1:] + CO2_c[:-1])*np.diff(secs_c)))
+
+	else:
+		s = np.append(state['secs'][n-1], secs_c)
+		c = np.append(state['CO2'][n-1], CO2_c)
+		cum_c = state['cum'][n-1] + np.cumsum(0.5*(c[1:] + c[:-1])*np.diff(s))
+
+	_rpo_tail_append(state, secs_c, cum_c, CO2_c, T_c)
+
+	return len(secs_c)
+
+#define function to calculate a provisional thermogram from the tail state
+def _rpo_tail_tg(state, nt, bl_subtract = True):
+	'''
+	Calculates provisional time, temperature, and carbon remaining vectors
+	from all rows read so far.
+
+	Parameters
+	----------
+	state : dict
+		State dictionary updated by ``_rpo_tail_read``.
+
+	nt : int
+		The number of time points to use.
+
+	bl_subtract : Boolean
+		Tells the program whether or not to linearly subtract a provisional
+		baseline, treated as linear from the average of the first 100 seconds
+		of CO2 to the average of the most recent 100 seconds of CO2. Defaults
+		to `True`.
+
+	Returns
+	-------
+	g : None or np.ndarray
+		Array of the provisional fraction of carbon remaining at each
+		timepoint, length `nt`. `None` if not enough data have been read.
+
+	t : None or np.ndarray
+		Array of time, in seconds. Length `nt`.
+
+	T : None or np.ndarray
+		Array of temperature, in Kelvin. Length `nt`.
+
+	Notes
+	-----
+	Until the run is complete, the final baseline is taken from the most
+	recent 100 seconds and `g` is normalized to the carbon evolved so far.
+	Results therefore change as data are appended and converge to those of
+	``_rpo_stream_tg`` once the file is complete. Only the `nt` output
+	points and the most recent 100 seconds are evaluated, by binary search
+	on the sorted time buffer, so the cost grows only logarithmically with
+	the number of rows read.
+	'''
+
+	n = state['n']
+	secs = state['secs'][:n]
+	cum = state['cum'][:n]
+
+	if n < 2 or secs[-1] <= 0:
+		return None, None, None
+
+	nt = int(nt)
+	secs_max = secs[-1]
+
+	#calculate provisional baseline levels
+	if bl_subtract is True:
+		bl0 = state['head'][0]/state['head'][1]
+		i = np.searchsorted(secs, secs_max - 100)
+		blf = np.average(state['CO2'][i:n])
+
+	else:
+		bl0 = blf = 0.
+
+	def cum_bl(s):
+		return bl0*s + (blf - bl0)*s**2/(2*secs_max)
+
+	tot = cum[-1] - cum_bl(secs_max)
+
+	if tot <= 0:
+		return None, None, None
+
+	#make downsampled points at midpoint and drop last point
+	dt = secs_max/nt
+	t = (np.linspace(0, secs_max, nt + 1) + dt/2)[:-1]
+
+	#subtract baseline and calculate alpha
+	alpha = (np.interp(t, secs, cum) - cum_bl(t))/tot
+
+	alpha[alpha > 1.0] = 1.0
+	alpha[alpha < 0.0] = 0.0
+
+	#create final arrays
+	T = np.interp(t, secs, state['T'][:n]) + 273.15 #convert to K
+	g = 1 - alpha
+
+	return g, t, T
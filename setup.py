@@ -32,6 +32,9 @@ setup(name='rampedpyrox',
 	author_email='jhemingway@whoi.edu',
 	license='GNU GPL Version 3',
 	packages=['rampedpyrox'],
+	entry_points={
+		'console_scripts': ['rampedpyrox=rampedpyrox.cli:main'],
+	},
 	install_requires=[
 		'matplotlib',
 		'numpy',